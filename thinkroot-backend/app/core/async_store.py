@@ -0,0 +1,54 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from app.core.config import settings
+from app.core.mock_store import mock_store
+from app.core.storage import Storage
+
+
+class AsyncStore:
+    """
+    Async facade over a Storage backend.
+    
+    Every Storage method is available as a coroutine. In-memory backends are
+    called inline on the event loop, since their work is pure CPU and shorter
+    than a thread hop. Blocking backends (blocking = True) run on a bounded
+    thread pool so slow I/O cannot exhaust the server's default threadpool.
+    """
+    
+    def __init__(self, store: Storage, max_workers: int):
+        self.store = store
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if store.blocking:
+            self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="store")
+    
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking callable that uses the sync store.
+        
+        Multi-step flows that need store.batch() go through here so the whole
+        batch runs on one thread.
+        """
+        if self._executor is None:
+            return fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+    
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(self.store, name)
+        
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self.run(method, *args, **kwargs)
+        
+        call.__name__ = name
+        return call
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.store.close()
+
+
+# Global async store instance wrapping the configured backend
+async_store = AsyncStore(mock_store, settings.STORE_EXECUTOR_WORKERS)
@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.contracts import CLAIM_STATUSES, VIEWS, decode_view_result, encode_view_call
+from app.core.indexer import load_contracts
+from app.utils.rpc import JsonRpcClient, RpcError
+
+# The view calls behind one worker's on-chain view
+WORKER_VIEWS = ("hasValidCoverage", "getPolicyDetails", "getClaimStatus", "getReputationDetails")
+
+
+class ContractNotConfiguredError(LookupError):
+    """A view call needs a contract that has no configured address."""
+
+
+class ChainReader:
+    """
+    Reads contract view functions for many workers in few round trips.
+    
+    Every read is pinned to one block (the head, refreshed at most every
+    `head_ttl` seconds), so all calls in it see the same chain state. Calls
+    not already cached go out together as one JSON-RPC batch of eth_calls.
+    Results are cached by (block, contract, calldata): a block never changes,
+    so a cached result stays valid and only ages out of the LRU. A call that
+    another thread is already fetching for the same block is awaited rather
+    than sent again.
+    """
+    
+    def __init__(
+        self,
+        rpc: JsonRpcClient,
+        contracts: Dict[str, str],
+        cache_size: int = settings.RPC_CACHE_SIZE,
+        head_ttl: float = settings.CHAIN_HEAD_TTL,
+    ):
+        self.rpc = rpc
+        self.contracts = {name: address.lower() for name, address in contracts.items()}
+        self.cache_size = cache_size
+        self.head_ttl = head_ttl
+        self._cache: OrderedDict = OrderedDict()
+        self._in_flight: Dict[Tuple[int, str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._head: Optional[int] = None
+        self._head_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.deduped = 0
+        self.batches = 0
+    
+    def head(self) -> int:
+        """Latest block number, re-read at most every head_ttl seconds."""
+        now = time.monotonic()
+        if self._head is None or now - self._head_at >= self.head_ttl:
+            self._head = self.rpc.block_number()
+            self._head_at = now
+        return self._head
+    
+    def missing_contracts(self, functions: Iterable[str] = WORKER_VIEWS) -> List[str]:
+        """Contracts the given view functions need that have no address."""
+        needed = dict.fromkeys(VIEWS[function].contract for function in functions)
+        return [name for name in needed if name not in self.contracts]
+    
+    def read(
+        self, calls: List[Tuple[str, str]], block: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Decoded results of (view function, worker) calls at `block` (default: head)."""
+        missing = self.missing_contracts(function for function, _ in calls)
+        if missing:
+            raise ContractNotConfiguredError(f"No address configured for {', '.join(missing)}")
+        block = self.head() if block is None else block
+        keys = [
+            (block, self.contracts[VIEWS[function].contract], encode_view_call(function, worker))
+            for function, worker in calls
+        ]
+        futures: Dict[Tuple[int, str, str], Future] = {}
+        to_fetch: List[Tuple[int, str, str]] = []
+        with self._lock:
+            for key in keys:
+                if key in futures:
+                    continue
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    future = Future()
+                    future.set_result(self._cache[key])
+                    self.hits += 1
+                elif key in self._in_flight:
+                    future = self._in_flight[key]
+                    self.deduped += 1
+                else:
+                    future = self._in_flight[key] = Future()
+                    to_fetch.append(key)
+                    self.misses += 1
+                futures[key] = future
+        if to_fetch:
+            self._fetch(to_fetch)
+        return [
+            decode_view_result(function, futures[key].result())
+            for (function, _), key in zip(calls, keys)
+        ]
+    
+    def _fetch(self, keys: List[Tuple[int, str, str]]):
+        """
+        Send eth_calls for keys this thread owns and settle their futures.
+        
+        Every future is settled and leaves _in_flight whatever happens, or
+        the threads waiting on it would block forever.
+        """
+        results: List[Any] = []
+        try:
+            results = self.rpc.batch([
+                ("eth_call", [{"to": to, "data": data}, hex(block)]) for block, to, data in keys
+            ])
+        except Exception as e:
+            results = [e] * len(keys)
+        finally:
+            with self._lock:
+                self.batches += 1
+                for index, key in enumerate(keys):
+                    future = self._in_flight.pop(key)
+                    if index >= len(results):
+                        future.set_exception(RpcError("eth_call got no result"))
+                        continue
+                    result = results[index]
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                        continue
+                    future.set_result(result)
+                    if self.cache_size:
+                        self._cache[key] = result
+                        while len(self._cache) > self.cache_size:
+                            self._cache.popitem(last=False)
+    
+    def worker_views(self, workers: List[str], block: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Coverage, policy, claim and reputation of each worker, in one batch."""
+        workers = [worker.lower() for worker in workers]
+        block = self.head() if block is None else block
+        results = iter(self.read(
+            [(function, worker) for worker in workers for function in WORKER_VIEWS], block
+        ))
+        views = {}
+        for worker in workers:
+            coverage, policy, claim, reputation = (next(results) for _ in WORKER_VIEWS)
+            views[worker] = {
+                "block": block,
+                "hasValidCoverage": coverage["hasValidCoverage"],
+                "policy": policy,
+                "claimStatus": CLAIM_STATUSES[claim["claimStatus"]],
+                "reputation": reputation,
+            }
+        return views
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "deduped": self.deduped,
+                "batches": self.batches,
+            }
+
+
+# Shared by the indexer task and the on-chain reads (None without CHAIN_RPC_URL)
+chain_rpc = JsonRpcClient(
+    settings.CHAIN_RPC_URL,
+    timeout=settings.RPC_TIMEOUT,
+    pool_size=settings.RPC_POOL_SIZE,
+    max_batch_size=settings.RPC_BATCH_SIZE,
+) if settings.CHAIN_RPC_URL else None
+chain_reader = ChainReader(chain_rpc, load_contracts()) if chain_rpc else None
@@ -0,0 +1,325 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from app.core.async_store import async_store
+from app.core.config import settings
+from app.core.mock_store import mock_store
+
+logger = logging.getLogger(__name__)
+
+# A stage takes a claim ID and returns whether the claim moves on to the next
+# stage. Stages check the claim's stored status first, so running one again
+# after a failed attempt (or a crash halfway through) does nothing twice.
+Stage = Callable[[str], bool]
+
+
+def _claim_owner(claim: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    policy = mock_store.get_policy(claim["policyId"])
+    return policy, policy["userId"] if policy else None
+
+
+def _rejection_reason(claim: Dict[str, Any], policy: Optional[Dict[str, Any]]) -> Optional[str]:
+    if policy is None:
+        return "The claim's policy does not exist."
+    if not policy["coverageStart"] <= claim["createdAt"] <= policy["coverageEnd"]:
+        return "The claim was filed outside the policy's coverage window."
+    return None
+
+
+def validate_claim(claim_id: str) -> bool:
+    """Reject claims whose policy is missing or did not cover the time they were filed."""
+    claim = mock_store.get_claim(claim_id)
+    if not claim or claim["status"] == "rejected":
+        return False
+    if claim["status"] != "pending":
+        return True
+    
+    policy, user_id = _claim_owner(claim)
+    reason = _rejection_reason(claim, policy)
+    if reason is None:
+        return True
+    with mock_store.batch():
+        mock_store.update_claim(claim_id, {"status": "rejected"})
+        if user_id:
+            mock_store.create_notification(user_id, "Claim rejected", reason, "warning")
+    return False
+
+
+def approve_claim(claim_id: str) -> bool:
+    """Approve a validated claim for the configured payout amount."""
+    claim = mock_store.get_claim(claim_id)
+    if not claim or claim["status"] not in ("pending", "approved", "paid"):
+        return False
+    if claim["status"] == "pending":
+        mock_store.update_claim(claim_id, {
+            "status": "approved",
+            "payoutAmount": settings.CLAIM_PAYOUT_AMOUNT,
+        })
+    return True
+
+
+def pay_claim(claim_id: str) -> bool:
+    """Credit the payout to the wallet, mark the claim paid and tell the worker."""
+    # One transaction in SQLite. In memory, a failed posting writes nothing
+    # and approve_claim cannot fail for an existing claim, so a claim is
+    # never left credited but still "approved" for a retry to credit again.
+    # The notification is part of the same write, so a crash cannot leave a
+    # paid claim that nobody was told about
+    with mock_store.batch():
+        # Read inside the transaction: with several workers, each one resumes
+        # the same unfinished claims at startup
+        claim = mock_store.get_claim(claim_id)
+        if not claim or claim["status"] != "approved":
+            # Already paid (and notified) by another run
+            return False
+        _, user_id = _claim_owner(claim)
+        mock_store.post_transaction(user_id, "claim", claim["payoutAmount"], reference_id=claim_id)
+        mock_store.approve_claim(claim_id, claim["payoutAmount"])
+        mock_store.create_notification(
+            user_id,
+            "Claim approved!",
+            f"₹{claim['payoutAmount']} has been paid out. Check your wallet.",
+            "success"
+        )
+    return True
+
+
+def fail_claim(claim_id: str) -> bool:
+    """Reject a claim the pipeline gave up on, unless it was already paid."""
+    with mock_store.batch():
+        claim = mock_store.get_claim(claim_id)
+        if not claim or claim["status"] not in ("pending", "approved"):
+            return False
+        mock_store.update_claim(claim_id, {"status": "rejected"})
+        _, user_id = _claim_owner(claim)
+        if user_id:
+            mock_store.create_notification(
+                user_id,
+                "Claim could not be processed",
+                "We could not review your claim. Please file it again.",
+                "warning",
+            )
+    return True
+
+
+CLAIM_STAGES: List[Tuple[str, Stage]] = [
+    ("validate", validate_claim),
+    ("approve", approve_claim),
+    ("payout", pay_claim),
+]
+
+
+class StageMetrics:
+    """Run count, failures and latency percentiles over recent runs of one stage."""
+    
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+    
+    def observe(self, ms: float, failed: bool = False):
+        self.count += 1
+        self.errors += failed
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+        
+        def percentile(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 3) if recent else 0.0
+        
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avgMs": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50Ms": percentile(0.50),
+            "p95Ms": percentile(0.95),
+            "maxMs": round(self.max_ms, 3),
+        }
+
+
+class ClaimPipeline:
+    """
+    Moves filed claims through their stages on background worker tasks.
+    
+    Intake calls admit() before filing a claim and submit() after, so the
+    HTTP response never waits for review or payout. At most `queue_size`
+    claims are admitted and unfinished at once; admit() returns False
+    beyond that, and the route answers 503 instead of letting the backlog
+    (and its latency) grow without bound.
+    
+    A stage that raises is retried after `retry_delay` seconds, doubling
+    per attempt, up to `max_attempts` times. The claim is then rejected
+    with a notification (unless it was already paid) and listed in
+    stats()["failures"]. The queue lives in memory; start() re-queues the
+    store's unfinished claims, so claims queued at shutdown or restart
+    resume where their stored status left off.
+    """
+    
+    def __init__(
+        self,
+        stages: List[Tuple[str, Stage]],
+        workers: int = settings.CLAIM_WORKERS,
+        queue_size: int = settings.CLAIM_QUEUE_SIZE,
+        max_attempts: int = settings.CLAIM_MAX_ATTEMPTS,
+        retry_delay: float = settings.CLAIM_RETRY_DELAY,
+    ):
+        self.stages = stages
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        self.active = 0
+        self.admitted = 0
+        self.shed = 0
+        self.completed = 0
+        self.stopped = 0
+        self.failed = 0
+        self.retried = 0
+        self.resumed = 0
+        self.failures: Deque[Dict[str, Any]] = deque(maxlen=100)
+        # "queued" is the wait between submit (or a retry) and a worker picking it up
+        self.metrics = {name: StageMetrics() for name in ["queued", *(name for name, _ in stages)]}
+    
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+    
+    def start(self):
+        """Start the worker tasks (on the running event loop) and resume unfinished claims."""
+        # Created here, not in __init__, so the queue binds to the serving loop
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        # Read before the app serves requests, so no claim is queued twice.
+        # These are admitted past the capacity: intake sheds until they drain
+        for claim in mock_store.get_unfinished_claims():
+            self.active += 1
+            self.admitted += 1
+            self.resumed += 1
+            self.submit(claim["id"])
+    
+    async def stop(self):
+        """Cancel the workers and pending retries; queued claims are dropped."""
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+        self._tasks = []
+        self._retries.clear()
+        self.active = 0
+    
+    def admit(self) -> bool:
+        """Reserve room for one claim; False if the pipeline is full or not running."""
+        if not self.running or self.active >= self.queue_size:
+            self.shed += 1
+            return False
+        self.active += 1
+        self.admitted += 1
+        return True
+    
+    def release(self):
+        """Give back an admitted slot whose claim was never filed."""
+        self.active -= 1
+        self.admitted -= 1
+    
+    def submit(self, claim_id: str):
+        """Queue an admitted claim at its first stage."""
+        self._queue.put_nowait((claim_id, 0, 0, time.perf_counter()))
+    
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+    
+    async def _work(self):
+        while True:
+            claim_id, stage, attempts, enqueued_at = await self._queue.get()
+            self.metrics["queued"].observe((time.perf_counter() - enqueued_at) * 1000)
+            await self._advance(claim_id, stage, attempts)
+    
+    async def _advance(self, claim_id: str, stage: int, attempts: int):
+        """Run the claim's stages from `stage` on until one stops it, fails or all pass."""
+        for index in range(stage, len(self.stages)):
+            name, run = self.stages[index]
+            started = time.perf_counter()
+            try:
+                proceed = await async_store.run(run, claim_id)
+            except Exception as e:
+                self.metrics[name].observe((time.perf_counter() - started) * 1000, failed=True)
+                self._retry(claim_id, index, attempts + 1, e)
+                return
+            self.metrics[name].observe((time.perf_counter() - started) * 1000)
+            attempts = 0
+            if not proceed:
+                self.stopped += 1
+                self.active -= 1
+                return
+        self.completed += 1
+        self.active -= 1
+    
+    def _retry(self, claim_id: str, stage: int, attempts: int, error: Exception):
+        if attempts >= self.max_attempts:
+            self.failed += 1
+            self.active -= 1
+            self.failures.append({
+                "claimId": claim_id,
+                "stage": self.stages[stage][0],
+                "attempts": attempts,
+                "error": str(error),
+            })
+            self._give_up(claim_id)
+            return
+        self.retried += 1
+        task = asyncio.create_task(
+            self._requeue((claim_id, stage, attempts), self.retry_delay * 2 ** (attempts - 1))
+        )
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+    
+    def _give_up(self, claim_id: str):
+        task = asyncio.create_task(self._reject(claim_id))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+    
+    async def _reject(self, claim_id: str):
+        try:
+            await async_store.run(fail_claim, claim_id)
+        except Exception:
+            # The store is still failing; the claim stays unfinished and is
+            # resumed on the next start
+            logger.exception("Could not reject claim %s after its last attempt", claim_id)
+    
+    async def _requeue(self, job: Tuple[str, int, int], delay: float):
+        await asyncio.sleep(delay)
+        self._queue.put_nowait((*job, time.perf_counter()))
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": len(self._tasks),
+            "queueDepth": self.depth,
+            "inPipeline": self.active,
+            "capacity": self.queue_size,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "completed": self.completed,
+            "stopped": self.stopped,
+            "failed": self.failed,
+            "retried": self.retried,
+            "resumed": self.resumed,
+            "stages": {name: metrics.snapshot() for name, metrics in self.metrics.items()},
+            "failures": list(self.failures),
+        }
+
+
+# Global pipeline instance, started by the app's lifespan
+claim_pipeline = ClaimPipeline(CLAIM_STAGES)
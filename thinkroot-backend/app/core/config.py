@@ -7,7 +7,93 @@ load_dotenv()
 class Settings:
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "mock-secret-key")
-    JWT_EXPIRY: int = int(os.getenv("JWT_EXPIRY", "24"))
+    JWT_EXPIRY: int = int(os.getenv("JWT_EXPIRY", "24"))  # hours
+    # Service key (X-Fleet-Key) for bulk purchases on behalf of other users;
+    # empty disables them, so a bearer token can only buy for its own user
+    FLEET_API_KEY: str = os.getenv("FLEET_API_KEY", "")
+    
+    # Sessions kept at most (least recently used are evicted) and how often
+    # expired ones are purged
+    SESSION_CACHE_SIZE: int = int(os.getenv("SESSION_CACHE_SIZE", "100000"))
+    SESSION_PURGE_INTERVAL: float = float(os.getenv("SESSION_PURGE_INTERVAL", "60"))
+    
+    # Verified bearer tokens cached per process (0 disables the cache) and how
+    # often each worker reloads revoked tokens from the store
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+    REVOCATION_SYNC_INTERVAL: float = float(os.getenv("REVOCATION_SYNC_INTERVAL", "5"))
+    
+    # Server (python main.py)
+    PORT: int = int(os.getenv("PORT", "8000"))
+    # Worker processes in production; more than one needs STORAGE_BACKEND=sqlite
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    
+    # Storage backend: "memory" (default), "durable" or "sqlite"
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "memory")
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "paracipher.db")
+    # Threads used by async routes to call blocking backends
+    STORE_EXECUTOR_WORKERS: int = int(os.getenv("STORE_EXECUTOR_WORKERS", "16"))
+    
+    # Durable in-memory store (STORAGE_BACKEND=durable)
+    DATA_DIR: str = os.getenv("DATA_DIR", "data")
+    # "commit": a write returns once its log records are fsynced; "interval":
+    # the log is flushed every WAL_FLUSH_INTERVAL seconds and a crash can
+    # lose that much acknowledged work
+    WAL_SYNC: str = os.getenv("WAL_SYNC", "commit")
+    WAL_FLUSH_INTERVAL: float = float(os.getenv("WAL_FLUSH_INTERVAL", "0.01"))
+    SNAPSHOT_INTERVAL: float = float(os.getenv("SNAPSHOT_INTERVAL", "300"))
+    
+    # Background policy expiry
+    POLICY_EXPIRY_SWEEP_INTERVAL: float = float(os.getenv("POLICY_EXPIRY_SWEEP_INTERVAL", "30"))
+    POLICY_EXPIRY_BATCH_SIZE: int = int(os.getenv("POLICY_EXPIRY_BATCH_SIZE", "1000"))
+    
+    # Contract event indexer (runs when CHAIN_RPC_URL is set); the addresses
+    # are in the deployment-addresses.json written by scripts/deploy.js
+    CHAIN_RPC_URL: str = os.getenv("CHAIN_RPC_URL", "")
+    INSURANCE_POLICY_ADDRESS: str = os.getenv("INSURANCE_POLICY_ADDRESS", "")
+    CLAIM_PAYOUT_ADDRESS: str = os.getenv("CLAIM_PAYOUT_ADDRESS", "")
+    REPUTATION_SCORE_ADDRESS: str = os.getenv("REPUTATION_SCORE_ADDRESS", "")
+    CHAIN_START_BLOCK: int = int(os.getenv("CHAIN_START_BLOCK", "0"))
+    # Blocks behind the head left unindexed, so short reorgs cannot undo indexed events
+    CHAIN_CONFIRMATIONS: int = int(os.getenv("CHAIN_CONFIRMATIONS", "0"))
+    # eth_getLogs block range: initial and largest, and the log count it aims for
+    CHAIN_BATCH_BLOCKS: int = int(os.getenv("CHAIN_BATCH_BLOCKS", "2000"))
+    CHAIN_MAX_BATCH_BLOCKS: int = int(os.getenv("CHAIN_MAX_BATCH_BLOCKS", "10000"))
+    CHAIN_TARGET_LOGS: int = int(os.getenv("CHAIN_TARGET_LOGS", "1000"))
+    CHAIN_POLL_INTERVAL: float = float(os.getenv("CHAIN_POLL_INTERVAL", "5"))
+    # While the node is unreachable the poll interval doubles up to this
+    CHAIN_MAX_POLL_INTERVAL: float = float(os.getenv("CHAIN_MAX_POLL_INTERVAL", "300"))
+    # JSON-RPC client: keep-alive connections, calls per batch request,
+    # cached view-call results and how long a read reuses the head block
+    RPC_TIMEOUT: float = float(os.getenv("RPC_TIMEOUT", "10"))
+    RPC_POOL_SIZE: int = int(os.getenv("RPC_POOL_SIZE", "8"))
+    RPC_BATCH_SIZE: int = int(os.getenv("RPC_BATCH_SIZE", "100"))
+    RPC_CACHE_SIZE: int = int(os.getenv("RPC_CACHE_SIZE", "10000"))
+    CHAIN_HEAD_TTL: float = float(os.getenv("CHAIN_HEAD_TTL", "1"))
+    
+    # Users whose rendered /api/home and /policy/active/current are kept in memory
+    SNAPSHOT_CACHE_SIZE: int = int(os.getenv("SNAPSHOT_CACHE_SIZE", "10000"))
+    
+    # Notifications kept per user (oldest are dropped first)
+    NOTIFICATION_INBOX_SIZE: int = int(os.getenv("NOTIFICATION_INBOX_SIZE", "100"))
+    
+    # Claim pipeline: worker tasks, claims admitted at once (more get 503),
+    # attempts per stage and the first retry delay (doubled per attempt)
+    CLAIM_WORKERS: int = int(os.getenv("CLAIM_WORKERS", "4"))
+    CLAIM_QUEUE_SIZE: int = int(os.getenv("CLAIM_QUEUE_SIZE", "1000"))
+    CLAIM_MAX_ATTEMPTS: int = int(os.getenv("CLAIM_MAX_ATTEMPTS", "5"))
+    CLAIM_RETRY_DELAY: float = float(os.getenv("CLAIM_RETRY_DELAY", "0.5"))
+    # Paid out for an approved claim
+    CLAIM_PAYOUT_AMOUNT: int = int(os.getenv("CLAIM_PAYOUT_AMOUNT", "5000"))
+    
+    # Push streams (GET /notifications/stream): changes queued per stream
+    # (oldest dropped first), open streams allowed and keep-alive interval
+    PUSH_QUEUE_SIZE: int = int(os.getenv("PUSH_QUEUE_SIZE", "64"))
+    PUSH_MAX_SUBSCRIBERS: int = int(os.getenv("PUSH_MAX_SUBSCRIBERS", "10000"))
+    PUSH_KEEPALIVE_INTERVAL: float = float(os.getenv("PUSH_KEEPALIVE_INTERVAL", "15"))
+    
+    # NDJSON claim ingestion: claims committed per store write, longest line accepted
+    CLAIM_INGEST_CHUNK_SIZE: int = int(os.getenv("CLAIM_INGEST_CHUNK_SIZE", "500"))
+    CLAIM_INGEST_MAX_LINE_BYTES: int = int(os.getenv("CLAIM_INGEST_MAX_LINE_BYTES", "65536"))
     
     # API Settings
     API_TITLE: str = "ParaCipher MVP Backend"
@@ -0,0 +1,205 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+class EventSpec(NamedTuple):
+    """A contract event the indexer decodes."""
+    contract: str
+    name: str
+    # Non-indexed parameters in declaration order, as (name, ABI type)
+    fields: Tuple[Tuple[str, str], ...]
+
+
+# Every indexed event has `address indexed worker` as its only topic after
+# topic0. topic0 is keccak256 of the event signature (given in each comment).
+EVENTS: Dict[str, EventSpec] = {
+    # PolicyPurchased(address,uint256,uint256,uint256)
+    "0x8b8961810a39fd56d36e421278c7737795a230b372ac246eb46d37eae370db5f": EventSpec(
+        "InsurancePolicy", "PolicyPurchased",
+        (("coverageAmount", "uint256"), ("startTime", "uint256"), ("endTime", "uint256")),
+    ),
+    # PolicyExpired(address,uint256)
+    "0x1ca56813fe04631dd16eaef823197ff15a3e079cd5c03cabafe16e2ed2103883": EventSpec(
+        "InsurancePolicy", "PolicyExpired",
+        (("expiredAt", "uint256"),),
+    ),
+    # ClaimFiled(address,uint256,uint256,string,string,string)
+    "0xc55b3533b62743006b5b0af392844ae0ff557c070b4e209e38e44182b8f73d29": EventSpec(
+        "ClaimPayout", "ClaimFiled",
+        (
+            ("requestedAmount", "uint256"), ("filedAt", "uint256"), ("notes", "string"),
+            ("photoIpfsHash", "string"), ("gpsCoordinates", "string"),
+        ),
+    ),
+    # ClaimApproved(address,uint256,uint256)
+    "0x05ca75b0d90f1dd046ad3b8c1ec4a461042c3d33518b9b67d9feafc7d8d3c6cf": EventSpec(
+        "ClaimPayout", "ClaimApproved",
+        (("payoutAmount", "uint256"), ("approvedAt", "uint256")),
+    ),
+    # ClaimRejected(address,uint256,string)
+    "0x5908afa7dbbe87d429c73ce36fed0d559341182195bd6ea0f33e005d291cf425": EventSpec(
+        "ClaimPayout", "ClaimRejected",
+        (("rejectedAt", "uint256"), ("reason", "string")),
+    ),
+    # PayoutSent(address,uint256,uint256)
+    "0x096e196e637d37bc3047a3f191bf831742d7529c4d6bae0d8811a5ebf5ee0967": EventSpec(
+        "ClaimPayout", "PayoutSent",
+        (("amount", "uint256"), ("sentAt", "uint256")),
+    ),
+    # ScoreUpdated(address,uint256,int256,string)
+    "0x418c45f6d53d8517cfd8a0f0e8671998bcdcf501a698602866ad75ebad872572": EventSpec(
+        "ReputationScore", "ScoreUpdated",
+        (("newScore", "uint256"), ("change", "int256"), ("reason", "string")),
+    ),
+}
+
+# Event signature topics, for the eth_getLogs topic filter
+EVENT_TOPICS: List[str] = list(EVENTS)
+
+CONTRACT_NAMES = ("InsurancePolicy", "ClaimPayout", "ReputationScore")
+
+
+class ViewSpec(NamedTuple):
+    """A contract view function taking one `address worker` argument."""
+    contract: str
+    # First 4 bytes of keccak256 of the signature (given in each comment)
+    selector: str
+    outputs: Tuple[Tuple[str, str], ...]
+
+
+VIEWS: Dict[str, ViewSpec] = {
+    # hasValidCoverage(address)
+    "hasValidCoverage": ViewSpec(
+        "InsurancePolicy", "0xe15af7c6", (("hasValidCoverage", "bool"),),
+    ),
+    # getPolicyDetails(address), a static Policy struct
+    "getPolicyDetails": ViewSpec(
+        "InsurancePolicy", "0x45f23e29",
+        (
+            ("workerAddress", "address"), ("coverageAmount", "uint256"), ("startTime", "uint256"),
+            ("endTime", "uint256"), ("isActive", "bool"), ("hasClaimed", "bool"),
+        ),
+    ),
+    # getClaimStatus(address), a ClaimStatus enum
+    "getClaimStatus": ViewSpec(
+        "ClaimPayout", "0xc9760f71", (("claimStatus", "uint8"),),
+    ),
+    # getReputationDetails(address)
+    "getReputationDetails": ViewSpec(
+        "ReputationScore", "0x5e270a59",
+        (
+            ("score", "uint256"), ("safeDays", "uint256"), ("claims", "uint256"),
+            ("lastUpdated", "uint256"), ("isActive", "bool"), ("discountPercentage", "int256"),
+        ),
+    ),
+    # getScore(address)
+    "getScore": ViewSpec(
+        "ReputationScore", "0xd47875d0", (("score", "uint256"),),
+    ),
+}
+
+# ClaimPayout.ClaimStatus, by enum value
+CLAIM_STATUSES = ("none", "pending", "approved", "rejected")
+
+
+def _word(data: bytes, offset: int) -> int:
+    return int.from_bytes(data[offset:offset + 32], "big")
+
+
+def decode_data(fields: Tuple[Tuple[str, str], ...], data: bytes) -> Dict[str, Any]:
+    """Decode ABI-encoded values (uintN, int256, bool, address, string)."""
+    values = {}
+    for i, (name, kind) in enumerate(fields):
+        word = _word(data, 32 * i)
+        if kind in ("uint256", "uint8"):
+            values[name] = word
+        elif kind == "bool":
+            values[name] = bool(word)
+        elif kind == "address":
+            values[name] = f"0x{word:040x}"
+        elif kind == "int256":
+            values[name] = word - (1 << 256) if word >> 255 else word
+        elif kind == "string":
+            length = _word(data, word)
+            values[name] = data[word + 32:word + 32 + length].decode("utf-8", "replace")
+        else:
+            raise ValueError(f"Unsupported ABI type: {kind}")
+    return values
+
+
+def topic_address(topic: str) -> str:
+    """The address packed into an indexed address topic (lowercase, 0x-prefixed)."""
+    return "0x" + topic[-40:].lower()
+
+
+def encode_view_call(function: str, worker: str) -> str:
+    """Calldata for VIEWS[function](worker)."""
+    return VIEWS[function].selector + "0" * 24 + worker.lower().removeprefix("0x")
+
+
+def decode_view_result(function: str, result: str) -> Dict[str, Any]:
+    """Decode an eth_call result of VIEWS[function]."""
+    return decode_data(VIEWS[function].outputs, bytes.fromhex(result.removeprefix("0x")))
+
+
+def decode_log(log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Decode an eth_getLogs entry into an event record, or None if it is not
+    one of EVENTS (or was removed by a reorg).
+    
+    The record's "id" is "<txHash>:<logIndex>", which is unique per log and
+    lets the store ignore logs it has already indexed.
+    """
+    topics = log.get("topics") or []
+    spec = EVENTS.get(topics[0].lower()) if topics else None
+    if spec is None or log.get("removed") or len(topics) < 2:
+        return None
+    log_index = int(log["logIndex"], 16)
+    return {
+        "id": f"{log['transactionHash'].lower()}:{log_index}",
+        "contract": spec.contract,
+        "address": log["address"].lower(),
+        "name": spec.name,
+        "worker": topic_address(topics[1]),
+        # Amounts in wei and timestamps in unix seconds, as emitted
+        "args": decode_data(spec.fields, bytes.fromhex(log["data"][2:])),
+        "blockNumber": int(log["blockNumber"], 16),
+        "logIndex": log_index,
+        "txHash": log["transactionHash"].lower(),
+    }
+
+
+def apply_event(state: Optional[Dict[str, Any]], event: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold an event into its worker's chain state (None for a new worker)."""
+    state = dict(state or {
+        "walletAddress": event["worker"],
+        "policyActive": False,
+        "coverageAmount": None,
+        "coverageStart": None,
+        "coverageEnd": None,
+        "claimStatus": None,
+        "payoutTxHash": None,
+        "score": None,
+    })
+    args = event["args"]
+    name = event["name"]
+    if name == "PolicyPurchased":
+        state.update({
+            "policyActive": True,
+            "coverageAmount": args["coverageAmount"],
+            "coverageStart": args["startTime"],
+            "coverageEnd": args["endTime"],
+        })
+    elif name == "PolicyExpired":
+        state["policyActive"] = False
+    elif name == "ClaimFiled":
+        state["claimStatus"] = "pending"
+    elif name == "ClaimApproved":
+        state["claimStatus"] = "approved"
+    elif name == "ClaimRejected":
+        state["claimStatus"] = "rejected"
+    elif name == "PayoutSent":
+        state.update({"claimStatus": "paid", "payoutTxHash": event["txHash"]})
+    elif name == "ScoreUpdated":
+        state["score"] = args["newScore"]
+    state["blockNumber"] = event["blockNumber"]
+    return state
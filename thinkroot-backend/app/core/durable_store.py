@@ -0,0 +1,502 @@
+import os
+import pickle
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.core.mock_store import MockStore
+from app.utils.ids import format_nft_id
+
+
+# Frame header: payload length and CRC32 of the payload
+FRAME_HEADER = struct.Struct("<II")
+SNAPSHOT_FILE = "snapshot.pkl"
+SEGMENT_PREFIX = "wal-"
+SEGMENT_SUFFIX = ".log"
+
+
+def _segment_name(number: int) -> str:
+    return f"{SEGMENT_PREFIX}{number:08d}{SEGMENT_SUFFIX}"
+
+
+def _read_frames(path: str) -> Iterator[Tuple[Any, int]]:
+    """Yield (record, end offset) for each intact frame, stopping at a torn tail."""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + FRAME_HEADER.size <= len(data):
+        length, crc = FRAME_HEADER.unpack_from(data, offset)
+        start = offset + FRAME_HEADER.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return
+        offset = start + length
+        yield pickle.loads(payload), offset
+
+
+class WriteAheadLog:
+    """
+    Segmented append-only log with group commit.
+    
+    append() buffers the encoded record and returns its sequence number. A
+    writer thread writes the buffer with a single write and fsync, so records
+    appended while the previous fsync ran share the next one, and wait(seq)
+    blocks until that record is on disk.
+    
+    With `sync` off the writer only flushes every `flush_interval` seconds
+    and callers do not wait: a crash loses up to that much acknowledged work.
+    """
+    
+    def __init__(self, directory: str, segment: int, flush_interval: float, sync: bool = True):
+        self.directory = directory
+        self.segment = segment
+        self.flush_interval = flush_interval
+        self.sync = sync
+        self._buffer: List[bytes] = []
+        self._appended = 0
+        self._flushed = 0
+        self._failure: Optional[BaseException] = None
+        self._closed = False
+        self._buffer_lock = threading.Lock()
+        self._pending = threading.Condition(self._buffer_lock)
+        self._durable = threading.Condition()
+        self._file_lock = threading.Lock()
+        self._file = open(os.path.join(directory, _segment_name(segment)), "ab")
+        self._writer = threading.Thread(target=self._run, name="wal-writer", daemon=True)
+        self._writer.start()
+    
+    def append(self, record: Tuple[Any, ...]) -> int:
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        frame = FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._pending:
+            self._buffer.append(frame)
+            self._appended += 1
+            if self.sync:
+                self._pending.notify()
+            return self._appended
+    
+    def wait(self, seq: int):
+        """Block until the record numbered `seq` has been fsynced."""
+        with self._durable:
+            while self._flushed < seq:
+                if self._failure is not None:
+                    raise OSError("write-ahead log flush failed") from self._failure
+                self._durable.wait()
+    
+    def _run(self):
+        while True:
+            with self._pending:
+                if self.sync:
+                    while not self._buffer and not self._closed:
+                        self._pending.wait()
+                else:
+                    self._pending.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except BaseException as e:
+                # Fail the waiting writers instead of leaving them blocked
+                with self._durable:
+                    self._failure = e
+                    self._durable.notify_all()
+                raise
+    
+    def _write(self):
+        """Write and fsync the buffer. Caller holds the file lock."""
+        with self._buffer_lock:
+            frames, self._buffer = self._buffer, []
+            seq = self._appended
+        if frames:
+            self._file.write(b"".join(frames))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        with self._durable:
+            self._flushed = max(self._flushed, seq)
+            self._durable.notify_all()
+    
+    def flush(self):
+        """Write and fsync everything appended so far."""
+        with self._file_lock:
+            self._write()
+    
+    def rotate(self) -> int:
+        """Flush the current segment and start a new one. Returns its number."""
+        with self._file_lock:
+            self._write()
+            self._file.close()
+            self.segment += 1
+            self._file = open(os.path.join(self.directory, _segment_name(self.segment)), "ab")
+        return self.segment
+    
+    def close(self):
+        with self._pending:
+            self._closed = True
+            self._pending.notify()
+        self._writer.join()
+        self.flush()
+        self._file.close()
+
+
+class DurableMockStore(MockStore):
+    """
+    MockStore made durable with a write-ahead log and periodic snapshots.
+    
+    Every mutation appends the after-image of the records it changed, so
+    replaying the log is idempotent and does not depend on random IDs or
+    clocks. snapshot() rotates the log, writes the state to disk and deletes
+    the segments it covers. On startup the latest snapshot is loaded and the
+    remaining segments are replayed.
+    
+    With `sync` on, a write returns only once its log records are fsynced;
+    the wait blocks the calling thread, so the store reports itself as
+    blocking and async routes call it from the executor.
+    """
+    
+    def __init__(self, directory: str, flush_interval: float = 0.01, sync: bool = True):
+        self.directory = directory
+        self.blocking = sync
+        self._wal: Optional[WriteAheadLog] = None
+        self._snapshot_lock = threading.Lock()
+        # Held by every logged write, so a snapshot sees whole operations
+        self._state_lock = threading.RLock()
+        self._local = threading.local()
+        os.makedirs(directory, exist_ok=True)
+        fresh = not os.listdir(directory)
+        super().__init__()
+        last_segment = self._recover()
+        self._wal = WriteAheadLog(directory, last_segment + 1, flush_interval, sync)
+        if fresh:
+            # Persist the seeded demo users so restarts keep the same wallet
+            with self._mutation():
+                self._log("reset", self.users)
+    
+    def _log(self, *record: Any):
+        if self._wal is not None:
+            self._local.seq = self._wal.append(record)
+    
+    @contextmanager
+    def _mutation(self) -> Iterator[None]:
+        """
+        Run one logged write under the state lock. The outermost call then
+        waits, outside the lock, for the last record it logged to be durable.
+        """
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self._local.seq = 0
+        self._local.depth = depth + 1
+        try:
+            with self._state_lock:
+                yield
+        finally:
+            self._local.depth = depth
+        if depth == 0 and self._local.seq and self._wal.sync:
+            self._wal.wait(self._local.seq)
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        # One fsync wait for the whole group of writes
+        with self._mutation():
+            yield
+    
+    # ===== RECOVERY =====
+    def _segments(self) -> List[int]:
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                numbers.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+        return sorted(numbers)
+    
+    def _recover(self) -> int:
+        """Load the snapshot and replay the log tail. Returns the last segment number."""
+        first_segment = 0
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "rb") as f:
+                state = pickle.load(f)
+            first_segment = state["segment"]
+            self._load_state(state)
+        
+        # Short IDs can collide, so records are matched on ID and timestamp
+        tx_keys = {(tx["id"], tx["timestamp"]) for tx in self.transactions}
+        segments = [n for n in self._segments() if n >= first_segment]
+        for number in segments:
+            path = os.path.join(self.directory, _segment_name(number))
+            end = 0
+            for record, end in _read_frames(path):
+                self._apply(record, tx_keys)
+            # Drop a torn tail left by a crash mid-write
+            if end != os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(end)
+        
+        self._rebuild_indexes()
+        return segments[-1] if segments else first_segment
+    
+    def _load_state(self, state: Dict[str, Any]):
+        self.users = state["users"]
+        self.policies = state["policies"]
+        self.claims = state["claims"]
+        self.transactions = state["transactions"]
+        self.active_sessions = self._new_session_cache()
+        for token, session in state["sessions"].items():
+            self.active_sessions.put(token, session)
+        self.revoked_tokens.update(state.get("revoked", {}))
+        self.chain_events.update(state.get("chainEvents", {}))
+        self.chain_state.update(state.get("chainState", {}))
+        self.chain_checkpoints.update(state.get("chainCheckpoints", {}))
+        # Never lowered, so serials stay unique across resets (see _next_nft_id)
+        self.nft_serial = max(self.nft_serial, state.get("nftSerial", self.nft_serial))
+        self.telemetry_events = {}
+        for event in state.get("telemetry", []):
+            self.telemetry_events.setdefault(event["userId"], []).append(event)
+        self.notifications = {}
+        self.unread_notifications = {}
+        for notification in state["notifications"]:
+            self._add_notification(notification)
+    
+    def _apply(self, record: Tuple[Any, ...], tx_keys: set):
+        kind = record[0]
+        if kind == "reset":
+            self._load_state({
+                "users": record[1],
+                "policies": {},
+                "claims": {},
+                "transactions": [],
+                "sessions": {},
+                "notifications": [],
+            })
+            tx_keys.clear()
+        elif kind == "user":
+            self.users[record[1]["id"]] = record[1]
+        elif kind == "policy":
+            self.policies[record[1]["id"]] = record[1]
+        elif kind == "claim":
+            self.claims[record[1]["id"]] = record[1]
+        elif kind == "tx":
+            key = (record[1]["id"], record[1]["timestamp"])
+            if key not in tx_keys:
+                tx_keys.add(key)
+                self.transactions.append(record[1])
+        elif kind == "notification":
+            notification = record[1]
+            inbox = self.notifications.get(notification["userId"]) or []
+            if all(
+                (n["id"], n["createdAt"]) != (notification["id"], notification["createdAt"])
+                for n in inbox
+            ):
+                self._add_notification(notification)
+        elif kind == "telemetry":
+            event = record[1]
+            events = self.telemetry_events.setdefault(event["userId"], [])
+            if all(e["id"] != event["id"] or e["createdAt"] != event["createdAt"] for e in events):
+                events.append(event)
+        elif kind == "read":
+            self.mark_notifications_read(record[1], record[2])
+        elif kind == "session":
+            self.active_sessions.put(record[1], record[2])
+        elif kind == "logout":
+            self.active_sessions.pop(record[1])
+        elif kind == "revoke":
+            self.revoked_tokens[record[1]] = record[2]
+        elif kind == "chain":
+            self.record_chain_events(record[1], record[2], record[3])
+        elif kind == "nft":
+            self.nft_serial = max(self.nft_serial, record[1])
+    
+    # ===== SNAPSHOTS =====
+    def snapshot(self) -> int:
+        """
+        Write a snapshot and delete the log segments it makes redundant.
+        
+        Records mutated while the snapshot is being written are also in the
+        new log segment, so replaying that segment on top of the snapshot
+        restores them exactly. The state is pickled under the state lock, so
+        records are not changed halfway through; writes wait for that, but
+        not for the file write and fsync.
+        """
+        with self._snapshot_lock:
+            with self._state_lock:
+                segment = self._wal.rotate()
+                data = pickle.dumps({
+                    "segment": segment,
+                    "users": self.users,
+                    "policies": self.policies,
+                    "claims": self.claims,
+                    "transactions": self.transactions,
+                    "sessions": dict(self.active_sessions.items()),
+                    "revoked": self.revoked_tokens,
+                    "chainEvents": self.chain_events,
+                    "chainState": self.chain_state,
+                    "chainCheckpoints": self.chain_checkpoints,
+                    "nftSerial": self.nft_serial,
+                    "notifications": [
+                        n for inbox in self.notifications.values() for n in inbox
+                    ],
+                    "telemetry": [
+                        e for events in self.telemetry_events.values() for e in events
+                    ],
+                }, protocol=pickle.HIGHEST_PROTOCOL)
+            path = os.path.join(self.directory, SNAPSHOT_FILE)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+            for number in self._segments():
+                if number < segment:
+                    os.remove(os.path.join(self.directory, _segment_name(number)))
+            return segment
+    
+    def close(self):
+        if self._wal is not None:
+            self._wal.close()
+    
+    # ===== LOGGED MUTATIONS =====
+    # Public writes take the state lock before any MockStore lock. So do the
+    # reads that can expire a policy, since they log it under the expiry lock
+    def reset(self):
+        with self._mutation():
+            super().reset()
+            self._log("reset", self.users)
+    
+    def _next_nft_id(self) -> str:
+        # Logged on its own: after a reset, or once the newest policies are
+        # gone, the surviving policies no longer show the highest serial issued
+        with self._nft_lock:
+            self.nft_serial += 1
+            self._log("nft", self.nft_serial)
+            return format_nft_id(self.nft_serial)
+    
+    def update_user(self, user_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._mutation():
+            user = super().update_user(user_id, data)
+            self._log("user", user)
+            return user
+    
+    def create_policy(
+        self,
+        user_id: str,
+        duration_hours: int,
+        premium_paid: int,
+        policy_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        with self._mutation():
+            policy = super().create_policy(user_id, duration_hours, premium_paid, policy_id)
+            self._log("policy", policy)
+            return policy
+    
+    def update_policy(self, policy_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._mutation():
+            policy = super().update_policy(policy_id, data)
+            self._log("policy", policy)
+            return policy
+    
+    def get_active_policy(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._mutation():
+            return super().get_active_policy(user_id)
+    
+    def expire_due_policies(self, now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+        with self._mutation():
+            return super().expire_due_policies(now, batch_size)
+    
+    def _expire(self, policy_id: str) -> Dict[str, Any]:
+        policy = super()._expire(policy_id)
+        self._log("policy", policy)
+        return policy
+    
+    def create_claim(self, policy_id: str, description: str = "") -> Dict[str, Any]:
+        with self._mutation():
+            claim = super().create_claim(policy_id, description)
+            self._log("claim", claim)
+            return claim
+    
+    def import_claims(self, claims: List[Dict[str, Any]]) -> List[Optional[str]]:
+        with self._mutation():
+            errors = super().import_claims(claims)
+            for claim, error in zip(claims, errors):
+                if error is None:
+                    self._log("claim", claim)
+            return errors
+    
+    def approve_claim(self, claim_id: str, payout_amount: int) -> Dict[str, Any]:
+        with self._mutation():
+            claim = super().approve_claim(claim_id, payout_amount)
+            self._log("claim", claim)
+            return claim
+    
+    def update_claim(self, claim_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._mutation():
+            claim = super().update_claim(claim_id, data)
+            self._log("claim", claim)
+            return claim
+    
+    def post_transaction(
+        self, user_id: str, tx_type: str, amount: int, reference_id: str = ""
+    ) -> Dict[str, Any]:
+        with self._mutation():
+            return super().post_transaction(user_id, tx_type, amount, reference_id)
+    
+    def _append_transaction(self, tx: Dict[str, Any]):
+        super()._append_transaction(tx)
+        # Logged under the balance lock so replay sees postings in order
+        self._log("tx", tx)
+        self._log("user", self.users[tx["userId"]])
+    
+    def create_notification(
+        self,
+        user_id: str,
+        title: str,
+        message: str,
+        notification_type: str = "info",
+    ) -> Dict[str, Any]:
+        with self._mutation():
+            notification = super().create_notification(user_id, title, message, notification_type)
+            self._log("notification", notification)
+            return notification
+    
+    def mark_notifications_read(
+        self, user_id: str, notification_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        ids = list(notification_ids) if notification_ids is not None else None
+        with self._mutation():
+            marked = super().mark_notifications_read(user_id, ids)
+            if marked:
+                self._log("read", user_id, ids)
+            return marked
+    
+    def record_telemetry_event(
+        self, user_id: str, event_type: str, policy_id: str = ""
+    ) -> Dict[str, Any]:
+        with self._mutation():
+            event = super().record_telemetry_event(user_id, event_type, policy_id)
+            self._log("telemetry", event)
+            return event
+    
+    def create_session(self, user_id: str, token: str) -> Dict[str, Any]:
+        with self._mutation():
+            session = super().create_session(user_id, token)
+            self._log("session", token, session)
+            return session
+    
+    def invalidate_session(self, token: str) -> bool:
+        with self._mutation():
+            removed = super().invalidate_session(token)
+            if removed:
+                self._log("logout", token)
+            return removed
+    
+    def revoke_token(self, token_id: str, expires_at: datetime):
+        with self._mutation():
+            super().revoke_token(token_id, expires_at)
+            self._log("revoke", token_id, expires_at)
+    
+    def record_chain_events(
+        self, events: List[Dict[str, Any]], checkpoint_name: str, checkpoint_block: int
+    ) -> int:
+        with self._mutation():
+            recorded = super().record_chain_events(events, checkpoint_name, checkpoint_block)
+            self._log("chain", events, checkpoint_name, checkpoint_block)
+            return recorded
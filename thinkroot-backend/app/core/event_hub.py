@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.mock_store import mock_store
+
+# Collections whose changes are pushed to subscribers (telemetry is too
+# chatty to be worth a push)
+PUSHED_COLLECTIONS = ("user", "wallet", "policy", "claim", "notification")
+
+
+class Subscription:
+    """
+    One stream's pending changes.
+    
+    A bounded queue of changed collection names that drops its oldest entries
+    when a slow reader falls behind. `dropped` tells the reader it missed
+    some, so it can resend everything instead.
+    """
+    
+    def __init__(self, user_id: str, size: int):
+        self.user_id = user_id
+        self.pending: Deque[str] = deque(maxlen=size)
+        self.dropped = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+    
+    def push(self, collection: str) -> bool:
+        """Queue a change; True if it pushed the oldest one out."""
+        full = len(self.pending) == self.pending.maxlen
+        self.dropped += full
+        self.pending.append(collection)
+        self._wakeup.set()
+        return full
+    
+    def close(self):
+        """Wake the reader for good, e.g. once its client has disconnected."""
+        self.closed = True
+        self._wakeup.set()
+    
+    async def next(self, timeout: float) -> Tuple[List[str], int]:
+        """Wait up to `timeout` seconds for changes; returns (collections, dropped)."""
+        if not self.pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+        changes, dropped = list(self.pending), self.dropped
+        self.pending.clear()
+        self.dropped = 0
+        return changes, dropped
+
+
+class EventHub:
+    """
+    In-process pub/sub from store writes to open push streams.
+    
+    The store calls publish() after every write, from whichever thread made
+    it; delivery always happens on the event loop. A subscriber costs one
+    small queue and one asyncio.Event while idle, so one loop can hold
+    thousands. Each process has its own hub: with several workers, a stream
+    only hears about writes made by its own worker.
+    """
+    
+    def __init__(
+        self,
+        queue_size: int = settings.PUSH_QUEUE_SIZE,
+        max_subscribers: int = settings.PUSH_MAX_SUBSCRIBERS,
+    ):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.subscribers = 0
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+    
+    def start(self):
+        """Deliver on the running event loop from now on."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+    
+    def stop(self):
+        self._loop = None
+    
+    def subscribe(self, user_id: str) -> Optional[Subscription]:
+        """Open a subscription, or None when the hub is full."""
+        if self.subscribers >= self.max_subscribers:
+            return None
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        self.subscribers += 1
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscribers.get(subscription.user_id)
+        if subscriptions and subscription in subscriptions:
+            subscriptions.remove(subscription)
+            self.subscribers -= 1
+            if not subscriptions:
+                del self._subscribers[subscription.user_id]
+    
+    def publish(self, user_id: str, collections: Tuple[str, ...]):
+        """Store listener: queue the user's changed collections for their streams."""
+        loop = self._loop
+        if loop is None or user_id not in self._subscribers:
+            return
+        pushed = [collection for collection in collections if collection in PUSHED_COLLECTIONS]
+        if not pushed:
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._deliver(user_id, pushed)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._deliver, user_id, pushed)
+            except RuntimeError:
+                pass  # loop closed during shutdown
+    
+    def _deliver(self, user_id: str, collections: List[str]):
+        self.published += 1
+        for subscription in self._subscribers.get(user_id, ()):
+            for collection in collections:
+                self.dropped += subscription.push(collection)
+                self.delivered += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "users": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+# Global hub, fed by the configured store and started by the app's lifespan
+event_hub = EventHub()
+mock_store.add_listener(event_hub.publish)
@@ -0,0 +1,99 @@
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.core.contracts import CONTRACT_NAMES, EVENT_TOPICS, decode_log
+from app.core.storage import Storage
+from app.utils.rpc import RpcError
+
+
+class ChainIndexer:
+    """
+    Copies contract events from a JSON-RPC node into the store.
+    
+    Each sync() walks from the block after the stored checkpoint up to the
+    chain head (minus `confirmations`) in ranges. The range adapts: it halves
+    when the node rejects a query (too many results, range too large,
+    timeout) or returns more than `target_logs` logs. It doubles, up to
+    `max_batch_blocks`, while batches come back light. Each batch's events
+    and the new checkpoint are committed in one store write, so a restart
+    resumes after the last committed batch and never skips or double-counts
+    events.
+    
+    `rpc` is anything with block_number() and get_logs(): a JsonRpcClient
+    for a live node or a RecordedRpc replaying a fixture.
+    """
+    
+    def __init__(
+        self,
+        rpc: Any,
+        store: Storage,
+        addresses: List[str],
+        name: str = "contracts",
+        start_block: int = settings.CHAIN_START_BLOCK,
+        confirmations: int = settings.CHAIN_CONFIRMATIONS,
+        batch_blocks: int = settings.CHAIN_BATCH_BLOCKS,
+        max_batch_blocks: int = settings.CHAIN_MAX_BATCH_BLOCKS,
+        target_logs: int = settings.CHAIN_TARGET_LOGS,
+    ):
+        if not addresses:
+            raise ValueError("No contract addresses to index")
+        self.rpc = rpc
+        self.store = store
+        self.addresses = [a.lower() for a in addresses]
+        self.name = name
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.batch_blocks = max(1, min(batch_blocks, max_batch_blocks))
+        self.max_batch_blocks = max_batch_blocks
+        self.target_logs = target_logs
+    
+    def next_block(self) -> int:
+        checkpoint = self.store.get_chain_checkpoint(self.name)
+        return self.start_block if checkpoint is None else checkpoint + 1
+    
+    def sync(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Index up to the current safe head (or `max_batches` batches)."""
+        head = self.rpc.block_number() - self.confirmations
+        block = self.next_block()
+        batches = events = retries = 0
+        while block <= head and (max_batches is None or batches < max_batches):
+            to_block = min(block + self.batch_blocks - 1, head)
+            try:
+                logs = self.rpc.get_logs(self.addresses, EVENT_TOPICS, block, to_block)
+            except RpcError:
+                if self.batch_blocks == 1:
+                    raise
+                self.batch_blocks = max(1, (to_block - block + 1) // 2)
+                retries += 1
+                continue
+            decoded = [event for event in map(decode_log, logs) if event is not None]
+            decoded.sort(key=lambda e: (e["blockNumber"], e["logIndex"]))
+            events += self.store.record_chain_events(decoded, self.name, to_block)
+            batches += 1
+            block = to_block + 1
+            if len(logs) > self.target_logs:
+                self.batch_blocks = max(1, self.batch_blocks // 2)
+            elif len(logs) < self.target_logs // 2:
+                self.batch_blocks = min(self.max_batch_blocks, self.batch_blocks * 2)
+        return {
+            "batches": batches,
+            "events": events,
+            "retries": retries,
+            "checkpoint": block - 1,
+            "head": head,
+        }
+
+
+def load_contracts(deployment: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """
+    Contract name -> address to index: from a deployment-addresses.json
+    written by scripts/deploy.js if given, else from the *_ADDRESS settings.
+    """
+    if deployment is not None:
+        contracts = deployment["contracts"]
+    else:
+        contracts = {
+            "InsurancePolicy": settings.INSURANCE_POLICY_ADDRESS,
+            "ClaimPayout": settings.CLAIM_PAYOUT_ADDRESS,
+            "ReputationScore": settings.REPUTATION_SCORE_ADDRESS,
+        }
+    return {name: contracts[name] for name in CONTRACT_NAMES if contracts.get(name)}
@@ -0,0 +1,40 @@
+from typing import Any, Dict, Tuple
+
+# Every transaction is a double-entry posting between a user's wallet account
+# and one system account. A posting debits one account and credits the other
+# by the same amount; an account's balance is its credits minus its debits.
+WALLET_PREFIX = "wallet:"
+SYSTEM_PREFIX = "system:"
+
+# Transaction type -> (system account, True if the wallet is debited)
+POSTING_TYPES: Dict[str, Tuple[str, bool]] = {
+    "premium": (SYSTEM_PREFIX + "premiums", True),
+    "claim": (SYSTEM_PREFIX + "claims", False),
+    "topup": (SYSTEM_PREFIX + "funding", False),
+    "refund": (SYSTEM_PREFIX + "premiums", False),
+}
+
+
+def wallet_account(user_id: str) -> str:
+    return WALLET_PREFIX + user_id
+
+
+def posting_accounts(user_id: str, tx_type: str) -> Tuple[str, str]:
+    """Return the (debit, credit) accounts for a transaction type."""
+    if tx_type not in POSTING_TYPES:
+        raise ValueError(f"Unknown transaction type: {tx_type}")
+    system, debits_wallet = POSTING_TYPES[tx_type]
+    wallet = wallet_account(user_id)
+    return (wallet, system) if debits_wallet else (system, wallet)
+
+
+def wallet_delta(tx: Dict[str, Any]) -> int:
+    """Signed change a posting made to its user's wallet balance."""
+    return tx["amount"] if tx["creditAccount"] == wallet_account(tx["userId"]) else -tx["amount"]
+
+
+def system_account(tx: Dict[str, Any]) -> str:
+    """The system side of a posting."""
+    if tx["creditAccount"] == wallet_account(tx["userId"]):
+        return tx["debitAccount"]
+    return tx["creditAccount"]
@@ -1,63 +1,235 @@
+import heapq
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple
+from app.core.config import settings
+from app.core.contracts import apply_event
+from app.core.ledger import (
+    WALLET_PREFIX,
+    posting_accounts,
+    system_account,
+    wallet_account,
+    wallet_delta,
+)
+from app.core.reputation import (
+    TELEMETRY_COUNTERS,
+    empty_counters,
+    policy_deltas,
+)
+from app.core.storage import (
+    VERSIONED_COLLECTIONS,
+    InsufficientBalanceError,
+    Storage,
+    initial_users,
+)
 from app.utils.ids import (
+    FIRST_NFT_SERIAL,
     generate_user_id,
     generate_policy_id,
     generate_claim_id,
     generate_transaction_id,
-    generate_nft_id,
-    generate_wallet_address,
+    generate_event_id,
+    format_nft_id,
     generate_tx_hash,
+    nft_serial,
 )
+from app.utils.pagination import decode_cursor, encode_cursor, page_newest_first
+from app.utils.ring_buffer import RingBuffer
+from app.utils.session_cache import SessionCache
+
+# Balance updates are guarded by one of these locks, picked by user ID, so
+# concurrent requests for different users rarely contend.
+LOCK_STRIPES = 64
 
 
-class MockStore:
+class MockStore(Storage):
     """In-memory mock database for ParaCipher MVP."""
     
     def __init__(self):
+        self._expiry_lock = threading.Lock()
+        self._balance_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._ledger_lock = threading.Lock()
+        self._reputation_lock = threading.Lock()
+        self._version_lock = threading.Lock()
+        self._nft_lock = threading.Lock()
+        # Last NFT serial handed out; kept across reset() so serials never repeat
+        self.nft_serial = FIRST_NFT_SERIAL - 1
+        # Per-user collection versions; kept across reset() so they never repeat
+        self.versions: Dict[str, Dict[str, int]] = {}
+        self.version_epoch = uuid.uuid4().hex[:8]
+        # Revoked token ID -> token expiry; kept across reset() like the tokens
+        self.revoked_tokens: Dict[str, datetime] = {}
+        # Indexed contract events (by "<txHash>:<logIndex>"), per-wallet chain
+        # state and indexer checkpoints; chain data is kept across reset()
+        self._chain_lock = threading.Lock()
+        self.chain_events: Dict[str, Dict[str, Any]] = {}
+        self.chain_state: Dict[str, Dict[str, Any]] = {}
+        self.chain_checkpoints: Dict[str, int] = {}
+        self.listeners: List[Callable[[str, Tuple[str, ...]], None]] = []
+        # Listener calls held back until the thread leaves a locked section
+        self._deferred = threading.local()
         self.reset()
     
     def reset(self):
         """Reset all mock data to initial state."""
-        wallet_address = generate_wallet_address()
-        
-        self.users: Dict[str, Any] = {
-            "user_001": {
-                "id": "user_001",
-                "walletAddress": wallet_address,
-                "kycStatus": "verified",
-                "sbtScore": 50,
-                "balance": 1000,
-                "createdAt": (datetime.now() - timedelta(days=7)).isoformat(),
-            }
-        }
+        self.users: Dict[str, Any] = initial_users()
         
         self.policies: Dict[str, Any] = {}
         self.claims: Dict[str, Any] = {}
         self.transactions: List[Dict[str, Any]] = []
-        self.notifications: List[Dict[str, Any]] = []
-        self.active_sessions: Dict[str, Dict[str, Any]] = {}
+        # Per-user bounded notification inbox and unread counter
+        self.notifications: Dict[str, RingBuffer] = {}
+        self.unread_notifications: Dict[str, int] = {}
+        self.active_sessions = self._new_session_cache()
+        # Raw telemetry events per user
+        self.telemetry_events: Dict[str, List[Dict[str, Any]]] = {}
+        
+        # Secondary indexes (rebuilt from the primary collections above)
+        self._rebuild_indexes()
+        for user_id in set(self.versions) | set(self.users):
+            self._bump(user_id, *VERSIONED_COLLECTIONS)
+    
+    def _new_session_cache(self) -> SessionCache:
+        return SessionCache(settings.SESSION_CACHE_SIZE, timedelta(hours=settings.JWT_EXPIRY))
+    
+    def _rebuild_indexes(self):
+        """Rebuild user/policy lookup indexes from the primary collections."""
+        self.user_policies: Dict[str, List[str]] = {}
+        self.policy_claims: Dict[str, List[str]] = {}
+        self.user_transactions: Dict[str, List[Dict[str, Any]]] = {}
+        self.user_transactions_by_type: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        # Cached system account balances; wallet balances live on the user
+        self.account_balances: Dict[str, int] = {}
+        # Per-user reputation counters
+        self.reputation_counters: Dict[str, Dict[str, int]] = {}
+        
+        # Expiry schedule: min-heap of (coverage end, policy id), the
+        # scheduled coverage end of every active policy, and a per-user
+        # pointer to the policy get_active_policy should return.
+        self.expiry_heap: List[Tuple[datetime, str]] = []
+        self.policy_expiry: Dict[str, datetime] = {}
+        self.active_policy_ids: Dict[str, str] = {}
+        
+        for policy in self.policies.values():
+            self.nft_serial = max(self.nft_serial, nft_serial(policy["nftId"]))
+            self._index_policy(policy)
+            self._count(policy["userId"], policy_deltas(policy))
+            if policy["status"] == "active":
+                self._schedule_expiry(policy)
+        for claim in self.claims.values():
+            self._index_claim(claim)
+            if claim["status"] == "paid":
+                self._count_paid_claim(claim)
+        for tx in self.transactions:
+            self._index_transaction(tx)
+        for events in self.telemetry_events.values():
+            for event in events:
+                self._count(event["userId"], {TELEMETRY_COUNTERS[event["type"]]: 1})
+    
+    def _index_policy(self, policy: Dict[str, Any]):
+        self.user_policies.setdefault(policy["userId"], []).append(policy["id"])
+    
+    def _schedule_expiry(self, policy: Dict[str, Any]):
+        coverage_end = policy["coverageEnd"]
+        with self._expiry_lock:
+            heapq.heappush(self.expiry_heap, (coverage_end, policy["id"]))
+            self.policy_expiry[policy["id"]] = coverage_end
+            self.active_policy_ids.setdefault(policy["userId"], policy["id"])
+    
+    def _index_claim(self, claim: Dict[str, Any]):
+        self.policy_claims.setdefault(claim["policyId"], []).append(claim["id"])
+    
+    def _index_transaction(self, tx: Dict[str, Any]):
+        self.user_transactions.setdefault(tx["userId"], []).append(tx)
+        by_type = self.user_transactions_by_type.setdefault(tx["userId"], {})
+        by_type.setdefault(tx["type"], []).append(tx)
+        account = system_account(tx)
+        with self._ledger_lock:
+            self.account_balances[account] = self.account_balances.get(account, 0) - wallet_delta(tx)
+    
+    def _count(self, user_id: str, deltas: Dict[str, int]):
+        with self._reputation_lock:
+            counters = self.reputation_counters.setdefault(user_id, empty_counters())
+            for counter, delta in deltas.items():
+                counters[counter] += delta
+    
+    def _count_paid_claim(self, claim: Dict[str, Any]):
+        policy = self.policies.get(claim["policyId"])
+        if policy:
+            self._count(policy["userId"], {"successfulClaims": 1})
+    
+    def _bump(self, user_id: str, *collections: str):
+        """Bump the user's collection versions. Called after the write is visible."""
+        with self._version_lock:
+            versions = self.versions.setdefault(user_id, {})
+            for collection in collections:
+                versions[collection] = versions.get(collection, 0) + 1
+        pending = getattr(self._deferred, "events", None)
+        if pending is not None:
+            pending.append((user_id, collections))
+            return
+        for listener in self.listeners:
+            listener(user_id, collections)
+    
+    @contextmanager
+    def _deferred_events(self) -> Iterator[None]:
+        """
+        Hold back listener calls made in the block and make them after it.
+        
+        Wrap sections that hold a store lock, so listeners never run (or
+        call back into the store) while it is held.
+        """
+        if getattr(self._deferred, "events", None) is not None:
+            yield
+            return
+        self._deferred.events = []
+        try:
+            yield
+        finally:
+            events, self._deferred.events = self._deferred.events, None
+            for user_id, collections in events:
+                for listener in self.listeners:
+                    listener(user_id, collections)
+    
+    def _bump_claim(self, claim: Dict[str, Any]):
+        policy = self.policies.get(claim["policyId"])
+        if policy:
+            self._bump(policy["userId"], "claim")
     
     # ===== USER OPERATIONS =====
     def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
         return self.users.get(user_id)
     
+    def get_user_ids(self) -> List[str]:
+        return list(self.users)
+    
     def update_user(self, user_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         if user_id not in self.users:
             raise ValueError(f"User {user_id} not found")
         self.users[user_id].update(data)
+        self._bump(user_id, "user")
         return self.users[user_id]
     
-    def update_balance(self, user_id: str, amount: int) -> int:
-        user = self.get_user(user_id)
-        if not user:
-            raise ValueError(f"User {user_id} not found")
-        user["balance"] += amount
-        return user["balance"]
+    def _balance_lock(self, user_id: str) -> threading.Lock:
+        return self._balance_locks[hash(user_id) % LOCK_STRIPES]
+    
+    def _next_nft_id(self) -> str:
+        with self._nft_lock:
+            self.nft_serial += 1
+            return format_nft_id(self.nft_serial)
     
     # ===== POLICY OPERATIONS =====
-    def create_policy(self, user_id: str, duration_hours: int, premium_paid: int) -> Dict[str, Any]:
-        policy_id = generate_policy_id()
+    def create_policy(
+        self,
+        user_id: str,
+        duration_hours: int,
+        premium_paid: int,
+        policy_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        policy_id = policy_id or generate_policy_id()
         now = datetime.now()
         coverage_end = now + timedelta(hours=duration_hours)
         
@@ -67,41 +239,106 @@ class MockStore:
             "durationHours": duration_hours,
             "premiumPaid": premium_paid,
             "status": "active",
-            "nftId": generate_nft_id(),
-            "coverageStart": now.isoformat(),
-            "coverageEnd": coverage_end.isoformat(),
-            "createdAt": now.isoformat(),
+            "nftId": self._next_nft_id(),
+            "coverageStart": now,
+            "coverageEnd": coverage_end,
+            "createdAt": now,
         }
         
         self.policies[policy_id] = policy
+        self._index_policy(policy)
+        self._count(user_id, policy_deltas(policy))
+        self._schedule_expiry(policy)
+        self._bump(user_id, "policy")
         return policy
     
     def get_policy(self, policy_id: str) -> Optional[Dict[str, Any]]:
         return self.policies.get(policy_id)
     
     def get_user_policies(self, user_id: str) -> List[Dict[str, Any]]:
-        return [p for p in self.policies.values() if p["userId"] == user_id]
+        return [self.policies[pid] for pid in self.user_policies.get(user_id, [])]
     
     def get_active_policy(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get the active policy for a user (if any)."""
-        policies = self.get_user_policies(user_id)
-        for policy in policies:
-            if policy["status"] == "active":
-                coverage_end = datetime.fromisoformat(policy["coverageEnd"])
-                if coverage_end > datetime.now():
-                    return policy
-            # Auto-expire if coverage period ended
-            if policy["status"] == "active":
-                coverage_end = datetime.fromisoformat(policy["coverageEnd"])
-                if coverage_end <= datetime.now():
-                    policy["status"] = "expired"
+        with self._deferred_events(), self._expiry_lock:
+            policy_id = self.active_policy_ids.get(user_id)
+            if policy_id is None:
+                return None
+            if self.policy_expiry[policy_id] > datetime.now():
+                return self.policies[policy_id]
+            # The sweeper has not reached this policy yet - expire it now
+            self._expire(policy_id)
+            policy_id = self._advance_active_policy(user_id)
+            return self.policies[policy_id] if policy_id else None
+    
+    def expire_due_policies(self, now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+        """
+        Expire up to batch_size policies whose coverage has ended.
+        
+        Called periodically by the background sweeper. Returns the number of
+        policies that were expired.
+        """
+        now = now or datetime.now()
+        expired = 0
+        with self._deferred_events(), self._expiry_lock:
+            while self.expiry_heap and expired < batch_size:
+                coverage_end, policy_id = self.expiry_heap[0]
+                if coverage_end > now:
+                    break
+                heapq.heappop(self.expiry_heap)
+                # Skip stale entries (rescheduled or no longer active)
+                if self.policy_expiry.get(policy_id) != coverage_end:
+                    continue
+                policy = self._expire(policy_id)
+                expired += 1
+                if self.active_policy_ids.get(policy["userId"]) == policy_id:
+                    self._advance_active_policy(policy["userId"])
+        return expired
+    
+    def _expire(self, policy_id: str) -> Dict[str, Any]:
+        policy = self.policies[policy_id]
+        policy["status"] = "expired"
+        self.policy_expiry.pop(policy_id, None)
+        self._bump(policy["userId"], "policy")
+        return policy
+    
+    def _advance_active_policy(self, user_id: str) -> Optional[str]:
+        """
+        Point the user at their next still-active policy. Caller holds the
+        expiry lock, inside _deferred_events().
+        """
+        now = datetime.now()
+        for policy_id in self.user_policies.get(user_id, []):
+            coverage_end = self.policy_expiry.get(policy_id)
+            if coverage_end is None:
+                continue
+            if coverage_end > now:
+                self.active_policy_ids[user_id] = policy_id
+                return policy_id
+            self._expire(policy_id)
+        self.active_policy_ids.pop(user_id, None)
         return None
     
     def update_policy(self, policy_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         if policy_id not in self.policies:
             raise ValueError(f"Policy {policy_id} not found")
-        self.policies[policy_id].update(data)
-        return self.policies[policy_id]
+        policy = self.policies[policy_id]
+        previous_user = policy["userId"]
+        policy.update(data)
+        if policy["userId"] != previous_user:
+            self.user_policies[previous_user].remove(policy_id)
+            self._index_policy(policy)
+        if policy["status"] == "active" and {"status", "coverageEnd"} & data.keys():
+            self._schedule_expiry(policy)
+        with self._deferred_events(), self._expiry_lock:
+            if policy["status"] != "active":
+                self.policy_expiry.pop(policy_id, None)
+            if {"userId", "status", "coverageEnd"} & data.keys():
+                for affected_user in {previous_user, policy["userId"]}:
+                    self._advance_active_policy(affected_user)
+        for affected_user in {previous_user, policy["userId"]}:
+            self._bump(affected_user, "policy")
+        return policy
     
     # ===== CLAIM OPERATIONS =====
     def create_claim(self, policy_id: str, description: str = "") -> Dict[str, Any]:
@@ -113,63 +350,177 @@ class MockStore:
             "policyId": policy_id,
             "status": "pending",
             "description": description,
-            "createdAt": now.isoformat(),
+            "createdAt": now,
             "payoutAmount": None,
             "payoutTxHash": None,
             "payoutDate": None,
+            "source": "api",
         }
         
         self.claims[claim_id] = claim
+        self._index_claim(claim)
+        self._bump_claim(claim)
         return claim
     
+    def import_claims(self, claims: List[Dict[str, Any]]) -> List[Optional[str]]:
+        errors: List[Optional[str]] = []
+        for claim in claims:
+            if claim["policyId"] not in self.policies:
+                errors.append(f"Policy {claim['policyId']} not found")
+            elif claim["id"] in self.claims:
+                errors.append(f"Claim {claim['id']} already exists")
+            else:
+                claim["source"] = "import"
+                self.claims[claim["id"]] = claim
+                self._index_claim(claim)
+                if claim["status"] == "paid":
+                    self._count_paid_claim(claim)
+                self._bump_claim(claim)
+                errors.append(None)
+        return errors
+    
     def get_claim(self, claim_id: str) -> Optional[Dict[str, Any]]:
         return self.claims.get(claim_id)
     
+    def get_unfinished_claims(self) -> List[Dict[str, Any]]:
+        return [
+            claim for claim in self.claims.values()
+            if claim["status"] in ("pending", "approved") and claim.get("source") == "api"
+        ]
+    
     def get_policy_claims(self, policy_id: str) -> List[Dict[str, Any]]:
-        return [c for c in self.claims.values() if c["policyId"] == policy_id]
+        return [self.claims[cid] for cid in self.policy_claims.get(policy_id, [])]
+    
+    def get_user_claims(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all claims filed against any of a user's policies."""
+        claims = []
+        for policy_id in self.user_policies.get(user_id, []):
+            claims.extend(self.get_policy_claims(policy_id))
+        return claims
     
     def approve_claim(self, claim_id: str, payout_amount: int) -> Dict[str, Any]:
         claim = self.get_claim(claim_id)
         if not claim:
             raise ValueError(f"Claim {claim_id} not found")
         
+        if claim["status"] != "paid":
+            self._count_paid_claim(claim)
         claim.update({
             "status": "paid",
             "payoutAmount": payout_amount,
             "payoutTxHash": generate_tx_hash(),
-            "payoutDate": datetime.now().isoformat(),
+            "payoutDate": datetime.now(),
         })
+        self._bump_claim(claim)
         return claim
     
-    # ===== TRANSACTION OPERATIONS =====
-    def create_transaction(
-        self,
-        user_id: str,
-        tx_type: str,
-        amount: int,
-        status: str = "success",
-        reference_id: str = "",
+    def update_claim(self, claim_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        claim = self.get_claim(claim_id)
+        if not claim:
+            raise ValueError(f"Claim {claim_id} not found")
+        claim.update(data)
+        self._bump_claim(claim)
+        return claim
+    
+    # ===== LEDGER OPERATIONS =====
+    def post_transaction(
+        self, user_id: str, tx_type: str, amount: int, reference_id: str = ""
     ) -> Dict[str, Any]:
-        now = datetime.now()
-        tx = {
-            "id": generate_transaction_id(),
-            "userId": user_id,
-            "type": tx_type,  # "premium", "claim", "refund"
-            "amount": amount,
-            "status": status,
-            "timestamp": now.isoformat(),
-            "referenceHash": generate_tx_hash() if status == "success" else None,
-            "referenceId": reference_id,
-        }
+        user = self.get_user(user_id)
+        if not user:
+            raise ValueError(f"User {user_id} not found")
+        if amount <= 0:
+            raise ValueError("Transaction amount must be positive")
+        debit_account, credit_account = posting_accounts(user_id, tx_type)
+        delta = amount if credit_account == wallet_account(user_id) else -amount
         
-        self.transactions.append(tx)
+        # The user's lock orders their postings, so balanceAfter is a running
+        # balance over user_transactions
+        with self._deferred_events(), self._balance_lock(user_id):
+            if user["balance"] + delta < 0:
+                raise InsufficientBalanceError(f"Insufficient balance for user {user_id}")
+            user["balance"] += delta
+            tx = {
+                "id": generate_transaction_id(),
+                "userId": user_id,
+                "type": tx_type,  # "premium", "claim", "topup", "refund"
+                "amount": amount,
+                "status": "success",
+                "timestamp": datetime.now(),
+                "referenceHash": generate_tx_hash(),
+                "referenceId": reference_id,
+                "debitAccount": debit_account,
+                "creditAccount": credit_account,
+                "balanceAfter": user["balance"],
+            }
+            self._append_transaction(tx)
         return tx
     
-    def get_user_transactions(self, user_id: str, tx_filter: str = "") -> List[Dict[str, Any]]:
-        txs = [t for t in self.transactions if t["userId"] == user_id]
+    def _append_transaction(self, tx: Dict[str, Any]):
+        """Store a posting. Caller holds the user's balance lock."""
+        self.transactions.append(tx)
+        self._index_transaction(tx)
+        self._bump(tx["userId"], "wallet")
+    
+    def get_account_balance(self, account: str) -> int:
+        if account.startswith(WALLET_PREFIX):
+            user = self.get_user(account[len(WALLET_PREFIX):])
+            return user["balance"] if user else 0
+        return self.account_balances.get(account, 0)
+    
+    def get_balance_at(self, user_id: str, at: datetime) -> int:
+        """Read the running balance of the user's last posting at or before `at`."""
+        user = self.get_user(user_id)
+        if not user:
+            raise ValueError(f"User {user_id} not found")
+        log = self.user_transactions.get(user_id, [])
+        position = bisect_right(log, at, key=lambda tx: tx["timestamp"])
+        if position:
+            return log[position - 1]["balanceAfter"]
+        if log:
+            # Before the first posting: its opening balance
+            return log[0]["balanceAfter"] - wallet_delta(log[0])
+        return user["balance"]
+    
+    # ===== TRANSACTION OPERATIONS =====
+    def _user_transaction_log(self, user_id: str, tx_filter: str = "") -> List[Dict[str, Any]]:
+        """Per-user transactions in append (and therefore timestamp) order."""
         if tx_filter:
-            txs = [t for t in txs if t["type"] == tx_filter]
-        return sorted(txs, key=lambda x: x["timestamp"], reverse=True)
+            return self.user_transactions_by_type.get(user_id, {}).get(tx_filter, [])
+        return self.user_transactions.get(user_id, [])
+    
+    def get_user_transactions(self, user_id: str, tx_filter: str = "") -> List[Dict[str, Any]]:
+        return self._user_transaction_log(user_id, tx_filter)[::-1]
+    
+    def get_user_transactions_page(
+        self,
+        user_id: str,
+        tx_filter: str = "",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of transactions, newest first, plus the cursor for the next page."""
+        return page_newest_first(self._user_transaction_log(user_id, tx_filter), limit, cursor)
+    
+    def get_user_transactions_range(
+        self,
+        user_id: str,
+        tx_filter: str = "",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        # Per-user logs are in timestamp order, so the range is a slice
+        log = self._user_transaction_log(user_id, tx_filter)
+        if cursor:
+            first = decode_cursor(cursor)
+        else:
+            first = bisect_left(log, start, key=lambda tx: tx["timestamp"]) if start else 0
+        stop = bisect_left(log, end, key=lambda tx: tx["timestamp"]) if end else len(log)
+        page_end = min(first + limit, stop)
+        next_cursor = encode_cursor(page_end) if page_end < stop else None
+        return log[first:page_end], next_cursor
     
     # ===== NOTIFICATION OPERATIONS =====
     def create_notification(
@@ -186,36 +537,197 @@ class MockStore:
             "message": message,
             "type": notification_type,  # "info", "success", "warning", "error"
             "read": False,
-            "createdAt": datetime.now().isoformat(),
+            "createdAt": datetime.now(),
         }
         
-        self.notifications.append(notification)
+        self._add_notification(notification)
+        self._bump(user_id, "notification")
         return notification
     
+    def _add_notification(self, notification: Dict[str, Any]):
+        user_id = notification["userId"]
+        inbox = self.notifications.get(user_id)
+        if inbox is None:
+            inbox = self.notifications[user_id] = RingBuffer(settings.NOTIFICATION_INBOX_SIZE)
+        evicted = inbox.append(notification)
+        unread = self.unread_notifications.get(user_id, 0) + (not notification["read"])
+        if evicted is not None and not evicted["read"]:
+            unread -= 1
+        self.unread_notifications[user_id] = unread
+    
     def get_user_notifications(self, user_id: str) -> List[Dict[str, Any]]:
-        return sorted(
-            [n for n in self.notifications if n["userId"] == user_id],
-            key=lambda x: x["createdAt"],
-            reverse=True,
-        )
+        inbox = self.notifications.get(user_id)
+        return list(inbox)[::-1] if inbox else []
+    
+    def get_user_notifications_page(
+        self, user_id: str, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of notifications, newest first, plus the cursor for the next page."""
+        inbox = self.notifications.get(user_id)
+        if inbox is None:
+            return page_newest_first([], limit, cursor)
+        return page_newest_first(inbox, limit, cursor, first=inbox.first)
+    
+    def get_unread_count(self, user_id: str) -> int:
+        return self.unread_notifications.get(user_id, 0)
+    
+    def mark_notifications_read(
+        self, user_id: str, notification_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Mark notifications as read in bulk.
+        
+        Marks every notification in the inbox when no IDs are given.
+        Returns the number of notifications that changed state.
+        """
+        inbox = self.notifications.get(user_id)
+        if inbox is None:
+            return 0
+        wanted = set(notification_ids) if notification_ids is not None else None
+        marked = 0
+        for notification in inbox:
+            if notification["read"]:
+                continue
+            if wanted is None or notification["id"] in wanted:
+                notification["read"] = True
+                marked += 1
+        self.unread_notifications[user_id] = self.get_unread_count(user_id) - marked
+        if marked:
+            self._bump(user_id, "notification")
+        return marked
+    
+    # ===== REPUTATION OPERATIONS =====
+    def record_telemetry_event(
+        self, user_id: str, event_type: str, policy_id: str = ""
+    ) -> Dict[str, Any]:
+        if event_type not in TELEMETRY_COUNTERS:
+            raise ValueError(f"Unknown telemetry event type: {event_type}")
+        if user_id not in self.users:
+            raise ValueError(f"User {user_id} not found")
+        event = {
+            "id": generate_event_id(),
+            "userId": user_id,
+            "type": event_type,  # "speeding", "harsh_braking"
+            "policyId": policy_id,
+            "createdAt": datetime.now(),
+        }
+        self.telemetry_events.setdefault(user_id, []).append(event)
+        self._count(user_id, {TELEMETRY_COUNTERS[event_type]: 1})
+        self._bump(user_id, "telemetry")
+        return event
+    
+    def get_user_telemetry_events(self, user_id: str) -> List[Dict[str, Any]]:
+        return list(self.telemetry_events.get(user_id, []))
+    
+    def get_reputation_counters(self, user_id: str) -> Dict[str, int]:
+        with self._reputation_lock:
+            return dict(self.reputation_counters.get(user_id) or empty_counters())
+    
+    def set_reputation_counters(self, user_id: str, counters: Dict[str, int]):
+        with self._reputation_lock:
+            self.reputation_counters[user_id] = dict(counters)
+    
+    # ===== VERSION OPERATIONS =====
+    def get_versions(self, user_id: str) -> Dict[str, int]:
+        with self._version_lock:
+            versions = self.versions.get(user_id, {})
+            return {c: versions.get(c, 0) for c in VERSIONED_COLLECTIONS}
     
     # ===== SESSION OPERATIONS =====
     def create_session(self, user_id: str, token: str) -> Dict[str, Any]:
-        self.active_sessions[token] = {
+        return self.active_sessions.put(token, {
             "userId": user_id,
-            "createdAt": datetime.now().isoformat(),
-        }
-        return self.active_sessions[token]
+            "createdAt": datetime.now(),
+        })
     
     def get_session(self, token: str) -> Optional[Dict[str, Any]]:
         return self.active_sessions.get(token)
     
     def invalidate_session(self, token: str) -> bool:
-        if token in self.active_sessions:
-            del self.active_sessions[token]
-            return True
-        return False
+        return self.active_sessions.pop(token)
+    
+    def purge_expired_sessions(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now()
+        for token_id, expires_at in list(self.revoked_tokens.items()):
+            if expires_at <= now:
+                self.revoked_tokens.pop(token_id, None)
+        return self.active_sessions.purge_expired(now)
+    
+    def get_session_stats(self) -> Dict[str, int]:
+        return self.active_sessions.stats()
+    
+    # ===== TOKEN REVOCATION OPERATIONS =====
+    def revoke_token(self, token_id: str, expires_at: datetime):
+        self.revoked_tokens[token_id] = expires_at
+    
+    def get_revoked_tokens(self) -> Dict[str, datetime]:
+        now = datetime.now()
+        return {t: e for t, e in list(self.revoked_tokens.items()) if e > now}
+    
+    # ===== CHAIN INDEX OPERATIONS =====
+    def get_chain_checkpoint(self, name: str) -> Optional[int]:
+        return self.chain_checkpoints.get(name)
+    
+    def record_chain_events(
+        self, events: List[Dict[str, Any]], checkpoint_name: str, checkpoint_block: int
+    ) -> int:
+        with self._deferred_events(), self._chain_lock:
+            new_events = [e for e in events if e["id"] not in self.chain_events]
+            if new_events:
+                users_by_wallet = {
+                    user["walletAddress"].lower(): user_id for user_id, user in self.users.items()
+                }
+            for event in new_events:
+                event = dict(event, userId=users_by_wallet.get(event["worker"]))
+                self.chain_events[event["id"]] = event
+                self.chain_state[event["worker"]] = apply_event(self.chain_state.get(event["worker"]), event)
+                if event["userId"]:
+                    self._sync_chain_event(event)
+            previous = self.chain_checkpoints.get(checkpoint_name, checkpoint_block)
+            self.chain_checkpoints[checkpoint_name] = max(previous, checkpoint_block)
+        return len(new_events)
+    
+    def _sync_chain_event(self, event: Dict[str, Any]):
+        """Copy on-chain facts onto the user's records."""
+        user_id = event["userId"]
+        if event["name"] == "ScoreUpdated":
+            # The contract's scale starts at 100; sbtScore is 0-100
+            self.users[user_id]["sbtScore"] = min(event["args"]["newScore"], 100)
+            self._bump(user_id, "user")
+        elif event["name"] == "PayoutSent":
+            paid = [c for c in self.get_user_claims(user_id) if c["status"] == "paid"]
+            if paid:
+                paid[-1]["payoutTxHash"] = event["txHash"]
+                self._bump(user_id, "claim")
+    
+    def get_chain_events(self, worker: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        events = [
+            e for e in list(self.chain_events.values())
+            if worker is None or e["worker"] == worker.lower()
+        ]
+        events.sort(key=lambda e: (e["blockNumber"], e["logIndex"]), reverse=True)
+        return events[:limit]
+    
+    def get_chain_state(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        return self.chain_state.get(wallet_address.lower())
+
+
+def create_store(backend: str = settings.STORAGE_BACKEND) -> Storage:
+    """Create the store for the configured backend ("memory", "durable" or "sqlite")."""
+    if backend == "durable":
+        from app.core.durable_store import DurableMockStore
+        if settings.WAL_SYNC not in ("commit", "interval"):
+            raise ValueError(f"Unknown WAL_SYNC mode: {settings.WAL_SYNC}")
+        return DurableMockStore(
+            settings.DATA_DIR, settings.WAL_FLUSH_INTERVAL, settings.WAL_SYNC == "commit"
+        )
+    if backend == "sqlite":
+        from app.core.sqlite_store import SQLiteStore
+        return SQLiteStore(settings.SQLITE_PATH)
+    if backend != "memory":
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return MockStore()
 
 
-# Global mock store instance
-mock_store = MockStore()
+# Global store instance
+mock_store = create_store()
@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+# Per-user Safety Passport counters, kept up to date by the stores as
+# policies, claims and telemetry events are written
+COUNTERS = ("totalPolicies", "successfulClaims", "speedEvents", "harshBraking", "nightShifts")
+
+# Telemetry event type -> counter it increments
+TELEMETRY_COUNTERS = {
+    "speeding": "speedEvents",
+    "harsh_braking": "harshBraking",
+}
+
+# Shifts whose coverage starts between these hours count as night shifts
+NIGHT_START_HOUR = 22
+NIGHT_END_HOUR = 6
+
+
+def empty_counters() -> Dict[str, int]:
+    return dict.fromkeys(COUNTERS, 0)
+
+
+def is_night_shift(coverage_start: datetime) -> bool:
+    return coverage_start.hour >= NIGHT_START_HOUR or coverage_start.hour < NIGHT_END_HOUR
+
+
+def policy_deltas(policy: Dict[str, Any]) -> Dict[str, int]:
+    """Counter increments for a newly created policy."""
+    return {"totalPolicies": 1, "nightShifts": int(is_night_shift(policy["coverageStart"]))}
+
+
+def compute_counters(
+    policies: Iterable[Dict[str, Any]],
+    claims: Iterable[Dict[str, Any]],
+    events: Iterable[Dict[str, Any]],
+) -> Dict[str, int]:
+    """Recompute a user's counters from raw records (used to verify the stored ones)."""
+    counters = empty_counters()
+    for policy in policies:
+        for counter, delta in policy_deltas(policy).items():
+            counters[counter] += delta
+    counters["successfulClaims"] = sum(1 for claim in claims if claim["status"] == "paid")
+    for event in events:
+        counters[TELEMETRY_COUNTERS[event["type"]]] += 1
+    return counters
@@ -0,0 +1,189 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Depends, HTTPException
+from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
+from app.core.config import settings
+from app.utils.ids import new_ulid
+
+
+class InvalidTokenError(ValueError):
+    """Raised when a token is malformed, badly signed, expired or revoked."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+# Tokens are HS256 JWTs; the header never changes
+TOKEN_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+
+
+def _sign(signing_input: str, secret: str) -> str:
+    return _b64encode(hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest())
+
+
+def issue_token(
+    user_id: str,
+    secret: str = settings.SECRET_KEY,
+    ttl: timedelta = timedelta(hours=settings.JWT_EXPIRY),
+) -> Tuple[str, Dict[str, Any]]:
+    """Create a signed token for a user. Returns (token, claims)."""
+    claims = {
+        "sub": user_id,
+        "exp": int((datetime.now() + ttl).timestamp()),
+        "jti": new_ulid(),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = f"{TOKEN_HEADER}.{payload}"
+    return f"{signing_input}.{_sign(signing_input, secret)}", claims
+
+
+class RevocationSet:
+    """
+    IDs (jti) of revoked tokens that have not expired yet.
+    
+    An entry is only needed until its token would have expired anyway, so
+    purge() keeps the set as small as the number of recent logouts.
+    """
+    
+    def __init__(self):
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def __contains__(self, token_id: str) -> bool:
+        return token_id in self._expiry
+    
+    def __len__(self) -> int:
+        return len(self._expiry)
+    
+    def add(self, token_id: str, expires_at: float):
+        with self._lock:
+            self._expiry[token_id] = expires_at
+    
+    def update(self, revoked: Dict[str, datetime]):
+        """Merge revocations read from the store (made by any worker)."""
+        with self._lock:
+            for token_id, expires_at in revoked.items():
+                self._expiry[token_id] = expires_at.timestamp()
+    
+    def purge(self, now: Optional[float] = None) -> int:
+        now = now or time.time()
+        with self._lock:
+            expired = [t for t, expires_at in self._expiry.items() if expires_at <= now]
+            for token_id in expired:
+                del self._expiry[token_id]
+        return len(expired)
+
+
+class TokenVerifier:
+    """
+    Verifies signed tokens without touching the store.
+    
+    Recently verified tokens are kept in a small LRU so repeat requests skip
+    the HMAC and JSON work; expiry and revocation are still checked on every
+    call.
+    """
+    
+    def __init__(self, secret: str, cache_size: int):
+        self.secret = secret
+        # Keyed once; each verification copies it instead of re-deriving the key pads
+        self._mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        self.cache_size = cache_size
+        self.revoked = RevocationSet()
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Return the token's claims, or raise InvalidTokenError."""
+        with self._lock:
+            claims = self._cache.get(token)
+            if claims is not None:
+                self._cache.move_to_end(token)
+        if claims is None:
+            claims = self._decode(token)
+            if self.cache_size:
+                with self._lock:
+                    self._cache[token] = claims
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        if claims["exp"] <= time.time():
+            raise InvalidTokenError("Token expired")
+        if claims["jti"] in self.revoked:
+            raise InvalidTokenError("Token revoked")
+        return claims
+    
+    def _decode(self, token: str) -> Dict[str, Any]:
+        signing_input, _, signature = token.rpartition(".")
+        header, _, payload = signing_input.partition(".")
+        if header != TOKEN_HEADER or not payload:
+            raise InvalidTokenError("Malformed token")
+        mac = self._mac.copy()
+        mac.update(signing_input.encode())
+        # Bytes, since compare_digest rejects non-ASCII str (a crafted signature)
+        expected = _b64encode(mac.digest()).encode("latin-1")
+        if not hmac.compare_digest(signature.encode("utf-8", "replace"), expected):
+            raise InvalidTokenError("Bad token signature")
+        try:
+            claims = json.loads(_b64decode(payload))
+            claims["sub"], claims["exp"], claims["jti"]
+        except (ValueError, KeyError, TypeError):
+            raise InvalidTokenError("Malformed token")
+        return claims
+    
+    def revoke(self, claims: Dict[str, Any]):
+        self.revoked.add(claims["jti"], claims["exp"])
+
+
+# Verifier shared by every request in this process
+token_verifier = TokenVerifier(settings.SECRET_KEY, settings.AUTH_CACHE_SIZE)
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+async def get_token_claims(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> Dict[str, Any]:
+    """Dependency: claims of the request's `Authorization: Bearer` token."""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    try:
+        return token_verifier.verify(credentials.credentials)
+    except InvalidTokenError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+
+async def get_current_user_id(claims: Dict[str, Any] = Depends(get_token_claims)) -> str:
+    """Dependency: ID of the user the request's token was issued to."""
+    return claims["sub"]
+
+
+_fleet_key = APIKeyHeader(name="X-Fleet-Key", auto_error=False)
+
+
+async def get_fleet_scope(
+    fleet_key: Optional[str] = Depends(_fleet_key),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> Optional[str]:
+    """
+    Dependency for fleet operations: None when the request carries the
+    fleet service key (any user), else the bearer token's user ID (that
+    user only).
+    """
+    if fleet_key is not None:
+        expected = settings.FLEET_API_KEY.encode()
+        if not expected or not hmac.compare_digest(fleet_key.encode("utf-8", "replace"), expected):
+            raise HTTPException(status_code=401, detail="Invalid fleet key")
+        return None
+    claims = await get_token_claims(credentials)
+    return claims["sub"]
@@ -0,0 +1,1173 @@
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.core.config import settings
+from app.core.contracts import apply_event
+from app.core.ledger import WALLET_PREFIX, posting_accounts, system_account, wallet_account, wallet_delta
+from app.core.reputation import COUNTERS, TELEMETRY_COUNTERS, empty_counters, policy_deltas
+from app.core.storage import VERSIONED_COLLECTIONS, InsufficientBalanceError, Storage, initial_users
+from app.utils.ids import (
+    FIRST_NFT_SERIAL,
+    generate_policy_id,
+    generate_claim_id,
+    generate_transaction_id,
+    generate_event_id,
+    format_nft_id,
+    generate_tx_hash,
+)
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    walletAddress TEXT NOT NULL,
+    kycStatus TEXT NOT NULL,
+    sbtScore INTEGER NOT NULL,
+    balance INTEGER NOT NULL,
+    createdAt REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS policies (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    userId TEXT NOT NULL,
+    durationHours INTEGER NOT NULL,
+    premiumPaid INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    nftId TEXT NOT NULL,
+    coverageStart REAL NOT NULL,
+    coverageEnd REAL NOT NULL,
+    createdAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_policies_user ON policies (userId, seq);
+CREATE INDEX IF NOT EXISTS idx_policies_expiry ON policies (coverageEnd) WHERE status = 'active';
+
+CREATE TABLE IF NOT EXISTS claims (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    policyId TEXT NOT NULL,
+    status TEXT NOT NULL,
+    description TEXT NOT NULL,
+    createdAt REAL NOT NULL,
+    payoutAmount INTEGER,
+    payoutTxHash TEXT,
+    payoutDate REAL,
+    -- "api" (reviewed by the claim pipeline) or "import"
+    source TEXT NOT NULL DEFAULT 'import'
+);
+CREATE INDEX IF NOT EXISTS idx_claims_policy ON claims (policyId, seq);
+CREATE INDEX IF NOT EXISTS idx_claims_unfinished ON claims (seq)
+    WHERE status IN ('pending', 'approved');
+
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    userId TEXT NOT NULL,
+    type TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    referenceHash TEXT,
+    referenceId TEXT NOT NULL,
+    debitAccount TEXT NOT NULL,
+    creditAccount TEXT NOT NULL,
+    balanceAfter INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_user ON transactions (userId, seq);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_type ON transactions (userId, type, seq);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_time ON transactions (userId, timestamp);
+
+-- Cached system account balances; wallet balances live in users.balance
+CREATE TABLE IF NOT EXISTS accounts (
+    id TEXT PRIMARY KEY,
+    balance INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    userId TEXT NOT NULL,
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    type TEXT NOT NULL,
+    read INTEGER NOT NULL,
+    createdAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications (userId, seq);
+
+CREATE TABLE IF NOT EXISTS telemetry_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    userId TEXT NOT NULL,
+    type TEXT NOT NULL,
+    policyId TEXT NOT NULL,
+    createdAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_telemetry_user ON telemetry_events (userId, seq);
+
+-- Updated in the same transaction as the records they count
+CREATE TABLE IF NOT EXISTS reputation_counters (
+    userId TEXT PRIMARY KEY,
+    totalPolicies INTEGER NOT NULL DEFAULT 0,
+    successfulClaims INTEGER NOT NULL DEFAULT 0,
+    speedEvents INTEGER NOT NULL DEFAULT 0,
+    harshBraking INTEGER NOT NULL DEFAULT 0,
+    nightShifts INTEGER NOT NULL DEFAULT 0
+);
+
+-- Per-user collection versions, bumped in the same transaction as the write.
+-- reset() bumps them instead of deleting rows, so a version never repeats.
+CREATE TABLE IF NOT EXISTS versions (
+    userId TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (userId, collection)
+) WITHOUT ROWID;
+
+-- Named counters, advanced inside write transactions (never reset)
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    token TEXT PRIMARY KEY,
+    userId TEXT NOT NULL,
+    createdAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions (createdAt);
+
+-- Indexed contract events, per-wallet chain state (JSON) and, in sequences,
+-- indexer checkpoints named "chain:<name>"; not cleared by reset
+CREATE TABLE IF NOT EXISTS chain_events (
+    id TEXT PRIMARY KEY,
+    blockNumber INTEGER NOT NULL,
+    logIndex INTEGER NOT NULL,
+    contract TEXT NOT NULL,
+    address TEXT NOT NULL,
+    name TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    userId TEXT,
+    args TEXT NOT NULL,
+    txHash TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_chain_events_block ON chain_events (blockNumber, logIndex);
+CREATE INDEX IF NOT EXISTS idx_chain_events_worker ON chain_events (worker, blockNumber, logIndex);
+CREATE INDEX IF NOT EXISTS idx_users_wallet ON users (lower(walletAddress));
+
+CREATE TABLE IF NOT EXISTS chain_state (
+    walletAddress TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+) WITHOUT ROWID;
+
+-- Revoked signed tokens, kept until the token expires (not cleared by reset)
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti TEXT PRIMARY KEY,
+    expiresAt REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Columns stored as epoch seconds and returned as datetimes
+TIME_COLUMNS = {"createdAt", "coverageStart", "coverageEnd", "timestamp", "payoutDate"}
+
+USER_COLUMNS = ("id", "walletAddress", "kycStatus", "sbtScore", "balance", "createdAt")
+POLICY_COLUMNS = (
+    "id", "userId", "durationHours", "premiumPaid", "status", "nftId",
+    "coverageStart", "coverageEnd", "createdAt",
+)
+CLAIM_COLUMNS = (
+    "id", "policyId", "status", "description", "createdAt",
+    "payoutAmount", "payoutTxHash", "payoutDate", "source",
+)
+TRANSACTION_COLUMNS = (
+    "id", "userId", "type", "amount", "status", "timestamp", "referenceHash", "referenceId",
+    "debitAccount", "creditAccount", "balanceAfter",
+)
+NOTIFICATION_COLUMNS = ("id", "userId", "title", "message", "type", "read", "createdAt")
+TELEMETRY_COLUMNS = ("id", "userId", "type", "policyId", "createdAt")
+CHAIN_EVENT_COLUMNS = (
+    "id", "blockNumber", "logIndex", "contract", "address", "name", "worker", "userId",
+    "args", "txHash",
+)
+
+
+def _to_db(column: str, value: Any) -> Any:
+    if column in TIME_COLUMNS and isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+def _from_db(row: sqlite3.Row) -> Dict[str, Any]:
+    record = {}
+    for column in row.keys():
+        if column == "seq":
+            continue
+        value = row[column]
+        if column in TIME_COLUMNS and value is not None:
+            value = datetime.fromtimestamp(value)
+        elif column == "read":
+            value = bool(value)
+        record[column] = value
+    return record
+
+
+def _insert_sql(table: str, columns: Tuple[str, ...]) -> str:
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+class SQLiteStore(Storage):
+    """
+    SQLite-backed store in WAL mode.
+    
+    Each thread gets its own connection, so several uvicorn workers (and the
+    threadpool inside each) can share one database file. Statements are
+    parameterized constants, which sqlite3 keeps prepared in its per-connection
+    statement cache. Multi-statement flows can use batch() to commit once.
+    """
+    
+    blocking = True
+    
+    def __init__(self, path: str):
+        if path == ":memory:":
+            raise ValueError("SQLiteStore needs a database file shared by all connections")
+        self.path = path
+        self._local = threading.local()
+        self.listeners: List[Callable[[str, Tuple[str, ...]], None]] = []
+        self._session_ttl = timedelta(hours=settings.JWT_EXPIRY)
+        # Per-process session counters (the table itself is shared)
+        self._session_stats = dict.fromkeys(("hits", "misses", "expired", "evicted"), 0)
+        self._stats_lock = threading.Lock()
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        with self._write() as conn:
+            if conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None:
+                self._seed(conn)
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('version_epoch', ?)",
+                (uuid.uuid4().hex[:8],),
+            )
+            self.version_epoch = conn.execute(
+                "SELECT value FROM meta WHERE key = 'version_epoch'"
+            ).fetchone()[0]
+    
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=30,
+                isolation_level=None,  # transactions are managed by _write()
+                check_same_thread=False,
+                cached_statements=256,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.depth = 0
+            # (user_id, collections) bumped by the open transaction
+            self._local.bumped = []
+        return conn
+    
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Run writes in one transaction; nested calls join the outer one."""
+        conn = self._conn
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+            for user_id, collections in self._local.bumped:
+                for listener in self.listeners:
+                    listener(user_id, collections)
+        finally:
+            self._local.depth = 0
+            self._local.bumped = []
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        with self._write():
+            yield
+    
+    def _migrate(self):
+        """Add columns introduced after a database file was created."""
+        # Inside the write lock, so workers starting together migrate once
+        with self._write() as conn:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(claims)")}
+            if "source" not in columns:
+                # Existing claims are not resumed by the claim pipeline
+                conn.execute("ALTER TABLE claims ADD COLUMN source TEXT NOT NULL DEFAULT 'import'")
+    
+    def _seed(self, conn: sqlite3.Connection):
+        sql = _insert_sql("users", USER_COLUMNS)
+        conn.executemany(
+            sql,
+            [[_to_db(c, user[c]) for c in USER_COLUMNS] for user in initial_users().values()],
+        )
+    
+    def _fetch_one(self, sql: str, params: Iterable[Any]) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(sql, tuple(params)).fetchone()
+        return _from_db(row) if row else None
+    
+    def _fetch_all(self, sql: str, params: Iterable[Any]) -> List[Dict[str, Any]]:
+        return [_from_db(row) for row in self._conn.execute(sql, tuple(params))]
+    
+    def _fetch_in(
+        self, table: str, column: str, values: Iterable[Any], select: str = "*"
+    ) -> List[Dict[str, Any]]:
+        """Fetch rows whose column is in values, chunked under SQLite's bound-parameter limit."""
+        records = []
+        values = list(dict.fromkeys(values))
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            records.extend(self._fetch_all(
+                f"SELECT {select} FROM {table} WHERE {column} IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ))
+        return records
+    
+    def _count(self, conn: sqlite3.Connection, deltas: Iterable[Tuple[str, Dict[str, int]]]):
+        """Add (user_id, counter deltas) pairs to reputation_counters, one statement per shape."""
+        by_columns: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+        for user_id, counters in deltas:
+            by_columns.setdefault(tuple(counters), []).append((user_id, *counters.values()))
+        for columns, rows in by_columns.items():
+            conn.executemany(
+                f"INSERT INTO reputation_counters (userId, {', '.join(columns)}) "
+                f"VALUES (?, {', '.join('?' * len(columns))}) ON CONFLICT (userId) DO UPDATE SET "
+                + ", ".join(f"{c} = {c} + excluded.{c}" for c in columns),
+                rows,
+            )
+    
+    def _bump(self, conn: sqlite3.Connection, user_ids: Iterable[str], *collections: str):
+        """Bump the given collection versions of each user; listeners hear of it after commit."""
+        user_ids = list(dict.fromkeys(user_ids))
+        conn.executemany(
+            "INSERT INTO versions (userId, collection, version) VALUES (?, ?, 1) "
+            "ON CONFLICT (userId, collection) DO UPDATE SET version = version + 1",
+            [(user_id, collection) for user_id in user_ids for collection in collections],
+        )
+        if self.listeners:
+            self._local.bumped.extend((user_id, collections) for user_id in user_ids)
+    
+    def _next_nft_ids(self, conn: sqlite3.Connection, count: int) -> List[str]:
+        """Allocate `count` consecutive NFT serials in the current transaction."""
+        last = conn.execute(
+            "INSERT INTO sequences (name, value) VALUES ('nft', ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + ? RETURNING value",
+            (FIRST_NFT_SERIAL - 1 + count, count),
+        ).fetchone()[0]
+        return [format_nft_id(serial) for serial in range(last - count + 1, last + 1)]
+    
+    def _update(self, table: str, columns: Tuple[str, ...], record_id: str, data: Dict[str, Any]):
+        unknown = set(data) - set(columns)
+        if unknown:
+            raise ValueError(f"Unknown {table} fields: {', '.join(sorted(unknown))}")
+        if not data:
+            return
+        assignments = ", ".join(f"{column} = ?" for column in data)
+        params = [_to_db(column, value) for column, value in data.items()]
+        with self._write() as conn:
+            conn.execute(f"UPDATE {table} SET {assignments} WHERE id = ?", (*params, record_id))
+    
+    def reset(self):
+        """Delete all rows and re-seed the demo users."""
+        with self._write() as conn:
+            for table in (
+                "sessions", "notifications", "telemetry_events", "reputation_counters",
+                "accounts", "transactions", "claims", "policies", "users",
+            ):
+                conn.execute(f"DELETE FROM {table}")
+            self._seed(conn)
+            user_ids = conn.execute("SELECT userId FROM versions UNION SELECT id FROM users")
+            self._bump(conn, [row[0] for row in user_ids.fetchall()], *VERSIONED_COLLECTIONS)
+    
+    # ===== USER OPERATIONS =====
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT * FROM users WHERE id = ?", (user_id,))
+    
+    def get_user_ids(self) -> List[str]:
+        return [row["id"] for row in self._conn.execute("SELECT id FROM users ORDER BY rowid")]
+    
+    def get_users(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return {user["id"]: user for user in self._fetch_in("users", "id", user_ids)}
+    
+    def update_user(self, user_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._write() as conn:
+            if self.get_user(user_id) is None:
+                raise ValueError(f"User {user_id} not found")
+            self._update("users", USER_COLUMNS, user_id, data)
+            self._bump(conn, [user_id], "user")
+            return self.get_user(user_id)
+    
+    # ===== POLICY OPERATIONS =====
+    def create_policy(
+        self,
+        user_id: str,
+        duration_hours: int,
+        premium_paid: int,
+        policy_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        now = datetime.now()
+        policy = {
+            "id": policy_id or generate_policy_id(),
+            "userId": user_id,
+            "durationHours": duration_hours,
+            "premiumPaid": premium_paid,
+            "status": "active",
+            "nftId": None,  # allocated in the write transaction
+            "coverageStart": now,
+            "coverageEnd": now + timedelta(hours=duration_hours),
+            "createdAt": now,
+        }
+        with self._write() as conn:
+            policy["nftId"] = self._next_nft_ids(conn, 1)[0]
+            conn.execute(
+                _insert_sql("policies", POLICY_COLUMNS),
+                [_to_db(c, policy[c]) for c in POLICY_COLUMNS],
+            )
+            self._count(conn, [(user_id, policy_deltas(policy))])
+            self._bump(conn, [user_id], "policy")
+        return policy
+    
+    def create_policies(
+        self, policies: List[Tuple[str, int, int, Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        now = datetime.now()
+        created = [
+            {
+                "id": policy_id or generate_policy_id(),
+                "userId": user_id,
+                "durationHours": duration_hours,
+                "premiumPaid": premium_paid,
+                "status": "active",
+                "nftId": None,
+                "coverageStart": now,
+                "coverageEnd": now + timedelta(hours=duration_hours),
+                "createdAt": now,
+            }
+            for user_id, duration_hours, premium_paid, policy_id in policies
+        ]
+        with self._write() as conn:
+            for policy, nft_id in zip(created, self._next_nft_ids(conn, len(created))):
+                policy["nftId"] = nft_id
+            conn.executemany(
+                _insert_sql("policies", POLICY_COLUMNS),
+                [[_to_db(c, policy[c]) for c in POLICY_COLUMNS] for policy in created],
+            )
+            self._count(conn, [(policy["userId"], policy_deltas(policy)) for policy in created])
+            self._bump(conn, [policy["userId"] for policy in created], "policy")
+        return created
+    
+    def get_policy(self, policy_id: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT * FROM policies WHERE id = ?", (policy_id,))
+    
+    def get_user_policies(self, user_id: str) -> List[Dict[str, Any]]:
+        return self._fetch_all("SELECT * FROM policies WHERE userId = ? ORDER BY seq", (user_id,))
+    
+    def get_active_policy(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the active policy for a user (if any), expiring any that are due."""
+        now = datetime.now().timestamp()
+        policy = self._fetch_one(
+            "SELECT * FROM policies WHERE userId = ? AND status = 'active' AND coverageEnd > ? "
+            "ORDER BY seq LIMIT 1",
+            (user_id, now),
+        )
+        # Plain reads must not take the write lock; only flip policies that are due
+        due = self._conn.execute(
+            "SELECT 1 FROM policies WHERE userId = ? AND status = 'active' AND coverageEnd <= ? "
+            "LIMIT 1",
+            (user_id, now),
+        ).fetchone()
+        if due:
+            with self._write() as conn:
+                expired = conn.execute(
+                    "UPDATE policies SET status = 'expired' "
+                    "WHERE userId = ? AND status = 'active' AND coverageEnd <= ?",
+                    (user_id, now),
+                ).rowcount
+                if expired:
+                    self._bump(conn, [user_id], "policy")
+        return policy
+    
+    def expire_due_policies(self, now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+        now = now or datetime.now()
+        with self._write() as conn:
+            user_ids = [row[0] for row in conn.execute(
+                "UPDATE policies SET status = 'expired' WHERE seq IN ("
+                "SELECT seq FROM policies WHERE status = 'active' AND coverageEnd <= ? LIMIT ?) "
+                "RETURNING userId",
+                (now.timestamp(), batch_size),
+            ).fetchall()]
+            self._bump(conn, user_ids, "policy")
+        return len(user_ids)
+    
+    def update_policy(self, policy_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._write() as conn:
+            previous = self.get_policy(policy_id)
+            if previous is None:
+                raise ValueError(f"Policy {policy_id} not found")
+            self._update("policies", POLICY_COLUMNS, policy_id, data)
+            policy = self.get_policy(policy_id)
+            self._bump(conn, [previous["userId"], policy["userId"]], "policy")
+            return policy
+    
+    # ===== CLAIM OPERATIONS =====
+    def create_claim(self, policy_id: str, description: str = "") -> Dict[str, Any]:
+        claim = {
+            "id": generate_claim_id(),
+            "policyId": policy_id,
+            "status": "pending",
+            "description": description,
+            "createdAt": datetime.now(),
+            "payoutAmount": None,
+            "payoutTxHash": None,
+            "payoutDate": None,
+            "source": "api",
+        }
+        with self._write() as conn:
+            conn.execute(
+                _insert_sql("claims", CLAIM_COLUMNS),
+                [_to_db(c, claim[c]) for c in CLAIM_COLUMNS],
+            )
+            policy = self.get_policy(policy_id)
+            if policy:
+                self._bump(conn, [policy["userId"]], "claim")
+        return claim
+    
+    def import_claims(self, claims: List[Dict[str, Any]]) -> List[Optional[str]]:
+        errors: List[Optional[str]] = []
+        rows = []
+        with self._write() as conn:
+            policy_users = {
+                row["id"]: row["userId"] for row in self._fetch_in(
+                    "policies", "id", (c["policyId"] for c in claims), select="id, userId"
+                )
+            }
+            taken = {
+                row["id"] for row in self._fetch_in(
+                    "claims", "id", (c["id"] for c in claims), select="id"
+                )
+            }
+            paid = []
+            stored_users = []
+            for claim in claims:
+                if claim["policyId"] not in policy_users:
+                    errors.append(f"Policy {claim['policyId']} not found")
+                elif claim["id"] in taken:
+                    errors.append(f"Claim {claim['id']} already exists")
+                else:
+                    taken.add(claim["id"])
+                    claim["source"] = "import"
+                    rows.append([_to_db(c, claim[c]) for c in CLAIM_COLUMNS])
+                    stored_users.append(policy_users[claim["policyId"]])
+                    if claim["status"] == "paid":
+                        paid.append((policy_users[claim["policyId"]], {"successfulClaims": 1}))
+                    errors.append(None)
+            conn.executemany(_insert_sql("claims", CLAIM_COLUMNS), rows)
+            self._count(conn, paid)
+            self._bump(conn, stored_users, "claim")
+        return errors
+    
+    def get_claim(self, claim_id: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT * FROM claims WHERE id = ?", (claim_id,))
+    
+    def get_policy_claims(self, policy_id: str) -> List[Dict[str, Any]]:
+        return self._fetch_all("SELECT * FROM claims WHERE policyId = ? ORDER BY seq", (policy_id,))
+    
+    def get_unfinished_claims(self) -> List[Dict[str, Any]]:
+        return self._fetch_all(
+            "SELECT * FROM claims WHERE status IN ('pending', 'approved') AND source = 'api' "
+            "ORDER BY seq",
+            (),
+        )
+    
+    def get_user_claims(self, user_id: str) -> List[Dict[str, Any]]:
+        return self._fetch_all(
+            "SELECT c.* FROM claims c JOIN policies p ON p.id = c.policyId "
+            "WHERE p.userId = ? ORDER BY p.seq, c.seq",
+            (user_id,),
+        )
+    
+    def approve_claim(self, claim_id: str, payout_amount: int) -> Dict[str, Any]:
+        with self._write() as conn:
+            claim = self.get_claim(claim_id)
+            if claim is None:
+                raise ValueError(f"Claim {claim_id} not found")
+            policy = self.get_policy(claim["policyId"])
+            if policy and claim["status"] != "paid":
+                self._count(conn, [(policy["userId"], {"successfulClaims": 1})])
+            self._update("claims", CLAIM_COLUMNS, claim_id, {
+                "status": "paid",
+                "payoutAmount": payout_amount,
+                "payoutTxHash": generate_tx_hash(),
+                "payoutDate": datetime.now(),
+            })
+            if policy:
+                self._bump(conn, [policy["userId"]], "claim")
+            return self.get_claim(claim_id)
+    
+    def update_claim(self, claim_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._write() as conn:
+            claim = self.get_claim(claim_id)
+            if claim is None:
+                raise ValueError(f"Claim {claim_id} not found")
+            self._update("claims", CLAIM_COLUMNS, claim_id, data)
+            policy = self.get_policy(claim["policyId"])
+            if policy:
+                self._bump(conn, [policy["userId"]], "claim")
+            return self.get_claim(claim_id)
+    
+    # ===== LEDGER OPERATIONS =====
+    def post_transaction(
+        self, user_id: str, tx_type: str, amount: int, reference_id: str = ""
+    ) -> Dict[str, Any]:
+        if amount <= 0:
+            raise ValueError("Transaction amount must be positive")
+        debit_account, credit_account = posting_accounts(user_id, tx_type)
+        delta = amount if credit_account == wallet_account(user_id) else -amount
+        tx = {
+            "id": generate_transaction_id(),
+            "userId": user_id,
+            "type": tx_type,
+            "amount": amount,
+            "status": "success",
+            "referenceHash": generate_tx_hash(),
+            "referenceId": reference_id,
+            "debitAccount": debit_account,
+            "creditAccount": credit_account,
+        }
+        with self._write() as conn:
+            # Conditional update: the write lock orders postings, and the
+            # balance never goes below zero
+            row = conn.execute(
+                "UPDATE users SET balance = balance + ? WHERE id = ? AND balance + ? >= 0 "
+                "RETURNING balance",
+                (delta, user_id, delta),
+            ).fetchone()
+            if row is None:
+                if self.get_user(user_id) is None:
+                    raise ValueError(f"User {user_id} not found")
+                raise InsufficientBalanceError(f"Insufficient balance for user {user_id}")
+            tx["timestamp"] = datetime.now()
+            tx["balanceAfter"] = row["balance"]
+            conn.execute(
+                _insert_sql("transactions", TRANSACTION_COLUMNS),
+                [_to_db(c, tx[c]) for c in TRANSACTION_COLUMNS],
+            )
+            conn.execute(
+                "INSERT INTO accounts (id, balance) VALUES (?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET balance = balance + excluded.balance",
+                (system_account(tx), -delta),
+            )
+            self._bump(conn, [user_id], "wallet")
+        return tx
+    
+    def post_transactions(
+        self, postings: List[Tuple[str, str, int, str]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Post in one transaction: one balance UPDATE per entry, then bulk inserts."""
+        results: List[Optional[Dict[str, Any]]] = []
+        system_deltas: Dict[str, int] = {}
+        with self._write() as conn:
+            for user_id, tx_type, amount, reference_id in postings:
+                if amount <= 0:
+                    raise ValueError("Transaction amount must be positive")
+                debit_account, credit_account = posting_accounts(user_id, tx_type)
+                delta = amount if credit_account == wallet_account(user_id) else -amount
+                row = conn.execute(
+                    "UPDATE users SET balance = balance + ? WHERE id = ? AND balance + ? >= 0 "
+                    "RETURNING balance",
+                    (delta, user_id, delta),
+                ).fetchone()
+                if row is None:
+                    if self.get_user(user_id) is None:
+                        raise ValueError(f"User {user_id} not found")
+                    results.append(None)
+                    continue
+                tx = {
+                    "id": generate_transaction_id(),
+                    "userId": user_id,
+                    "type": tx_type,
+                    "amount": amount,
+                    "status": "success",
+                    "timestamp": datetime.now(),
+                    "referenceHash": generate_tx_hash(),
+                    "referenceId": reference_id,
+                    "debitAccount": debit_account,
+                    "creditAccount": credit_account,
+                    "balanceAfter": row["balance"],
+                }
+                results.append(tx)
+                account = system_account(tx)
+                system_deltas[account] = system_deltas.get(account, 0) - delta
+            conn.executemany(
+                _insert_sql("transactions", TRANSACTION_COLUMNS),
+                [[_to_db(c, tx[c]) for c in TRANSACTION_COLUMNS] for tx in results if tx],
+            )
+            conn.executemany(
+                "INSERT INTO accounts (id, balance) VALUES (?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET balance = balance + excluded.balance",
+                list(system_deltas.items()),
+            )
+            self._bump(conn, [tx["userId"] for tx in results if tx], "wallet")
+        return results
+    
+    def get_account_balance(self, account: str) -> int:
+        if account.startswith(WALLET_PREFIX):
+            user = self.get_user(account[len(WALLET_PREFIX):])
+            return user["balance"] if user else 0
+        row = self._conn.execute("SELECT balance FROM accounts WHERE id = ?", (account,)).fetchone()
+        return row["balance"] if row else 0
+    
+    def get_balance_at(self, user_id: str, at: datetime) -> int:
+        """Read the running balance of the user's last posting at or before `at`."""
+        user = self.get_user(user_id)
+        if user is None:
+            raise ValueError(f"User {user_id} not found")
+        tx = self._fetch_one(
+            "SELECT * FROM transactions WHERE userId = ? AND timestamp <= ? "
+            "ORDER BY timestamp DESC, seq DESC LIMIT 1",
+            (user_id, at.timestamp()),
+        )
+        if tx:
+            return tx["balanceAfter"]
+        tx = self._fetch_one(
+            "SELECT * FROM transactions WHERE userId = ? ORDER BY timestamp, seq LIMIT 1",
+            (user_id,),
+        )
+        if tx:
+            # Before the first posting: its opening balance
+            return tx["balanceAfter"] - wallet_delta(tx)
+        return user["balance"]
+    
+    # ===== TRANSACTION OPERATIONS =====
+    def get_user_transactions(self, user_id: str, tx_filter: str = "") -> List[Dict[str, Any]]:
+        if tx_filter:
+            return self._fetch_all(
+                "SELECT * FROM transactions WHERE userId = ? AND type = ? ORDER BY seq DESC",
+                (user_id, tx_filter),
+            )
+        return self._fetch_all(
+            "SELECT * FROM transactions WHERE userId = ? ORDER BY seq DESC", (user_id,)
+        )
+    
+    def _page(
+        self, table: str, where: str, params: Tuple[Any, ...], limit: int, cursor: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Keyset page over seq, newest first. The cursor is the last seq returned."""
+        if cursor:
+            where += " AND seq < ?"
+            params += (decode_cursor(cursor),)
+        rows = self._conn.execute(
+            f"SELECT * FROM {table} WHERE {where} ORDER BY seq DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1]["seq"]) if len(rows) > limit else None
+        return [_from_db(row) for row in rows[:limit]], next_cursor
+    
+    def get_user_transactions_page(
+        self,
+        user_id: str,
+        tx_filter: str = "",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        if tx_filter:
+            return self._page(
+                "transactions", "userId = ? AND type = ?", (user_id, tx_filter), limit, cursor
+            )
+        return self._page("transactions", "userId = ?", (user_id,), limit, cursor)
+    
+    def get_user_transactions_range(
+        self,
+        user_id: str,
+        tx_filter: str = "",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Keyset pages over seq. The date range is resolved to a seq range first."""
+        # Postings get their timestamp inside the write lock, so a user's
+        # rows are in the same order by seq and by timestamp
+        first = decode_cursor(cursor) if cursor else self._first_seq_at(user_id, start)
+        stop = self._first_seq_at(user_id, end) if end else None
+        if first is None:
+            return [], None
+        where, params = "userId = ? AND seq >= ?", (user_id, first)
+        if tx_filter:
+            where, params = "userId = ? AND type = ? AND seq >= ?", (user_id, tx_filter, first)
+        if stop is not None:
+            where += " AND seq < ?"
+            params += (stop,)
+        rows = self._conn.execute(
+            f"SELECT * FROM transactions WHERE {where} ORDER BY seq LIMIT ?", (*params, limit + 1)
+        ).fetchall()
+        next_cursor = encode_cursor(rows[limit]["seq"]) if len(rows) > limit else None
+        return [_from_db(row) for row in rows[:limit]], next_cursor
+    
+    def _first_seq_at(self, user_id: str, at: Optional[datetime]) -> Optional[int]:
+        """seq of the user's first transaction at or after `at` (None if there is none)."""
+        if at is None:
+            return 0
+        row = self._conn.execute(
+            "SELECT seq FROM transactions WHERE userId = ? AND timestamp >= ? "
+            "ORDER BY timestamp, seq LIMIT 1",
+            (user_id, at.timestamp()),
+        ).fetchone()
+        return row["seq"] if row else None
+    
+    # ===== NOTIFICATION OPERATIONS =====
+    def create_notification(
+        self,
+        user_id: str,
+        title: str,
+        message: str,
+        notification_type: str = "info",
+    ) -> Dict[str, Any]:
+        notification = {
+            "id": generate_transaction_id(),
+            "userId": user_id,
+            "title": title,
+            "message": message,
+            "type": notification_type,
+            "read": False,
+            "createdAt": datetime.now(),
+        }
+        with self._write() as conn:
+            conn.execute(
+                _insert_sql("notifications", NOTIFICATION_COLUMNS),
+                [_to_db(c, notification[c]) for c in NOTIFICATION_COLUMNS],
+            )
+            # Keep only the newest NOTIFICATION_INBOX_SIZE rows for this user
+            conn.execute(
+                "DELETE FROM notifications WHERE userId = ? AND seq <= ("
+                "SELECT seq FROM notifications WHERE userId = ? "
+                "ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+                (user_id, user_id, settings.NOTIFICATION_INBOX_SIZE),
+            )
+            self._bump(conn, [user_id], "notification")
+        return notification
+    
+    def create_notifications(
+        self, notifications: List[Tuple[str, str, str, str]]
+    ) -> List[Dict[str, Any]]:
+        now = datetime.now()
+        created = [
+            {
+                "id": generate_transaction_id(),
+                "userId": user_id,
+                "title": title,
+                "message": message,
+                "type": notification_type,
+                "read": False,
+                "createdAt": now,
+            }
+            for user_id, title, message, notification_type in notifications
+        ]
+        with self._write() as conn:
+            conn.executemany(
+                _insert_sql("notifications", NOTIFICATION_COLUMNS),
+                [[_to_db(c, n[c]) for c in NOTIFICATION_COLUMNS] for n in created],
+            )
+            # Trim each affected inbox once
+            conn.executemany(
+                "DELETE FROM notifications WHERE userId = ? AND seq <= ("
+                "SELECT seq FROM notifications WHERE userId = ? "
+                "ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+                [
+                    (user_id, user_id, settings.NOTIFICATION_INBOX_SIZE)
+                    for user_id in dict.fromkeys(n["userId"] for n in created)
+                ],
+            )
+            self._bump(conn, [n["userId"] for n in created], "notification")
+        return created
+    
+    def get_user_notifications(self, user_id: str) -> List[Dict[str, Any]]:
+        return self._fetch_all(
+            "SELECT * FROM notifications WHERE userId = ? ORDER BY seq DESC", (user_id,)
+        )
+    
+    def get_user_notifications_page(
+        self, user_id: str, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return self._page("notifications", "userId = ?", (user_id,), limit, cursor)
+    
+    def get_unread_count(self, user_id: str) -> int:
+        # Bounded by the inbox size, so this stays constant-time per user
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM notifications WHERE userId = ? AND read = 0", (user_id,)
+        ).fetchone()
+        return row[0]
+    
+    def mark_notifications_read(
+        self, user_id: str, notification_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        with self._write() as conn:
+            if notification_ids is None:
+                marked = conn.execute(
+                    "UPDATE notifications SET read = 1 WHERE userId = ? AND read = 0", (user_id,)
+                ).rowcount
+            else:
+                marked = 0
+                for notification_id in set(notification_ids):
+                    marked += conn.execute(
+                        "UPDATE notifications SET read = 1 "
+                        "WHERE userId = ? AND id = ? AND read = 0",
+                        (user_id, notification_id),
+                    ).rowcount
+            if marked:
+                self._bump(conn, [user_id], "notification")
+            return marked
+    
+    # ===== REPUTATION OPERATIONS =====
+    def record_telemetry_event(
+        self, user_id: str, event_type: str, policy_id: str = ""
+    ) -> Dict[str, Any]:
+        if event_type not in TELEMETRY_COUNTERS:
+            raise ValueError(f"Unknown telemetry event type: {event_type}")
+        event = {
+            "id": generate_event_id(),
+            "userId": user_id,
+            "type": event_type,
+            "policyId": policy_id,
+            "createdAt": datetime.now(),
+        }
+        with self._write() as conn:
+            if self.get_user(user_id) is None:
+                raise ValueError(f"User {user_id} not found")
+            conn.execute(
+                _insert_sql("telemetry_events", TELEMETRY_COLUMNS),
+                [_to_db(c, event[c]) for c in TELEMETRY_COLUMNS],
+            )
+            self._count(conn, [(user_id, {TELEMETRY_COUNTERS[event_type]: 1})])
+            self._bump(conn, [user_id], "telemetry")
+        return event
+    
+    def get_user_telemetry_events(self, user_id: str) -> List[Dict[str, Any]]:
+        return self._fetch_all(
+            "SELECT * FROM telemetry_events WHERE userId = ? ORDER BY seq", (user_id,)
+        )
+    
+    def get_reputation_counters(self, user_id: str) -> Dict[str, int]:
+        row = self._fetch_one("SELECT * FROM reputation_counters WHERE userId = ?", (user_id,))
+        if row is None:
+            return empty_counters()
+        return {counter: row[counter] for counter in COUNTERS}
+    
+    def set_reputation_counters(self, user_id: str, counters: Dict[str, int]):
+        with self._write() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO reputation_counters (userId, {', '.join(COUNTERS)}) "
+                f"VALUES (?, {', '.join('?' * len(COUNTERS))})",
+                (user_id, *(counters[counter] for counter in COUNTERS)),
+            )
+    
+    # ===== VERSION OPERATIONS =====
+    def get_versions(self, user_id: str) -> Dict[str, int]:
+        versions = dict.fromkeys(VERSIONED_COLLECTIONS, 0)
+        for row in self._conn.execute(
+            "SELECT collection, version FROM versions WHERE userId = ?", (user_id,)
+        ):
+            versions[row["collection"]] = row["version"]
+        return versions
+    
+    # ===== SESSION OPERATIONS =====
+    def _tally(self, **counts: int):
+        with self._stats_lock:
+            for name, count in counts.items():
+                self._session_stats[name] += count
+    
+    def create_session(self, user_id: str, token: str) -> Dict[str, Any]:
+        now = datetime.now()
+        session = {"userId": user_id, "createdAt": now, "expiresAt": now + self._session_ttl}
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (token, userId, createdAt) VALUES (?, ?, ?)",
+                (token, user_id, now.timestamp()),
+            )
+        return session
+    
+    def get_session(self, token: str) -> Optional[Dict[str, Any]]:
+        session = self._fetch_one("SELECT userId, createdAt FROM sessions WHERE token = ?", (token,))
+        if session is None:
+            self._tally(misses=1)
+            return None
+        session["expiresAt"] = session["createdAt"] + self._session_ttl
+        if session["expiresAt"] <= datetime.now():
+            with self._write() as conn:
+                conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+            self._tally(misses=1, expired=1)
+            return None
+        self._tally(hits=1)
+        return session
+    
+    def invalidate_session(self, token: str) -> bool:
+        with self._write() as conn:
+            return conn.execute("DELETE FROM sessions WHERE token = ?", (token,)).rowcount > 0
+    
+    def purge_expired_sessions(self, now: Optional[datetime] = None) -> int:
+        """Drop expired sessions, then the oldest beyond SESSION_CACHE_SIZE."""
+        now = now or datetime.now()
+        with self._write() as conn:
+            expired = conn.execute(
+                "DELETE FROM sessions WHERE createdAt <= ?",
+                ((now - self._session_ttl).timestamp(),),
+            ).rowcount
+            # Oldest first rather than least recently used: tracking use
+            # would turn every authenticated read into a write
+            evicted = conn.execute(
+                "DELETE FROM sessions WHERE rowid IN ("
+                "SELECT rowid FROM sessions ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                (settings.SESSION_CACHE_SIZE,),
+            ).rowcount
+            conn.execute("DELETE FROM revoked_tokens WHERE expiresAt <= ?", (now.timestamp(),))
+        self._tally(expired=expired, evicted=evicted)
+        return expired + evicted
+    
+    def get_session_stats(self) -> Dict[str, int]:
+        size = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        with self._stats_lock:
+            return {"size": size, **self._session_stats}
+    
+    # ===== TOKEN REVOCATION OPERATIONS =====
+    def revoke_token(self, token_id: str, expires_at: datetime):
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO revoked_tokens (jti, expiresAt) VALUES (?, ?)",
+                (token_id, expires_at.timestamp()),
+            )
+    
+    def get_revoked_tokens(self) -> Dict[str, datetime]:
+        rows = self._conn.execute(
+            "SELECT jti, expiresAt FROM revoked_tokens WHERE expiresAt > ?",
+            (datetime.now().timestamp(),),
+        )
+        return {jti: datetime.fromtimestamp(expires_at) for jti, expires_at in rows.fetchall()}
+    
+    # ===== CHAIN INDEX OPERATIONS =====
+    def get_chain_checkpoint(self, name: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT value FROM sequences WHERE name = ?", (f"chain:{name}",)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def record_chain_events(
+        self, events: List[Dict[str, Any]], checkpoint_name: str, checkpoint_block: int
+    ) -> int:
+        with self._write() as conn:
+            existing = set()
+            ids = [e["id"] for e in events]
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT id FROM chain_events WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                )
+                existing.update(row[0] for row in rows.fetchall())
+            new_events = [dict(e) for e in events if e["id"] not in existing]
+            
+            wallets = list(dict.fromkeys(e["worker"] for e in new_events))
+            users_by_wallet: Dict[str, str] = {}
+            states: Dict[str, Optional[Dict[str, Any]]] = {}
+            for start in range(0, len(wallets), 500):
+                chunk = wallets[start:start + 500]
+                marks = ", ".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT lower(walletAddress), id FROM users WHERE lower(walletAddress) IN ({marks})",
+                    chunk,
+                )
+                users_by_wallet.update(rows.fetchall())
+                rows = conn.execute(
+                    f"SELECT walletAddress, state FROM chain_state WHERE walletAddress IN ({marks})",
+                    chunk,
+                )
+                states.update((wallet, json.loads(state)) for wallet, state in rows.fetchall())
+            
+            for event in new_events:
+                event["userId"] = users_by_wallet.get(event["worker"])
+                states[event["worker"]] = apply_event(states.get(event["worker"]), event)
+                if event["userId"]:
+                    self._sync_chain_event(conn, event)
+            conn.executemany(
+                _insert_sql("chain_events", CHAIN_EVENT_COLUMNS),
+                [
+                    tuple(json.dumps(e["args"]) if c == "args" else e[c] for c in CHAIN_EVENT_COLUMNS)
+                    for e in new_events
+                ],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO chain_state (walletAddress, state) VALUES (?, ?)",
+                [(wallet, json.dumps(states[wallet])) for wallet in wallets],
+            )
+            conn.execute(
+                "INSERT INTO sequences (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = max(value, excluded.value)",
+                (f"chain:{checkpoint_name}", checkpoint_block),
+            )
+        return len(new_events)
+    
+    def _sync_chain_event(self, conn: sqlite3.Connection, event: Dict[str, Any]):
+        """Copy on-chain facts onto the user's records."""
+        user_id = event["userId"]
+        if event["name"] == "ScoreUpdated":
+            # The contract's scale starts at 100; sbtScore is 0-100
+            conn.execute(
+                "UPDATE users SET sbtScore = ? WHERE id = ?",
+                (min(event["args"]["newScore"], 100), user_id),
+            )
+            self._bump(conn, [user_id], "user")
+        elif event["name"] == "PayoutSent":
+            updated = conn.execute(
+                "UPDATE claims SET payoutTxHash = ? WHERE id = ("
+                "SELECT c.id FROM claims c JOIN policies p ON p.id = c.policyId "
+                "WHERE p.userId = ? AND c.status = 'paid' ORDER BY p.seq DESC, c.seq DESC LIMIT 1)",
+                (event["txHash"], user_id),
+            ).rowcount
+            if updated:
+                self._bump(conn, [user_id], "claim")
+    
+    def get_chain_events(self, worker: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        if worker is None:
+            rows = self._fetch_all(
+                "SELECT * FROM chain_events ORDER BY blockNumber DESC, logIndex DESC LIMIT ?",
+                (limit,),
+            )
+        else:
+            rows = self._fetch_all(
+                "SELECT * FROM chain_events WHERE worker = ? "
+                "ORDER BY blockNumber DESC, logIndex DESC LIMIT ?",
+                (worker.lower(), limit),
+            )
+        for row in rows:
+            row["args"] = json.loads(row["args"])
+        return rows
+    
+    def get_chain_state(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT state FROM chain_state WHERE walletAddress = ?", (wallet_address.lower(),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
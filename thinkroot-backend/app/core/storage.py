@@ -0,0 +1,350 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.utils.ids import generate_wallet_address
+
+
+# Per-user collections whose version is bumped by every write that touches
+# them. Versions only ever increase (reset() bumps them too), so a response
+# built at a given set of versions is still correct while they are unchanged.
+VERSIONED_COLLECTIONS = ("user", "wallet", "policy", "claim", "notification", "telemetry")
+
+
+class InsufficientBalanceError(ValueError):
+    """Raised when a debit would take a balance below zero."""
+
+
+def initial_users() -> Dict[str, Dict[str, Any]]:
+    """Demo users every store starts with after reset()."""
+    return {
+        "user_001": {
+            "id": "user_001",
+            "walletAddress": generate_wallet_address(),
+            "kycStatus": "verified",
+            "sbtScore": 50,
+            "balance": 1000,
+            "createdAt": datetime.now() - timedelta(days=7),
+        }
+    }
+
+
+class Storage(ABC):
+    """
+    Storage interface used by the routers.
+    
+    Records are plain dicts whose timestamp fields are datetimes. Two
+    implementations exist: MockStore (in-memory) and SQLiteStore.
+    """
+    
+    # True when calls do blocking I/O and must stay off the event loop
+    blocking: bool = False
+    
+    # Identifies the lifetime of the version counters (a process for the
+    # in-memory stores, a database file for SQLite); part of every ETag
+    version_epoch: str = ""
+    
+    @abstractmethod
+    def reset(self):
+        """Reset all data to the initial demo state."""
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group several writes into one commit (a no-op for in-memory stores)."""
+        yield
+    
+    def close(self):
+        """Flush pending writes and release resources."""
+    
+    # ===== USER OPERATIONS =====
+    @abstractmethod
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def get_user_ids(self) -> List[str]: ...
+    
+    def get_users(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch several users by ID. Unknown IDs are left out."""
+        users = {}
+        for user_id in user_ids:
+            user = self.get_user(user_id)
+            if user:
+                users[user_id] = user
+        return users
+    
+    @abstractmethod
+    def update_user(self, user_id: str, data: Dict[str, Any]) -> Dict[str, Any]: ...
+    
+    # ===== POLICY OPERATIONS =====
+    @abstractmethod
+    def create_policy(
+        self,
+        user_id: str,
+        duration_hours: int,
+        premium_paid: int,
+        policy_id: Optional[str] = None,
+    ) -> Dict[str, Any]: ...
+    
+    def create_policies(
+        self, policies: List[Tuple[str, int, int, Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        """Create several policies from (user_id, duration_hours, premium_paid, policy_id) tuples."""
+        with self.batch():
+            return [self.create_policy(*policy) for policy in policies]
+    
+    @abstractmethod
+    def get_policy(self, policy_id: str) -> Optional[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def get_user_policies(self, user_id: str) -> List[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def get_active_policy(self, user_id: str) -> Optional[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def expire_due_policies(self, now: Optional[datetime] = None, batch_size: int = 1000) -> int: ...
+    
+    @abstractmethod
+    def update_policy(self, policy_id: str, data: Dict[str, Any]) -> Dict[str, Any]: ...
+    
+    # ===== CLAIM OPERATIONS =====
+    @abstractmethod
+    def create_claim(self, policy_id: str, description: str = "") -> Dict[str, Any]:
+        """File a pending claim (`source` "api"; the claim pipeline reviews it)."""
+    
+    @abstractmethod
+    def import_claims(self, claims: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Store complete claim records as given (backfills, partner feeds).
+        
+        Returns, per claim, None if it was stored or the reason it was
+        rejected (unknown policy, duplicate ID). No payouts are posted, and
+        the claims are marked `source` "import" so they are never reviewed.
+        """
+    
+    @abstractmethod
+    def get_unfinished_claims(self) -> List[Dict[str, Any]]:
+        """Claims filed through the API that are still pending or approved, oldest first."""
+    
+    @abstractmethod
+    def get_claim(self, claim_id: str) -> Optional[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def get_policy_claims(self, policy_id: str) -> List[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def get_user_claims(self, user_id: str) -> List[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def approve_claim(self, claim_id: str, payout_amount: int) -> Dict[str, Any]: ...
+    
+    @abstractmethod
+    def update_claim(self, claim_id: str, data: Dict[str, Any]) -> Dict[str, Any]: ...
+    
+    # ===== LEDGER OPERATIONS =====
+    @abstractmethod
+    def post_transaction(
+        self, user_id: str, tx_type: str, amount: int, reference_id: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Post a transaction to the double-entry ledger and return it.
+        
+        The wallet and system balances change atomically with the posting,
+        and the posting records the wallet's balance after it
+        (`balanceAfter`). Raises InsufficientBalanceError instead of taking
+        a wallet below zero.
+        """
+    
+    def post_transactions(
+        self, postings: List[Tuple[str, str, int, str]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Post several (user_id, tx_type, amount, reference_id) transactions in order.
+        
+        Returns the posting for each entry, or None where the wallet could
+        not cover it.
+        """
+        results = []
+        with self.batch():
+            for posting in postings:
+                try:
+                    results.append(self.post_transaction(*posting))
+                except InsufficientBalanceError:
+                    results.append(None)
+        return results
+    
+    @abstractmethod
+    def get_account_balance(self, account: str) -> int:
+        """Cached balance of a wallet or system ledger account."""
+    
+    @abstractmethod
+    def get_balance_at(self, user_id: str, at: datetime) -> int:
+        """Wallet balance as of a point in time."""
+    
+    # ===== TRANSACTION OPERATIONS =====
+    
+    @abstractmethod
+    def get_user_transactions(self, user_id: str, tx_filter: str = "") -> List[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def get_user_transactions_page(
+        self,
+        user_id: str,
+        tx_filter: str = "",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]: ...
+    
+    @abstractmethod
+    def get_user_transactions_range(
+        self,
+        user_id: str,
+        tx_filter: str = "",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of transactions with start <= timestamp < end, oldest first.
+        
+        Returns the page and the cursor for the next one (None after the
+        last). Used for exports, so each page costs O(limit) whatever the
+        size of the history.
+        """
+    
+    # ===== NOTIFICATION OPERATIONS =====
+    @abstractmethod
+    def create_notification(
+        self,
+        user_id: str,
+        title: str,
+        message: str,
+        notification_type: str = "info",
+    ) -> Dict[str, Any]: ...
+    
+    def create_notifications(
+        self, notifications: List[Tuple[str, str, str, str]]
+    ) -> List[Dict[str, Any]]:
+        """Create several notifications from (user_id, title, message, type) tuples."""
+        with self.batch():
+            return [self.create_notification(*notification) for notification in notifications]
+    
+    @abstractmethod
+    def get_user_notifications(self, user_id: str) -> List[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def get_user_notifications_page(
+        self, user_id: str, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]: ...
+    
+    @abstractmethod
+    def get_unread_count(self, user_id: str) -> int: ...
+    
+    @abstractmethod
+    def mark_notifications_read(
+        self, user_id: str, notification_ids: Optional[Iterable[str]] = None
+    ) -> int: ...
+    
+    # ===== REPUTATION OPERATIONS =====
+    @abstractmethod
+    def record_telemetry_event(
+        self, user_id: str, event_type: str, policy_id: str = ""
+    ) -> Dict[str, Any]:
+        """Store a raw telemetry event (see reputation.TELEMETRY_COUNTERS) and count it."""
+    
+    @abstractmethod
+    def get_user_telemetry_events(self, user_id: str) -> List[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def get_reputation_counters(self, user_id: str) -> Dict[str, int]:
+        """
+        Per-user reputation counters (reputation.COUNTERS).
+        
+        They are updated as policies, claims and telemetry events are
+        written, so this is a constant-time read.
+        """
+    
+    @abstractmethod
+    def set_reputation_counters(self, user_id: str, counters: Dict[str, int]):
+        """Overwrite a user's counters (used by the offline rebuild)."""
+    
+    # ===== VERSION OPERATIONS =====
+    @abstractmethod
+    def get_versions(self, user_id: str) -> Dict[str, int]:
+        """Current version of each of the user's VERSIONED_COLLECTIONS (0 if never written)."""
+    
+    def add_listener(self, listener: Callable[[str, Tuple[str, ...]], None]):
+        """
+        Call listener(user_id, collections) once the versions bumped by a
+        write are visible (after commit, for SQLite). Listeners run on the
+        writing thread, so they must be quick and thread-safe.
+        """
+        self.listeners.append(listener)
+    
+    # ===== SESSION OPERATIONS =====
+    @abstractmethod
+    def create_session(self, user_id: str, token: str) -> Dict[str, Any]: ...
+    
+    @abstractmethod
+    def get_session(self, token: str) -> Optional[Dict[str, Any]]: ...
+    
+    @abstractmethod
+    def invalidate_session(self, token: str) -> bool: ...
+    
+    @abstractmethod
+    def purge_expired_sessions(self, now: Optional[datetime] = None) -> int:
+        """
+        Drop expired sessions (sessions last settings.JWT_EXPIRY hours) and
+        revocations of tokens that have expired.
+        
+        Called periodically by the background sweeper. Returns the number
+        of sessions dropped.
+        """
+    
+    @abstractmethod
+    def get_session_stats(self) -> Dict[str, int]:
+        """Session count and hit/miss/expired/evicted counters (since process start)."""
+    
+    # ===== TOKEN REVOCATION OPERATIONS =====
+    @abstractmethod
+    def revoke_token(self, token_id: str, expires_at: datetime):
+        """
+        Revoke a signed token by its ID (jti) until it would have expired.
+        
+        Revocations survive reset() and are dropped by
+        purge_expired_sessions() once the token has expired.
+        """
+    
+    @abstractmethod
+    def get_revoked_tokens(self) -> Dict[str, datetime]:
+        """Unexpired revoked token IDs and when each token expires."""
+    
+    # ===== CHAIN INDEX OPERATIONS =====
+    @abstractmethod
+    def get_chain_checkpoint(self, name: str) -> Optional[int]:
+        """Last block the named indexer has fully processed (None before its first batch)."""
+    
+    @abstractmethod
+    def record_chain_events(
+        self, events: List[Dict[str, Any]], checkpoint_name: str, checkpoint_block: int
+    ) -> int:
+        """
+        Store decoded contract events (see app/core/contracts.py) and advance
+        the checkpoint, in one write.
+        
+        Events already stored (same "id") are skipped, so re-indexing a range
+        after a crash is harmless. Each new event is folded into its wallet's
+        chain state. Events of a wallet that belongs to a user also update
+        that user: ScoreUpdated sets sbtScore (capped at 100) and PayoutSent
+        sets the payoutTxHash of the user's latest paid claim. Returns the
+        number of new events. Chain data survives reset().
+        """
+    
+    @abstractmethod
+    def get_chain_events(self, worker: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Indexed events, newest first, optionally only those of one wallet."""
+    
+    @abstractmethod
+    def get_chain_state(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        """A wallet's policy, claim and score state as last seen on chain."""
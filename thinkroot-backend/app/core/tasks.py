@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from app.core.config import settings
+from app.core.chain_reader import chain_rpc
+from app.core.durable_store import DurableMockStore
+from app.core.indexer import ChainIndexer, load_contracts
+from app.core.async_store import async_store
+from app.core.mock_store import mock_store
+from app.core.security import token_verifier
+from app.utils.rpc import RpcError
+
+logger = logging.getLogger(__name__)
+
+# Every loop below logs a failed round and carries on, so one bad poll (a
+# store error, malformed node data) never disables the task for good.
+
+
+async def expire_policies_periodically():
+    """Background sweeper that expires policies whose coverage has ended."""
+    while True:
+        await asyncio.sleep(settings.POLICY_EXPIRY_SWEEP_INTERVAL)
+        try:
+            # Drain everything that is due, one batch per event loop turn
+            while await async_store.expire_due_policies(
+                batch_size=settings.POLICY_EXPIRY_BATCH_SIZE
+            ):
+                await asyncio.sleep(0)
+        except Exception:
+            logger.exception("Policy expiry sweep failed")
+
+
+async def purge_sessions_periodically():
+    """Background sweeper that drops expired (and, in SQLite, over-cap) sessions."""
+    while True:
+        await asyncio.sleep(settings.SESSION_PURGE_INTERVAL)
+        try:
+            await async_store.purge_expired_sessions()
+        except Exception:
+            logger.exception("Session purge failed")
+
+
+async def sync_revocations_periodically():
+    """Merge tokens revoked by other workers into this worker's revocation set."""
+    while True:
+        try:
+            token_verifier.revoked.update(await async_store.get_revoked_tokens())
+            token_verifier.revoked.purge()
+        except Exception:
+            logger.exception("Revocation sync failed")
+        await asyncio.sleep(settings.REVOCATION_SYNC_INTERVAL)
+
+
+async def index_chain_periodically():
+    """Pull new contract events into the store (only when CHAIN_RPC_URL is set)."""
+    if chain_rpc is None:
+        return
+    indexer = None
+    interval = settings.CHAIN_POLL_INTERVAL
+    while True:
+        try:
+            # Built here, so a bad contract config is logged and retried like a bad poll
+            if indexer is None:
+                indexer = ChainIndexer(chain_rpc, mock_store, list(load_contracts().values()))
+            # RPC calls block, so the whole sync runs off the event loop
+            await asyncio.to_thread(indexer.sync)
+            interval = settings.CHAIN_POLL_INTERVAL
+        except RpcError as e:
+            # Node unreachable; the checkpoint is unchanged. Back off so a long
+            # outage neither floods the log nor hammers the node
+            interval = min(interval * 2, settings.CHAIN_MAX_POLL_INTERVAL)
+            logger.warning("Chain node unreachable (%s); retrying in %gs", e, interval)
+        except Exception:
+            logger.exception("Chain indexing failed")
+        await asyncio.sleep(interval)
+
+
+async def snapshot_periodically():
+    """Snapshot the durable store and compact its write-ahead log."""
+    if not isinstance(mock_store, DurableMockStore):
+        return
+    while True:
+        await asyncio.sleep(settings.SNAPSHOT_INTERVAL)
+        try:
+            await asyncio.to_thread(mock_store.snapshot)
+        except Exception:
+            logger.exception("Store snapshot failed")
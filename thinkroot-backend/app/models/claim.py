@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 from typing import Optional
 
 
@@ -14,10 +15,10 @@ class Claim(ClaimBase):
     id: str
     policyId: str
     status: str
-    createdAt: str
+    createdAt: datetime
     payoutAmount: Optional[int] = None
     payoutTxHash: Optional[str] = None
-    payoutDate: Optional[str] = None
+    payoutDate: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -19,5 +20,5 @@ class WalletResponse(BaseModel):
 class HomeResponse(BaseModel):
     shiftStatus: str
     balance: int
-    activePolicy: dict = None
+    activePolicy: Optional[dict] = None
     alerts: list
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 from typing import Optional
 
 
@@ -9,7 +10,7 @@ class Notification(BaseModel):
     message: str
     type: str  # info, success, warning, error
     read: bool
-    createdAt: str
+    createdAt: datetime
 
     class Config:
         from_attributes = True
@@ -17,9 +17,9 @@ class Policy(PolicyBase):
     premiumPaid: int
     status: str
     nftId: str
-    coverageStart: str
-    coverageEnd: str
-    createdAt: str
+    coverageStart: datetime
+    coverageEnd: datetime
+    createdAt: datetime
 
     class Config:
         from_attributes = True
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 from typing import Optional
 
 
@@ -8,9 +9,10 @@ class Transaction(BaseModel):
     type: str
     amount: int
     status: str
-    timestamp: str
+    timestamp: datetime
     referenceHash: Optional[str] = None
     referenceId: str = ""
+    balanceAfter: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 from typing import Optional
 
 
@@ -15,7 +16,7 @@ class User(UserBase):
     id: str
     sbtScore: int
     balance: int
-    createdAt: str
+    createdAt: datetime
 
     class Config:
         from_attributes = True
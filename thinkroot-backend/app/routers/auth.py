@@ -1,27 +1,29 @@
-from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, HTTPException
 from app.models.common import LoginRequest, AuthResponse
-from app.core.mock_store import mock_store
-from app.utils.ids import generate_id
+from app.core.async_store import async_store
+from app.core.security import InvalidTokenError, get_token_claims, issue_token, token_verifier
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(request: LoginRequest):
+async def login(request: LoginRequest):
     """
     Mock authentication endpoint.
     
-    Returns a mock JWT token and user ID.
+    Returns a signed bearer token (HS256 JWT) and user ID.
     For demo purposes, any wallet address is accepted.
     """
     # In a real system, verify wallet signature here
-    user = mock_store.get_user("user_001")
+    user = await async_store.get_user("user_001")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Generate mock token
-    token = f"mock-jwt-{generate_id()}"
-    mock_store.create_session(user["id"], token)
+    token, claims = issue_token(user["id"])
+    # The session row is keyed by the token ID; verifying the token never reads it
+    await async_store.create_session(user["id"], claims["jti"])
     
     return AuthResponse(
         token=token,
@@ -29,9 +31,25 @@ def login(request: LoginRequest):
     )
 
 
+@router.get("/me")
+async def me(claims: Dict[str, Any] = Depends(get_token_claims)):
+    """User the bearer token was issued to, verified without a store lookup."""
+    return {
+        "userId": claims["sub"],
+        "expiresAt": datetime.fromtimestamp(claims["exp"]),
+    }
+
+
 @router.post("/logout")
-def logout(token: str):
-    """Logout and invalidate session."""
-    if mock_store.invalidate_session(token):
-        return {"message": "Logout successful"}
-    raise HTTPException(status_code=401, detail="Invalid token")
+async def logout(token: str):
+    """Logout, revoke the token and invalidate its session."""
+    try:
+        claims = token_verifier.verify(token)
+    except InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    
+    # Store first so other workers pick the revocation up on their next sync
+    await async_store.revoke_token(claims["jti"], datetime.fromtimestamp(claims["exp"]))
+    token_verifier.revoke(claims)
+    await async_store.invalidate_session(claims["jti"])
+    return {"message": "Logout successful"}
@@ -1,22 +1,90 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import json
+import tempfile
+from typing import IO, Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from app.core.async_store import async_store
+from app.core.claim_pipeline import claim_pipeline
+from app.core.config import settings
 from app.core.mock_store import mock_store
-from app.models.claim import ClaimResponse
+from app.models.claim import Claim, ClaimResponse
+from app.utils.ndjson import iter_lines
+from app.utils.serialization import FastJSONResponse, RecordSerializer
 
 router = APIRouter()
 
+CLAIM_STATUSES = {"pending", "approved", "paid", "rejected", "appealing"}
+
+claim_records = RecordSerializer(ClaimResponse)
+
 
 class SimulateClaimRequest(BaseModel):
     description: str = "Shift incident claim"
 
 
+class FileClaimRequest(BaseModel):
+    description: str = "Shift incident claim"
+
+
+@router.post("", status_code=202)
+async def file_claim(request: FileClaimRequest):
+    """
+    File a claim on the active policy for review.
+    
+    The claim is stored as pending and queued; validation, approval, payout
+    and the notification happen in the background claim pipeline. Poll
+    GET /claims/{id} (or watch notifications) for the outcome. Answers 503
+    with Retry-After while the pipeline is full.
+    """
+    if not claim_pipeline.admit():
+        raise HTTPException(
+            status_code=503,
+            detail="Claim pipeline is busy, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        claim = await async_store.run(_file_claim, request.description)
+    except BaseException:
+        claim_pipeline.release()
+        raise
+    claim_pipeline.submit(claim["id"])
+    
+    return {
+        "claim": ClaimResponse(**claim),
+        "queueDepth": claim_pipeline.depth,
+    }
+
+
+def _file_claim(description: str):
+    user = mock_store.get_user("user_001")
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    policy = mock_store.get_active_policy("user_001")
+    if not policy:
+        raise HTTPException(status_code=400, detail="No active policy")
+    
+    return mock_store.create_claim(policy["id"], description)
+
+
+@router.get("/pipeline")
+async def get_pipeline_stats():
+    """Queue depth, outcomes and per-stage latency of the claim pipeline."""
+    return claim_pipeline.stats()
+
+
 @router.post("/simulate")
-def simulate_claim(request: SimulateClaimRequest):
+async def simulate_claim(request: SimulateClaimRequest):
     """
     Simulate a claim for testing.
     
     Creates a claim on the active policy and auto-approves it.
     """
+    return await async_store.run(_simulate_claim, request.description)
+
+
+def _simulate_claim(description: str):
     user = mock_store.get_user("user_001")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -26,59 +94,138 @@ def simulate_claim(request: SimulateClaimRequest):
     if not policy:
         raise HTTPException(status_code=400, detail="No active policy")
     
-    # Create claim
-    claim = mock_store.create_claim(policy["id"], request.description)
-    
-    # Auto-approve for demo (real system would need manual review)
-    payout_amount = 5000  # Fixed payout for demo
-    mock_store.approve_claim(claim["id"], payout_amount)
-    
-    # Update user balance
-    mock_store.update_balance("user_001", payout_amount)
-    
-    # Create transaction record
-    mock_store.create_transaction(
-        "user_001",
-        "claim",
-        payout_amount,
-        reference_id=claim["id"]
-    )
-    
-    # Create notification
-    mock_store.create_notification(
-        "user_001",
-        "Claim approved!",
-        f"₹{payout_amount} has been paid out. Check your wallet.",
-        "success"
-    )
+    with mock_store.batch():
+        # Create claim
+        claim = mock_store.create_claim(policy["id"], description)
+        
+        # Auto-approve for demo (real system would need manual review)
+        payout_amount = settings.CLAIM_PAYOUT_AMOUNT
+        mock_store.approve_claim(claim["id"], payout_amount)
+        
+        # Post the payout to the ledger (credits the wallet)
+        tx = mock_store.post_transaction(
+            "user_001",
+            "claim",
+            payout_amount,
+            reference_id=claim["id"]
+        )
+        
+        # Create notification
+        mock_store.create_notification(
+            "user_001",
+            "Claim approved!",
+            f"₹{payout_amount} has been paid out. Check your wallet.",
+            "success"
+        )
     
     return {
         "claim": ClaimResponse(**mock_store.get_claim(claim["id"])),
         "payoutAmount": payout_amount,
-        "newBalance": user["balance"] + payout_amount
+        "newBalance": tx["balanceAfter"]
     }
 
 
+@router.post("/ingest")
+async def ingest_claims(request: Request):
+    """
+    Ingest claims from an NDJSON request body (backfills, partner feeds).
+    
+    Each line is one claim validated against the `Claim` model. Valid
+    claims are committed every CLAIM_INGEST_CHUNK_SIZE lines. One NDJSON
+    result per input line, then a summary line, is streamed back once the
+    upload has been read. Claims are stored as given; no payouts are posted.
+    """
+    results = await _ingest_claims(request.stream())
+    return StreamingResponse(_stream_results(results), media_type="application/x-ndjson")
+
+
+async def _ingest_claims(body: AsyncIterator[bytes]) -> IO[str]:
+    """
+    Ingest the body chunk by chunk and return the spooled results.
+    
+    Most HTTP/1.1 clients only read the response after sending the whole
+    body, so results are spooled (in memory up to 1 MB, then to a temp
+    file) rather than written to the socket while the upload is running.
+    """
+    results = tempfile.SpooledTemporaryFile(max_size=1 << 20, mode="w+")
+    counts = {"accepted": 0, "rejected": 0}
+    # (line number, parsed claim or None, validation error) in input order
+    chunk: List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]] = []
+    
+    async for line_number, line in iter_lines(body, settings.CLAIM_INGEST_MAX_LINE_BYTES):
+        if line is not None and not line.strip():
+            continue
+        chunk.append((line_number, *_parse_claim(line)))
+        if len(chunk) >= settings.CLAIM_INGEST_CHUNK_SIZE:
+            results.write(await _commit_chunk(chunk, counts))
+            chunk = []
+    
+    if chunk:
+        results.write(await _commit_chunk(chunk, counts))
+    results.write(json.dumps({"summary": counts}) + "\n")
+    results.seek(0)
+    return results
+
+
+async def _stream_results(results: IO[str]) -> AsyncIterator[str]:
+    with results:
+        while True:
+            block = results.read(1 << 16)
+            if not block:
+                break
+            yield block
+
+
+def _parse_claim(line: Optional[bytes]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validate one NDJSON line. Returns (claim, None) or (None, error)."""
+    if line is None:
+        return None, f"Line exceeds {settings.CLAIM_INGEST_MAX_LINE_BYTES} bytes"
+    try:
+        claim = Claim.model_validate_json(line).model_dump()
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(map(str, err['loc'])) or 'line'}: {err['msg']}" for err in e.errors()
+        )
+    if claim["status"] not in CLAIM_STATUSES:
+        return None, f"status: Unknown claim status {claim['status']}"
+    return claim, None
+
+
+async def _commit_chunk(
+    chunk: List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]], counts: Dict[str, int]
+) -> str:
+    """Store the chunk's valid claims in one write and render its results in line order."""
+    claims = [claim for _, claim, _ in chunk if claim]
+    store_errors = iter(await async_store.import_claims(claims) if claims else [])
+    results = []
+    for line_number, claim, error in chunk:
+        if claim:
+            error = next(store_errors)
+        if error:
+            counts["rejected"] += 1
+            result = {"line": line_number, "status": "rejected", "error": error}
+        else:
+            counts["accepted"] += 1
+            result = {"line": line_number, "status": "accepted", "id": claim["id"]}
+        results.append(json.dumps(result) + "\n")
+    return "".join(results)
+
+
 @router.get("")
-def get_user_claims():
+async def get_user_claims():
     """Get all claims for the current user."""
-    policies = mock_store.get_user_policies("user_001")
-    all_claims = []
+    all_claims = await async_store.get_user_claims("user_001")
     
-    for policy in policies:
-        claims = mock_store.get_policy_claims(policy["id"])
-        all_claims.extend(claims)
-    
-    return {
-        "claims": [ClaimResponse(**c) for c in all_claims],
+    return FastJSONResponse({
+        "claims": claim_records(all_claims),
         "count": len(all_claims)
-    }
+    })
 
 
 @router.get("/{claim_id}")
-def get_claim(claim_id: str):
+async def get_claim(claim_id: str):
     """Get details of a specific claim."""
-    claim = mock_store.get_claim(claim_id)
+    claim = await async_store.get_claim(claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail="Claim not found")
     
@@ -1,34 +1,132 @@
-from fastapi import APIRouter
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, Optional
+import pydantic_core
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.core.async_store import async_store
 from app.core.mock_store import mock_store
 from app.models.transaction import TransactionResponse
+from app.utils.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.utils.serialization import FastJSONResponse, RecordSerializer
+from app.utils.timestamps import local_time
 
 router = APIRouter()
 
+transaction_records = RecordSerializer(TransactionResponse)
+
+# Rows fetched from the store per export page
+EXPORT_PAGE_SIZE = 1000
+EXPORT_COLUMNS = list(TransactionResponse.model_fields)
+
+
+async def _get_page(tx_type: str, limit: int, cursor: Optional[str]):
+    try:
+        return await async_store.get_user_transactions_page("user_001", tx_type, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 @router.get("")
-def get_transaction_history(filter: str = ""):
+async def get_transaction_history(
+    request: Request,
+    filter: str = "",
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
     """
-    Get transaction history for the current user.
+    Get transaction history for the current user, newest first.
     
     Query Parameters:
     - filter: "premium", "claim", or "" (all)
+    - limit: page size (1-200, default 50)
+    - cursor: `nextCursor` from the previous page
     """
-    transactions = mock_store.get_user_transactions("user_001", filter)
+    versions = await async_store.get_versions("user_001")
+    etag = make_etag(mock_store.version_epoch, versions["wallet"], filter, limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    transactions, next_cursor = await _get_page(filter, limit, cursor)
     
-    return {
-        "transactions": [TransactionResponse(**t) for t in transactions],
+    return FastJSONResponse({
+        "transactions": transaction_records(transactions),
         "count": len(transactions),
-        "filter": filter or "all"
-    }
+        "filter": filter or "all",
+        "nextCursor": next_cursor
+    }, headers=etag_headers(etag))
+
+
+@router.get("/export")
+async def export_transaction_history(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    filter: str = "",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """
+    Stream the full transaction history as CSV or NDJSON, oldest first.
+    
+    Query Parameters:
+    - format: "csv" (default) or "ndjson"
+    - filter: transaction type, or "" (all)
+    - start / end: ISO timestamps, start inclusive and end exclusive
+    
+    Rows are read from the store one page at a time, so memory use does not
+    grow with the size of the history.
+    """
+    start, end = local_time(start), local_time(end)
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(format, filter, start, end),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
+
+
+async def _export_rows(
+    format: str, tx_filter: str, start: Optional[datetime], end: Optional[datetime]
+) -> AsyncIterator[str]:
+    if format == "csv":
+        yield ",".join(EXPORT_COLUMNS) + "\n"
+    cursor = None
+    while True:
+        transactions, cursor = await async_store.get_user_transactions_range(
+            "user_001", tx_filter, start, end, EXPORT_PAGE_SIZE, cursor
+        )
+        records = transaction_records(transactions)
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            for record in records:
+                writer.writerow([_csv_value(record.get(column)) for column in EXPORT_COLUMNS])
+            yield buffer.getvalue()
+        else:
+            yield "".join(pydantic_core.to_json(record).decode() + "\n" for record in records)
+        if cursor is None:
+            break
+
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
 
 
 @router.get("/type/{tx_type}")
-def get_transactions_by_type(tx_type: str):
-    """Get transactions filtered by type (premium, claim, refund)."""
-    transactions = mock_store.get_user_transactions("user_001", tx_type)
+async def get_transactions_by_type(
+    tx_type: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
+    """Get transactions filtered by type (premium, claim, refund), newest first."""
+    transactions, next_cursor = await _get_page(tx_type, limit, cursor)
     
-    return {
-        "transactions": [TransactionResponse(**t) for t in transactions],
+    return FastJSONResponse({
+        "transactions": transaction_records(transactions),
         "type": tx_type,
-        "count": len(transactions)
-    }
+        "count": len(transactions),
+        "nextCursor": next_cursor
+    })
@@ -0,0 +1,212 @@
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import pydantic_core
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.core.async_store import async_store
+from app.core.config import settings
+from app.core.event_hub import PUSHED_COLLECTIONS, Subscription, event_hub
+from app.models.notification import NotificationResponse
+from app.models.policy import PolicyResponse
+from app.models.user import UserResponse
+from app.utils.serialization import FastJSONResponse, RecordSerializer
+from app.utils.snapshot_cache import SnapshotCache
+
+router = APIRouter()
+
+notification_records = RecordSerializer(NotificationResponse)
+policy_records = RecordSerializer(PolicyResponse)
+user_records = RecordSerializer(UserResponse)
+
+# New notifications sent per push event; clients page GET /notifications for more
+STREAM_NOTIFICATION_LIMIT = 20
+
+# Latest rendered state per pushed collection, shared by all of a user's streams
+stream_caches = {
+    collection: SnapshotCache((collection,), settings.SNAPSHOT_CACHE_SIZE)
+    for collection in PUSHED_COLLECTIONS
+}
+
+
+class MarkReadRequest(BaseModel):
+    ids: Optional[List[str]] = None
+
+
+@router.get("")
+async def get_notifications(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
+    """
+    Get notifications for the current user, newest first.
+    
+    Query Parameters:
+    - limit: page size (1-200, default 50)
+    - cursor: `nextCursor` from the previous page
+    """
+    try:
+        notifications, next_cursor = await async_store.get_user_notifications_page(
+            "user_001", limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return FastJSONResponse({
+        "notifications": notification_records(notifications),
+        "count": len(notifications),
+        "unreadCount": await async_store.get_unread_count("user_001"),
+        "nextCursor": next_cursor
+    })
+
+
+@router.get("/unread-count")
+async def get_unread_count():
+    """Get the number of unread notifications for the current user."""
+    return {"unreadCount": await async_store.get_unread_count("user_001")}
+
+
+@router.post("/read")
+async def mark_notifications_read(request: MarkReadRequest):
+    """
+    Mark notifications as read.
+    
+    Marks the given IDs, or every notification when `ids` is omitted.
+    """
+    marked = await async_store.mark_notifications_read("user_001", request.ids)
+    
+    return {
+        "marked": marked,
+        "unreadCount": await async_store.get_unread_count("user_001")
+    }
+
+
+@router.get("/stream")
+async def stream_changes(request: Request):
+    """
+    Push the current user's changes as Server-Sent Events.
+    
+    Sends a `ready` event with the current user, balance, active policy and
+    latest notifications, then one event per changed collection (`user`,
+    `wallet`, `policy`, `claim`, `notification`) as writes happen, and a
+    comment line every PUSH_KEEPALIVE_INTERVAL seconds while idle. Writes
+    handled by other workers are picked up from the store's versions at
+    least that often. Replaces polling /api/home, /wallet and /notifications.
+    """
+    if event_hub.subscribers >= event_hub.max_subscribers:
+        raise HTTPException(
+            status_code=503, detail="Too many open streams", headers={"Retry-After": "5"}
+        )
+    return StreamingResponse(
+        _stream_changes(request, "user_001"),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_changes(request: Request, user_id: str) -> AsyncIterator[bytes]:
+    # Subscribed before the first render, so no write between the two is missed
+    subscription = event_hub.subscribe(user_id)
+    if subscription is None:
+        # The hub filled up after the handler checked; the client retries later
+        yield b"retry: 5000\n" + _sse("error", {"detail": "Too many open streams"})
+        return
+    watcher = asyncio.create_task(_close_on_disconnect(request, subscription))
+    cursor: Dict[str, Any] = {"sentNotifications": set()}
+    try:
+        ready: Dict[str, Any] = {}
+        versions = await async_store.get_versions(user_id)
+        for collection in PUSHED_COLLECTIONS:
+            ready.update(await _render_change(user_id, collection, versions, cursor))
+        yield b"retry: 3000\n" + _sse("ready", ready)
+        while True:
+            changes, dropped = await subscription.next(settings.PUSH_KEEPALIVE_INTERVAL)
+            if subscription.closed:
+                break
+            if dropped:
+                # Some changes were dropped while this client was slow; resend everything
+                changes = list(PUSHED_COLLECTIONS)
+            # Writes handled by other worker processes never reach this hub; they
+            # show up here as versions that moved since the last event
+            latest = await async_store.get_versions(user_id)
+            changes += [c for c in PUSHED_COLLECTIONS if latest[c] != versions[c]]
+            versions = latest
+            if not changes:
+                yield b": keep-alive\n\n"
+                continue
+            # A burst of writes to one collection is sent once, as its latest state
+            events = [
+                _sse(c, await _render_change(user_id, c, versions, cursor))
+                for c in dict.fromkeys(changes)
+            ]
+            yield b"".join(events)
+    finally:
+        watcher.cancel()
+        event_hub.unsubscribe(subscription)
+
+
+async def _close_on_disconnect(request: Request, subscription: Subscription):
+    """
+    End the stream as soon as the client goes away.
+    
+    Without this an idle stream only notices a closed socket at its next
+    write, so dead subscriptions would linger until the next keep-alive.
+    """
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+    subscription.close()
+
+
+async def _render_change(
+    user_id: str, collection: str, versions: Dict[str, int], cursor: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Current state of one collection, as sent in its push event.
+    
+    `versions` must be read before the state, as for the other snapshot
+    caches. The first stream to render a change reads the store; the user's
+    other streams reuse that state.
+    """
+    if collection == "claim":
+        # The list changed; clients refetch GET /claims
+        return {}
+    cache = stream_caches[collection]
+    state = cache.get(user_id, versions)
+    if state is None:
+        state, expires_at = await _read_state(user_id, collection)
+        cache.put(user_id, versions, state, expires_at)
+    if collection != "notification":
+        return state
+    
+    # The store returns its newest notifications in write order, so the ones
+    # this stream has not sent yet are the new ones. (IDs only sort by time
+    # within one process.)
+    sent = cursor["sentNotifications"]
+    new = [n for n in state["notifications"] if n["id"] not in sent]
+    cursor["sentNotifications"] = {n["id"] for n in state["notifications"]}
+    return {"unreadCount": state["unreadCount"], "notifications": new}
+
+
+async def _read_state(user_id: str, collection: str) -> Tuple[Dict[str, Any], Optional[datetime]]:
+    """Read one collection's state from the store; returns (state, expiry time)."""
+    if collection == "user":
+        user = await async_store.get_user(user_id)
+        return {"user": user_records([user])[0] if user else None}, None
+    if collection == "wallet":
+        user = await async_store.get_user(user_id)
+        return {"balance": user["balance"] if user else 0}, None
+    if collection == "policy":
+        policy = await async_store.get_active_policy(user_id)
+        if not policy:
+            return {"activePolicy": None}, None
+        return {"activePolicy": policy_records([policy])[0]}, policy["coverageEnd"]
+    latest, _ = await async_store.get_user_notifications_page(user_id, STREAM_NOTIFICATION_LIMIT)
+    return {
+        "unreadCount": await async_store.get_unread_count(user_id),
+        "notifications": notification_records(latest),
+    }, None
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + pydantic_core.to_json(data) + b"\n\n"
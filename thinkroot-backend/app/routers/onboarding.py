@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from app.core.async_store import async_store
 from app.core.mock_store import mock_store
 from app.models.user import UserResponse
 
@@ -11,28 +12,33 @@ class OnboardingCompleteRequest(BaseModel):
 
 
 @router.post("/complete")
-def complete_onboarding(request: OnboardingCompleteRequest):
+async def complete_onboarding(request: OnboardingCompleteRequest):
     """
     Complete onboarding for a user.
     
     Returns updated user profile with initial balance.
     """
+    return await async_store.run(_complete_onboarding, request.kycStatus)
+
+
+def _complete_onboarding(kyc_status: str):
     user = mock_store.get_user("user_001")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Update KYC status
-    updated_user = mock_store.update_user("user_001", {
-        "kycStatus": request.kycStatus
-    })
-    
-    # Create welcome notification
-    mock_store.create_notification(
-        "user_001",
-        "Welcome to ParaCipher!",
-        "You're all set. Now purchase coverage for your next shift.",
-        "success"
-    )
+    with mock_store.batch():
+        # Update KYC status
+        updated_user = mock_store.update_user("user_001", {
+            "kycStatus": kyc_status
+        })
+        
+        # Create welcome notification
+        mock_store.create_notification(
+            "user_001",
+            "Welcome to ParaCipher!",
+            "You're all set. Now purchase coverage for your next shift.",
+            "success"
+        )
     
     return {
         "user": UserResponse(**updated_user)
@@ -40,9 +46,9 @@ def complete_onboarding(request: OnboardingCompleteRequest):
 
 
 @router.get("/status")
-def get_onboarding_status():
+async def get_onboarding_status():
     """Get onboarding status for current user."""
-    user = mock_store.get_user("user_001")
+    user = await async_store.get_user("user_001")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -1,61 +1,106 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from typing import List, Optional, Tuple
+import pydantic_core
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel, Field
+from app.core.async_store import async_store
+from app.core.config import settings
 from app.core.mock_store import mock_store
+from app.core.security import get_fleet_scope
+from app.core.storage import InsufficientBalanceError
 from app.models.policy import PolicyResponse
+from app.utils.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.utils.ids import generate_policy_id
+from app.utils.serialization import FastJSONResponse, RecordSerializer
+from app.utils.snapshot_cache import SnapshotCache
 
 router = APIRouter()
 
 
+policy_records = RecordSerializer(PolicyResponse)
+
+# (ETag, body) of /policy/active/current per user. Entries also expire when
+# the policy's coverage ends: the store only records that expiry (and bumps
+# the policy version) once something reads or sweeps it.
+active_policy_cache = SnapshotCache(("policy",), settings.SNAPSHOT_CACHE_SIZE)
+
+# Largest fleet batch accepted by POST /policy/purchase/bulk
+MAX_BULK_PURCHASE = 5000
+
+# Longest coverage a single purchase can buy (one year)
+MAX_COVERAGE_HOURS = 24 * 365
+
+
 class PurchaseCoverageRequest(BaseModel):
-    durationHours: int
+    durationHours: int = Field(..., gt=0, le=MAX_COVERAGE_HOURS)
+
+
+class BulkPurchaseItem(BaseModel):
+    userId: str
+    durationHours: int = Field(..., gt=0, le=MAX_COVERAGE_HOURS)
+
+
+class BulkPurchaseRequest(BaseModel):
+    items: List[BulkPurchaseItem] = Field(..., min_length=1, max_length=MAX_BULK_PURCHASE)
+
+
+def _price_premium(duration_hours: int, sbt_score: int) -> Tuple[int, float, int]:
+    """Return (base premium, discount rate, premium paid)."""
+    # Premium calculation: ₹25/hour base
+    base_premium = 25 * duration_hours
+    
+    # SBT discount: 20% if score >= 50
+    discount_rate = 0.20 if sbt_score >= 50 else 0
+    return base_premium, discount_rate, int(base_premium * (1 - discount_rate))
 
 
 @router.post("/purchase")
-def purchase_coverage(request: PurchaseCoverageRequest):
+async def purchase_coverage(request: PurchaseCoverageRequest):
     """
     Purchase instant coverage for a shift.
     
     - Calculates premium (₹25/hour base)
     - Applies SBT discount (20% for score >= 50)
-    - Creates active policy
     - Deducts balance
+    - Creates active policy
     """
+    return await async_store.run(_purchase_coverage, request.durationHours)
+
+
+def _purchase_coverage(duration_hours: int):
     user = mock_store.get_user("user_001")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Premium calculation: ₹25/hour base
-    base_premium = 25 * request.durationHours
-    
-    # SBT discount: 20% if score >= 50
-    discount_rate = 0.20 if user["sbtScore"] >= 50 else 0
-    premium_paid = int(base_premium * (1 - discount_rate))
-    
-    # Check balance
-    if user["balance"] < premium_paid:
-        raise HTTPException(status_code=400, detail="Insufficient balance")
-    
-    # Create policy
-    policy = mock_store.create_policy("user_001", request.durationHours, premium_paid)
-    
-    # Deduct balance
-    mock_store.update_balance("user_001", -premium_paid)
+    base_premium, discount_rate, premium_paid = _price_premium(duration_hours, user["sbtScore"])
     
-    # Create transaction record
-    mock_store.create_transaction(
-        "user_001",
-        "premium",
-        premium_paid,
-        reference_id=policy["id"]
-    )
-    
-    # Create notification
-    mock_store.create_notification(
-        "user_001",
-        "Coverage purchased!",
-        f"You're covered for {request.durationHours}h. Policy ID: {policy['id']}",
-        "success"
-    )
+    policy_id = generate_policy_id()
+    with mock_store.batch():
+        # Post the premium (atomic check-and-debit, safe under concurrent requests)
+        try:
+            tx = mock_store.post_transaction(
+                "user_001",
+                "premium",
+                premium_paid,
+                reference_id=policy_id
+            )
+        except InsufficientBalanceError:
+            raise HTTPException(status_code=400, detail="Insufficient balance")
+        
+        # Create policy. batch() does not roll back the in-memory stores, so
+        # a failure here must not leave the premium debited
+        try:
+            policy = mock_store.create_policy("user_001", duration_hours, premium_paid, policy_id)
+        except Exception:
+            mock_store.post_transaction("user_001", "refund", premium_paid, reference_id=policy_id)
+            raise
+        
+        # Create notification
+        mock_store.create_notification(
+            "user_001",
+            "Coverage purchased!",
+            f"You're covered for {duration_hours}h. Policy ID: {policy['id']}",
+            "success"
+        )
     
     return {
         "policy": PolicyResponse(**policy),
@@ -65,14 +110,109 @@ def purchase_coverage(request: PurchaseCoverageRequest):
             "discountAmount": base_premium - premium_paid,
             "premiumPaid": premium_paid
         },
-        "newBalance": user["balance"] - premium_paid
+        "newBalance": tx["balanceAfter"]
+    }
+
+
+@router.post("/purchase/bulk")
+async def purchase_coverage_bulk(
+    request: BulkPurchaseRequest, scope: Optional[str] = Depends(get_fleet_scope)
+):
+    """
+    Purchase coverage for many riders in one request (fleet operators).
+    
+    Needs the fleet service key (X-Fleet-Key) to buy for other users; with
+    a bearer token every item must be for the token's own user.
+    
+    Prices every item in one pass, then debits wallets and creates the
+    policies, transactions and notifications with bulk store writes.
+    Items fail individually (unknown user, insufficient balance) without
+    affecting the rest. Results are returned in request order.
+    """
+    if scope is not None and any(item.userId != scope for item in request.items):
+        raise HTTPException(
+            status_code=403, detail="Buying for other users requires the fleet key"
+        )
+    return await async_store.run(_purchase_coverage_bulk, request.items)
+
+
+def _purchase_coverage_bulk(items: List[BulkPurchaseItem]):
+    users = mock_store.get_users(item.userId for item in items)
+    results = [None] * len(items)
+    
+    # Price everything up front
+    priced = []
+    for index, item in enumerate(items):
+        user = users.get(item.userId)
+        if not user:
+            results[index] = {"userId": item.userId, "status": "failed", "error": "User not found"}
+            continue
+        _, _, premium_paid = _price_premium(item.durationHours, user["sbtScore"])
+        priced.append((index, item, premium_paid, generate_policy_id()))
+    
+    with mock_store.batch():
+        # Reserve balances: one posting per item, None where the wallet is short
+        postings = mock_store.post_transactions([
+            (item.userId, "premium", premium_paid, policy_id)
+            for _, item, premium_paid, policy_id in priced
+        ])
+        purchased = []
+        for entry, tx in zip(priced, postings):
+            if tx is None:
+                index, item = entry[0], entry[1]
+                results[index] = {
+                    "userId": item.userId,
+                    "status": "failed",
+                    "error": "Insufficient balance"
+                }
+            else:
+                purchased.append((entry, tx))
+        
+        try:
+            policies = mock_store.create_policies([
+                (item.userId, item.durationHours, premium_paid, policy_id)
+                for (_, item, premium_paid, policy_id), _ in purchased
+            ])
+        except Exception:
+            # As in _purchase_coverage: refund the premiums of the items
+            # that got no policy before the failure
+            mock_store.post_transactions([
+                (item.userId, "refund", premium_paid, policy_id)
+                for (_, item, premium_paid, policy_id), _ in purchased
+                if mock_store.get_policy(policy_id) is None
+            ])
+            raise
+        mock_store.create_notifications([
+            (
+                item.userId,
+                "Coverage purchased!",
+                f"You're covered for {item.durationHours}h. Policy ID: {policy_id}",
+                "success"
+            )
+            for (_, item, _, policy_id), _ in purchased
+        ])
+    
+    for ((index, item, premium_paid, _), tx), policy in zip(purchased, policies):
+        results[index] = {
+            "userId": item.userId,
+            "status": "success",
+            "policy": PolicyResponse(**policy),
+            "premiumPaid": premium_paid,
+            "newBalance": tx["balanceAfter"]
+        }
+    
+    return {
+        "results": results,
+        "purchased": len(purchased),
+        "failed": len(items) - len(purchased),
+        "totalPremium": sum(entry[2] for entry, _ in purchased)
     }
 
 
 @router.get("/{policy_id}")
-def get_policy(policy_id: str):
+async def get_policy(policy_id: str):
     """Get details of a specific policy."""
-    policy = mock_store.get_policy(policy_id)
+    policy = await async_store.get_policy(policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
     
@@ -80,27 +220,33 @@ def get_policy(policy_id: str):
 
 
 @router.get("")
-def get_user_policies():
+async def get_user_policies():
     """Get all policies for the current user."""
-    policies = mock_store.get_user_policies("user_001")
-    return {
-        "policies": [PolicyResponse(**p) for p in policies],
+    policies = await async_store.get_user_policies("user_001")
+    return FastJSONResponse({
+        "policies": policy_records(policies),
         "count": len(policies)
-    }
+    })
 
 
 @router.get("/active/current")
-def get_active_policy():
+async def get_active_policy(request: Request):
     """Get the currently active policy for the user."""
-    policy = mock_store.get_active_policy("user_001")
+    versions = await async_store.get_versions("user_001")
+    cached = active_policy_cache.get("user_001", versions)
+    if cached is None:
+        policy = await async_store.get_active_policy("user_001")
+        etag = make_etag(mock_store.version_epoch, versions["policy"], policy and policy["id"])
+        body = pydantic_core.to_json({
+            "policy": policy_records([policy])[0] if policy else None,
+            "shiftStatus": "active" if policy else "inactive"
+        })
+        cached = (etag, body)
+        active_policy_cache.put(
+            "user_001", versions, cached, policy["coverageEnd"] if policy else None
+        )
     
-    if not policy:
-        return {
-            "policy": None,
-            "shiftStatus": "inactive"
-        }
-    
-    return {
-        "policy": PolicyResponse(**policy),
-        "shiftStatus": "active"
-    }
+    etag, body = cached
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=etag_headers(etag))
@@ -1,38 +1,51 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel
+from app.core.async_store import async_store
 from app.core.mock_store import mock_store
+from app.core.reputation import TELEMETRY_COUNTERS
+from app.utils.etag import etag_headers, etag_matches, make_etag, not_modified
 
 router = APIRouter()
 
 
+class TelemetryEventRequest(BaseModel):
+    type: str  # "speeding", "harsh_braking"
+    policyId: str = ""
+
+
 @router.get("")
-def get_reputation():
+async def get_reputation(request: Request, response: Response):
     """
     Get Safety Passport (SBT) reputation data.
     
     Returns SBT score, tier discount, and safety metrics.
     """
-    user = mock_store.get_user("user_001")
+    # The score lives on the user; the counters follow policies, claims and telemetry
+    versions = await async_store.get_versions("user_001")
+    etag = make_etag(
+        mock_store.version_epoch,
+        *(versions[c] for c in ("user", "policy", "claim", "telemetry")),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
+    
+    user = await async_store.get_user("user_001")
     if not user:
         return {"error": "User not found"}
     
-    # Calculate metrics from policies/claims
-    policies = mock_store.get_user_policies("user_001")
-    claims = []
-    for policy in policies:
-        claims.extend(mock_store.get_policy_claims(policy["id"]))
-    
-    speed_events = sum(1 for p in policies if "speed" in p.get("nftId", "").lower())
-    harsh_braking = sum(1 for p in policies if "brake" in p.get("nftId", "").lower())
+    # Counters are maintained as policies, claims and telemetry are written
+    counters = await async_store.get_reputation_counters("user_001")
     
     return {
         "sbtScore": user["sbtScore"],
         "tierDiscount": 20 if user["sbtScore"] >= 50 else 0,
         "metrics": {
-            "speedEvents": speed_events,
-            "harshBraking": harsh_braking,
-            "nightShifts": len([p for p in policies if "night" in p.get("nftId", "").lower()]),
-            "successfulClaims": sum(1 for c in claims if c["status"] == "paid"),
-            "totalPolicies": len(policies)
+            "speedEvents": counters["speedEvents"],
+            "harshBraking": counters["harshBraking"],
+            "nightShifts": counters["nightShifts"],
+            "successfulClaims": counters["successfulClaims"],
+            "totalPolicies": counters["totalPolicies"]
         },
         "badges": _get_badges(user["sbtScore"])
     }
@@ -54,21 +67,42 @@ def _get_badges(sbt_score: int) -> list:
     return badges
 
 
+@router.post("/events")
+async def record_telemetry_event(request: TelemetryEventRequest):
+    """
+    Record a telemetry event (speeding, harsh braking) for the current user.
+    
+    In a real system these would come from the rider app or an oracle.
+    """
+    if request.type not in TELEMETRY_COUNTERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"type must be one of: {', '.join(TELEMETRY_COUNTERS)}"
+        )
+    
+    event = await async_store.record_telemetry_event("user_001", request.type, request.policyId)
+    
+    return {
+        "event": event,
+        "metrics": await async_store.get_reputation_counters("user_001")
+    }
+
+
 @router.post("/update")
-def update_reputation_metrics():
+async def update_reputation_metrics():
     """
     Update SBT score based on recent activity.
     
     In a real system, this would be triggered by oracle data.
     For mock, we just recalculate.
     """
-    user = mock_store.get_user("user_001")
+    user = await async_store.get_user("user_001")
     if not user:
         return {"error": "User not found"}
     
     # Increment score by 5 points (demo)
     new_score = min(user["sbtScore"] + 5, 100)
-    mock_store.update_user("user_001", {"sbtScore": new_score})
+    await async_store.update_user("user_001", {"sbtScore": new_score})
     
     return {
         "message": "Reputation updated",
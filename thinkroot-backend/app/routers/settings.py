@@ -1,22 +1,42 @@
-from fastapi import APIRouter
-from app.core.mock_store import mock_store
+from typing import Optional
+from fastapi import APIRouter, Response
+from app.core.async_store import async_store
+from app.core.config import settings
+from app.core.event_hub import event_hub
 from app.models.common import HomeResponse
+from app.utils.snapshot_cache import SnapshotCache
 
 router = APIRouter()
 
+# Rendered home screens, valid until the user, their wallet or their policies
+# change (or the active policy's coverage ends)
+home_cache = SnapshotCache(("user", "wallet", "policy"), settings.SNAPSHOT_CACHE_SIZE)
+
 
 @router.get("/home")
-def get_home():
+async def get_home():
     """
     Get home screen overview.
     
     Returns shift status, balance, active policy, and alerts.
     """
-    user = mock_store.get_user("user_001")
-    if not user:
-        return {"error": "User not found"}
-    
-    active_policy = mock_store.get_active_policy("user_001")
+    # Versions are read before the data, so a write that lands while the
+    # snapshot is built leaves it cached under already-stale versions
+    versions = await async_store.get_versions("user_001")
+    body = home_cache.get("user_001", versions)
+    if body is None:
+        user = await async_store.get_user("user_001")
+        if not user:
+            return {"error": "User not found"}
+        
+        active_policy = await async_store.get_active_policy("user_001")
+        body = _render_home(user, active_policy)
+        expires_at = active_policy["coverageEnd"] if active_policy else None
+        home_cache.put("user_001", versions, body, expires_at)
+    return Response(content=body, media_type="application/json")
+
+
+def _render_home(user: dict, active_policy: Optional[dict]) -> bytes:
     shift_status = "active" if active_policy else "inactive"
     
     # Simulate alerts (would come from oracle data in real system)
@@ -32,29 +52,32 @@ def get_home():
         balance=user["balance"],
         activePolicy=dict(active_policy) if active_policy else None,
         alerts=alerts
-    )
+    ).model_dump_json().encode()
 
 
 @router.post("/settings/reset")
-def reset_demo():
+async def reset_demo():
     """
     Reset the entire mock store to initial state.
     
     Useful for resetting the demo between presentations.
     """
-    mock_store.reset()
+    await async_store.reset()
+    user = await async_store.get_user("user_001")
     
     return {
         "message": "Demo state reset successfully",
-        "newBalance": mock_store.get_user("user_001")["balance"]
+        "newBalance": user["balance"]
     }
 
 
 @router.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
         "service": "ParaCipher MVP Backend",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "sessions": await async_store.get_session_stats(),
+        "push": event_hub.stats()
     }
@@ -1,74 +1,171 @@
-from fastapi import APIRouter
+import asyncio
+from datetime import datetime
+from typing import Optional
+import pydantic_core
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from app.models.common import WalletResponse
+from app.core.async_store import async_store
+from app.core.chain_reader import chain_reader
+from app.core.config import settings
 from app.core.mock_store import mock_store
+from app.utils.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.utils.rpc import RpcError
+from app.utils.snapshot_cache import SnapshotCache
+from app.utils.timestamps import local_time
 
 router = APIRouter()
 
+# (ETag, body) of /wallet per user. Entries also expire when the first listed
+# policy's coverage ends: the store only marks it expired (and bumps the
+# policy version) once something reads or sweeps it.
+wallet_cache = SnapshotCache(("user", "policy"), settings.SNAPSHOT_CACHE_SIZE)
+
 
 @router.get("", response_model=WalletResponse)
-def get_wallet():
+async def get_wallet(request: Request):
     """
     Get wallet information.
     
     Returns wallet address, gasless status, and active policies.
     """
-    user = mock_store.get_user("user_001")
+    versions = await async_store.get_versions("user_001")
+    cached = wallet_cache.get("user_001", versions)
+    if cached is None:
+        user = await async_store.get_user("user_001")
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        # Policies past their coverage end are expired even if not swept yet
+        now = datetime.now()
+        policies = await async_store.get_user_policies("user_001")
+        active = [p for p in policies if p["status"] == "active" and p["coverageEnd"] > now]
+        active_policies = [p["id"] for p in active]
+        
+        # At fixed versions the active list only shrinks as coverage ends,
+        # so its length tells the bodies apart
+        etag = make_etag(
+            mock_store.version_epoch, versions["user"], versions["policy"], len(active_policies)
+        )
+        body = pydantic_core.to_json(WalletResponse(
+            walletAddress=user["walletAddress"],
+            gasless=True,
+            activePolicies=active_policies
+        ).model_dump())
+        cached = (etag, body)
+        wallet_cache.put(
+            "user_001", versions, cached, min((p["coverageEnd"] for p in active), default=None)
+        )
+    
+    etag, body = cached
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=etag_headers(etag))
+
+
+@router.get("/balance")
+async def get_balance(request: Request, response: Response, at: Optional[datetime] = None):
+    """
+    Get wallet balance.
+    
+    Query Parameters:
+    - at: ISO timestamp to get the balance as of that time (default: now)
+    """
+    # Store timestamps are naive; every backend gets the same local value
+    at = local_time(at)
+    versions = await async_store.get_versions("user_001")
+    etag = make_etag(mock_store.version_epoch, versions["wallet"], at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    user = await async_store.get_user("user_001")
     if not user:
         return {"error": "User not found"}
+    # Only successful bodies are tagged, so an error is never revalidated as current
+    response.headers.update(etag_headers(etag))
     
-    policies = mock_store.get_user_policies("user_001")
-    active_policies = [p["id"] for p in policies if p["status"] == "active"]
+    if at is None:
+        return {
+            "balance": user["balance"],
+            "currency": "INR"
+        }
     
-    return WalletResponse(
-        walletAddress=user["walletAddress"],
-        gasless=True,
-        activePolicies=active_policies
-    )
+    return {
+        "balance": await async_store.get_balance_at("user_001", at),
+        "currency": "INR",
+        "asOf": at
+    }
 
 
-@router.get("/balance")
-def get_balance():
-    """Get current wallet balance."""
-    user = mock_store.get_user("user_001")
+@router.get("/chain")
+async def get_chain_state(limit: int = Query(20, ge=1, le=100)):
+    """
+    On-chain state of the user's wallet, as indexed from contract events,
+    plus the contracts' current view of it when CHAIN_RPC_URL is set.
+    
+    Query Parameters:
+    - limit: Most recent events to include (default 20)
+    """
+    user = await async_store.get_user("user_001")
     if not user:
         return {"error": "User not found"}
     
+    live = None
+    live_error = None
+    missing = chain_reader.missing_contracts() if chain_reader is not None else []
+    if chain_reader is None:
+        live_error = "CHAIN_RPC_URL is not configured"
+    elif missing:
+        live_error = f"Contract address not configured: {', '.join(missing)}"
+    else:
+        wallet = user["walletAddress"].lower()
+        try:
+            live = (await asyncio.to_thread(chain_reader.worker_views, [wallet]))[wallet]
+        except RpcError as e:
+            # Node unreachable: serve the indexed state alone
+            live_error = str(e)
+    
     return {
-        "balance": user["balance"],
-        "currency": "INR"
+        "walletAddress": user["walletAddress"],
+        "state": await async_store.get_chain_state(user["walletAddress"]),
+        "events": await async_store.get_chain_events(user["walletAddress"], limit),
+        "live": live,
+        "liveError": live_error,
     }
 
 
 @router.post("/fund")
-def fund_wallet(amount: int):
+async def fund_wallet(amount: int = Query(..., gt=0)):
     """
     Mock fund wallet endpoint (for demo purposes).
     
     Adds credits to the wallet.
     """
+    return await async_store.run(_fund_wallet, amount)
+
+
+def _fund_wallet(amount: int):
     user = mock_store.get_user("user_001")
     if not user:
         return {"error": "User not found"}
     
-    new_balance = mock_store.update_balance("user_001", amount)
-    
-    # Record transaction
-    mock_store.create_transaction(
-        "user_001",
-        "topup",
-        amount
-    )
-    
-    # Notification
-    mock_store.create_notification(
-        "user_001",
-        "Wallet funded!",
-        f"₹{amount} added to your wallet.",
-        "success"
-    )
+    with mock_store.batch():
+        # Post the top-up to the ledger (credits the wallet)
+        tx = mock_store.post_transaction(
+            "user_001",
+            "topup",
+            amount
+        )
+        
+        # Notification
+        mock_store.create_notification(
+            "user_001",
+            "Wallet funded!",
+            f"₹{amount} added to your wallet.",
+            "success"
+        )
     
     return {
-        "previousBalance": user["balance"],
+        "previousBalance": tx["balanceAfter"] - amount,
         "fundedAmount": amount,
-        "newBalance": new_balance
+        "newBalance": tx["balanceAfter"]
     }
@@ -0,0 +1,33 @@
+import hashlib
+from typing import Any, Dict
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag for a response that is fully determined by `parts`.
+    
+    Routes pass the store's version epoch, the versions of the collections
+    the response reads and any query parameters that shape it.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    # no-cache: clients may store the body but must revalidate every poll
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
@@ -1,44 +1,122 @@
-import uuid
-import random
-import string
+import os
+import threading
+import time
+
+# Crockford base32 in lowercase; its characters sort in the same order as the
+# values they encode, so encoded IDs sort like the numbers behind them
+ENCODING = "0123456789abcdefghjkmnpqrstvwxyz"
+# Every 10-bit value as two characters
+_PAIRS = [a + b for a in ENCODING for b in ENCODING]
+
+# The 80 random bits are kept as a high part, re-encoded only when the
+# millisecond changes or the low part carries, and a 20-bit low part
+LOW_BITS = 20
+LOW_MAX = (1 << LOW_BITS) - 1
+HIGH_MAX = (1 << 60) - 1
+
+# NFT serials start above the legacy random NFT-100..NFT-999 range
+FIRST_NFT_SERIAL = 1000
+
+
+def _encode(value: int, length: int) -> str:
+    return "".join(ENCODING[(value >> shift) & 31] for shift in range(5 * (length - 1), -1, -5))
+
+
+class UlidGenerator:
+    """
+    Monotonic, time-sortable IDs in the ULID layout.
+    
+    An ID is a 48-bit millisecond timestamp followed by 80 random bits, as 26
+    base32 characters. The first ID of each millisecond draws fresh random
+    bits; later IDs in the same millisecond increment them. IDs from one
+    process therefore strictly increase, even if the clock steps back, and
+    sort by creation time. Processes draw their own random bits, so IDs
+    from different workers do not collide either.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ms = 0
+        self._high = 0
+        self._low = 0
+        self._prefix = _encode(0, 22)
+    
+    def new(self) -> str:
+        with self._lock:
+            ms = time.time_ns() // 1_000_000
+            if ms > self._ms:
+                self._ms = ms
+                random = int.from_bytes(os.urandom(10), "big")
+                self._high, self._low = random >> LOW_BITS, random & LOW_MAX
+                self._prefix = _encode(ms, 10) + _encode(self._high, 12)
+            elif self._low < LOW_MAX:
+                self._low += 1
+            else:
+                self._low = 0
+                if self._high < HIGH_MAX:
+                    self._high += 1
+                else:
+                    # 2^80 IDs in one millisecond: borrow the next millisecond
+                    self._ms += 1
+                    self._high = 0
+                self._prefix = _encode(self._ms, 10) + _encode(self._high, 12)
+            return self._prefix + _PAIRS[self._low >> 10] + _PAIRS[self._low & 1023]
+
+
+_ulids = UlidGenerator()
+
+
+def new_ulid() -> str:
+    """Generate a monotonic, time-sortable 26-character ID."""
+    return _ulids.new()
 
 
 def generate_id(prefix: str = "") -> str:
     """Generate a unique ID with optional prefix."""
-    unique = str(uuid.uuid4())[:8]
+    unique = new_ulid()
     return f"{prefix}{unique}" if prefix else unique
 
 
 def generate_user_id() -> str:
     """Generate a user ID."""
-    return f"user_{uuid.uuid4().hex[:8]}"
+    return f"user_{new_ulid()}"
 
 
 def generate_policy_id() -> str:
     """Generate a policy ID."""
-    return f"policy_{uuid.uuid4().hex[:8]}"
+    return f"policy_{new_ulid()}"
 
 
 def generate_claim_id() -> str:
     """Generate a claim ID."""
-    return f"claim_{uuid.uuid4().hex[:8]}"
+    return f"claim_{new_ulid()}"
 
 
 def generate_transaction_id() -> str:
     """Generate a transaction ID."""
-    return f"tx_{uuid.uuid4().hex[:8]}"
+    return f"tx_{new_ulid()}"
 
 
-def generate_nft_id() -> str:
-    """Generate an NFT ID."""
-    return f"NFT-{random.randint(100, 999)}"
+def generate_event_id() -> str:
+    """Generate a telemetry event ID."""
+    return f"evt_{new_ulid()}"
+
+
+def format_nft_id(serial: int) -> str:
+    """Format an NFT ID from a serial allocated by the store."""
+    return f"NFT-{serial}"
+
+
+def nft_serial(nft_id: str) -> int:
+    """The serial behind an NFT ID (legacy NFT-100..NFT-999 included)."""
+    return int(nft_id[len("NFT-"):])
 
 
 def generate_wallet_address() -> str:
     """Generate a mock wallet address."""
-    return "0x" + "".join(random.choices(string.hexdigits[:-6].upper(), k=40))
+    return "0x" + os.urandom(20).hex().upper()
 
 
 def generate_tx_hash() -> str:
     """Generate a mock transaction hash."""
-    return "0x" + "".join(random.choices(string.hexdigits[:-6], k=64))
+    return "0x" + os.urandom(32).hex()
@@ -0,0 +1,48 @@
+from typing import AsyncIterator, List, Optional, Tuple
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into numbered NDJSON lines.
+    
+    Yields (line number, line) as soon as each line is complete, so memory
+    stays bounded by one line plus one chunk however long the stream is.
+    Lines longer than max_line_bytes are skipped and yielded as None.
+    
+    Each chunk is scanned from an offset rather than re-sliced per line, and
+    a line spanning several chunks is joined once, so the work is linear in
+    the stream size.
+    """
+    # Pieces of the current line from earlier chunks
+    pending: List[bytes] = []
+    pending_size = 0
+    line_number = 0
+    oversized = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                break
+            line_number += 1
+            if oversized or pending_size + end - start > max_line_bytes:
+                yield line_number, None
+            elif pending:
+                pending.append(chunk[start:end])
+                yield line_number, b"".join(pending)
+            else:
+                yield line_number, chunk[start:end]
+            pending, pending_size, oversized = [], 0, False
+            start = end + 1
+        if oversized or start == len(chunk):
+            continue
+        if pending_size + len(chunk) - start > max_line_bytes:
+            # Drop the rest of an oversized line as it streams in
+            oversized, pending, pending_size = True, [], 0
+        else:
+            pending.append(chunk[start:] if start else chunk)
+            pending_size += len(chunk) - start
+    if pending or oversized:
+        yield line_number + 1, None if oversized else b"".join(pending)
@@ -0,0 +1,36 @@
+import base64
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+def encode_cursor(position: int) -> str:
+    """Encode a position in a per-user log as an opaque cursor."""
+    return base64.urlsafe_b64encode(str(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor}") from exc
+    if position < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return position
+
+
+def page_newest_first(
+    log: Sequence[Any], limit: int, cursor: Optional[str] = None, first: int = 0
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Return one page of an append-ordered log, newest entry first.
+    
+    The cursor marks where the previous page stopped, so each page costs
+    O(limit) regardless of how long the log is. `first` is the oldest
+    position still held by the log (non-zero for a RingBuffer).
+    """
+    end = min(decode_cursor(cursor), len(log)) if cursor else len(log)
+    start = max(end - limit, first)
+    items = list(log[start:end])
+    items.reverse()
+    return items, encode_cursor(start) if start > first else None
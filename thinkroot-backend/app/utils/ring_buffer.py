@@ -0,0 +1,48 @@
+from typing import Any, Iterator, List, Optional
+
+
+class RingBuffer:
+    """
+    Fixed-capacity log that forgets its oldest entries.
+    
+    Positions are absolute, like indexes into an append-only list:
+    len() is the number of entries ever appended and `first` is the
+    position of the oldest entry still retained. Slicing takes absolute
+    positions and only returns retained entries.
+    """
+    
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._items: List[Any] = []
+        self._total = 0
+    
+    def append(self, item: Any) -> Optional[Any]:
+        """Append an item, returning the entry it evicted (if any)."""
+        evicted = None
+        if len(self._items) < self.capacity:
+            self._items.append(item)
+        else:
+            slot = self._total % self.capacity
+            evicted = self._items[slot]
+            self._items[slot] = item
+        self._total += 1
+        return evicted
+    
+    @property
+    def first(self) -> int:
+        return self._total - len(self._items)
+    
+    def __len__(self) -> int:
+        return self._total
+    
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate retained entries, oldest first."""
+        for position in range(self.first, self._total):
+            yield self._items[position % self.capacity]
+    
+    def __getitem__(self, key: slice) -> List[Any]:
+        start, stop, _ = key.indices(self._total)
+        start = max(start, self.first)
+        return [self._items[p % self.capacity] for p in range(start, stop)]
@@ -0,0 +1,197 @@
+import http.client
+import json
+import queue
+import threading
+import urllib.parse
+from itertools import count
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+class RpcError(Exception):
+    """A JSON-RPC call failed, either on the wire or with an error response."""
+    
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP connections to one JSON-RPC endpoint.
+    
+    At most `size` requests are in flight at once; idle connections are
+    reused, so most requests skip the TCP (and TLS) handshake.
+    """
+    
+    def __init__(self, url: str, size: int, timeout: float):
+        parts = urllib.parse.urlsplit(url)
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self._host = parts.netloc
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.opened = 0
+    
+    def _connect(self) -> http.client.HTTPConnection:
+        self.opened += 1
+        return self._connection_class(self._host, timeout=self._timeout)
+    
+    def post(self, body: bytes) -> bytes:
+        with self._slots:
+            try:
+                conn, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._connect(), False
+            while True:
+                try:
+                    conn.request("POST", self._path, body, {"Content-Type": "application/json"})
+                    response = conn.getresponse()
+                    data = response.read()
+                except (http.client.HTTPException, OSError) as e:
+                    conn.close()
+                    if reused:
+                        # The server closed an idle connection; retry once on a new one
+                        conn, reused = self._connect(), False
+                        continue
+                    raise RpcError(f"RPC request failed: {e}")
+                if response.status != 200:
+                    conn.close()
+                    raise RpcError(f"RPC request failed: HTTP {response.status}")
+                self._idle.put(conn)
+                return data
+    
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class JsonRpcClient:
+    """
+    Ethereum JSON-RPC client over pooled keep-alive HTTP (stdlib only).
+    
+    batch() sends many calls in one HTTP request (a JSON-RPC batch), split
+    into requests of at most `max_batch_size` calls.
+    """
+    
+    def __init__(
+        self, url: str, timeout: float = 10.0, pool_size: int = 8, max_batch_size: int = 100
+    ):
+        self.url = url
+        self.max_batch_size = max_batch_size
+        self._pool = ConnectionPool(url, pool_size, timeout)
+        self._ids = count(1)
+        self.requests = 0
+    
+    def _post(self, payload: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Any:
+        self.requests += 1
+        data = self._pool.post(json.dumps(payload).encode())
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise RpcError(f"RPC request failed: bad JSON reply ({e})")
+    
+    @staticmethod
+    def _result(method: str, reply: Dict[str, Any]) -> Any:
+        if reply.get("error"):
+            error = reply["error"]
+            return RpcError(f"{method} failed: {error.get('message')}", error.get("code"))
+        return reply.get("result")
+    
+    def call(self, method: str, params: Optional[List[Any]] = None) -> Any:
+        reply = self._post({
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": method,
+            "params": params or [],
+        })
+        result = self._result(method, reply)
+        if isinstance(result, RpcError):
+            raise result
+        return result
+    
+    def batch(self, calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        """
+        Results of (method, params) calls, in order. A call that failed on
+        the server yields an RpcError in its place; a transport failure
+        raises.
+        """
+        results: List[Any] = []
+        for start in range(0, len(calls), self.max_batch_size):
+            chunk = calls[start:start + self.max_batch_size]
+            ids = [next(self._ids) for _ in chunk]
+            replies = self._post([
+                {"jsonrpc": "2.0", "id": id_, "method": method, "params": params}
+                for id_, (method, params) in zip(ids, chunk)
+            ])
+            if not isinstance(replies, list):
+                # Some nodes answer a whole batch with one error object
+                raise RpcError(f"batch failed: {self._result('batch', replies)}")
+            by_id = {reply.get("id"): reply for reply in replies}
+            for id_, (method, _) in zip(ids, chunk):
+                reply = by_id.get(id_)
+                results.append(
+                    self._result(method, reply) if reply else RpcError(f"{method} failed: no reply")
+                )
+        return results
+    
+    def block_number(self) -> int:
+        return int(self.call("eth_blockNumber"), 16)
+    
+    def get_logs(
+        self, addresses: List[str], topics: List[str], from_block: int, to_block: int
+    ) -> List[Dict[str, Any]]:
+        """Logs of `addresses` matching any of `topics` (as topic0) in a block range."""
+        return self.call("eth_getLogs", [{
+            "address": addresses,
+            "topics": [topics],
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+        }])
+    
+    def close(self):
+        self._pool.close()
+
+
+class RecordedRpc:
+    """
+    Replays logs recorded from a node, for running the indexer offline.
+    
+    A recording is JSON: {"head": <block number>, "logs": [<eth_getLogs
+    entries>]}. `max_range` makes get_logs reject wide ranges the way public
+    RPC providers do, so range adaptation can be exercised too.
+    """
+    
+    def __init__(self, recording: Dict[str, Any], max_range: Optional[int] = None):
+        self.head = recording["head"]
+        self.logs = recording["logs"]
+        self.max_range = max_range
+        self.calls = 0
+    
+    @classmethod
+    def load(cls, path: str, max_range: Optional[int] = None) -> "RecordedRpc":
+        with open(path) as f:
+            return cls(json.load(f), max_range)
+    
+    def block_number(self) -> int:
+        return self.head
+    
+    def get_logs(
+        self, addresses: List[str], topics: List[str], from_block: int, to_block: int
+    ) -> List[Dict[str, Any]]:
+        self.calls += 1
+        if self.max_range is not None and to_block - from_block + 1 > self.max_range:
+            raise RpcError("eth_getLogs failed: block range too large", -32005)
+        wanted_addresses = {a.lower() for a in addresses}
+        wanted_topics = {t.lower() for t in topics}
+        return [
+            log for log in self.logs
+            if from_block <= int(log["blockNumber"], 16) <= to_block
+            and log["address"].lower() in wanted_addresses
+            and log["topics"][0].lower() in wanted_topics
+        ]
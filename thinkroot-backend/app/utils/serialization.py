@@ -0,0 +1,34 @@
+from typing import Any, Dict, Iterable, List, Type
+import pydantic_core
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded by pydantic-core.
+    
+    Returning it from a route skips FastAPI's jsonable_encoder pass, and
+    datetimes are encoded natively (ISO 8601, like the model responses).
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+class RecordSerializer:
+    """
+    Shape trusted store records like `model` without building a model per record.
+    
+    Keys the model does not declare (internal ledger fields, for example)
+    are dropped. Records are not validated, so only pass store output.
+    """
+    
+    def __init__(self, model: Type[BaseModel]):
+        fields = {name: field.annotation for name, field in model.model_fields.items()}
+        record = TypedDict(f"{model.__name__}Record", fields, total=False)
+        self._adapter = TypeAdapter(List[record])
+    
+    def __call__(self, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self._adapter.dump_python(list(records))
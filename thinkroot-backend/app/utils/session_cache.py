@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SessionCache:
+    """
+    Token -> session map with a TTL and a size cap.
+    
+    A session expires `ttl` after it was created (its "expiresAt" field).
+    Expired sessions are dropped lazily when looked up and in bulk by
+    purge_expired(), which the background sweeper runs. When the cache is
+    full, the least recently used session is evicted, so memory stays bounded
+    however many clients log in.
+    """
+    
+    def __init__(self, max_entries: int, ttl: timedelta):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._sessions: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def put(self, token: str, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a session, setting expiresAt from createdAt if it has none."""
+        session.setdefault("expiresAt", session["createdAt"] + self.ttl)
+        with self._lock:
+            self._sessions[token] = session
+            self._sessions.move_to_end(token)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+        return session
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                self.misses += 1
+                return None
+            if session["expiresAt"] <= datetime.now():
+                del self._sessions[token]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._sessions.move_to_end(token)
+            self.hits += 1
+            return session
+    
+    def pop(self, token: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(token, None) is not None
+    
+    def purge_expired(self, now: Optional[datetime] = None) -> int:
+        """Drop every expired session. Returns how many were dropped."""
+        now = now or datetime.now()
+        with self._lock:
+            expired = [t for t, s in self._sessions.items() if s["expiresAt"] <= now]
+            for token in expired:
+                del self._sessions[token]
+            self.expired += len(expired)
+        return len(expired)
+    
+    def items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            return list(self._sessions.items())
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._sessions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
@@ -0,0 +1,51 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+class SnapshotCache:
+    """
+    Bounded per-user cache of rendered responses.
+    
+    Each entry remembers the store versions it was built from (one per
+    collection it depends on) and, optionally, a time after which it is stale
+    anyway. get() only returns an entry built at the user's current versions,
+    so a write to any of those collections invalidates it. The least recently
+    used users are dropped first.
+    """
+    
+    def __init__(self, collections: Tuple[str, ...], max_entries: int):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.collections = collections
+        self.max_entries = max_entries
+        # user_id -> (versions, expiry time, value)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _key(self, versions: Dict[str, int]) -> Tuple[int, ...]:
+        return tuple(versions[collection] for collection in self.collections)
+    
+    def get(self, user_id: str, versions: Dict[str, int]) -> Optional[Any]:
+        key = self._key(versions)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != key or (entry[1] and entry[1] <= datetime.now()):
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[2]
+    
+    def put(
+        self,
+        user_id: str,
+        versions: Dict[str, int],
+        value: Any,
+        expires_at: Optional[datetime] = None,
+    ):
+        """Cache a value built from data read at (or after) `versions`."""
+        with self._lock:
+            self._entries[user_id] = (self._key(versions), expires_at, value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
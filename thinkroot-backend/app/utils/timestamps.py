@@ -0,0 +1,9 @@
+from datetime import datetime
+from typing import Optional
+
+
+def local_time(value: Optional[datetime]) -> Optional[datetime]:
+    """Store timestamps are naive local time; convert aware query values to match."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
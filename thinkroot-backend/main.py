@@ -1,23 +1,57 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.core.async_store import async_store
+from app.core.claim_pipeline import claim_pipeline
+from app.core.event_hub import event_hub
+from app.core.tasks import (
+    expire_policies_periodically,
+    index_chain_periodically,
+    purge_sessions_periodically,
+    snapshot_periodically,
+    sync_revocations_periodically,
+)
 from app.routers import (
     auth,
     onboarding,
     policy,
     claims,
     history,
+    notifications,
     reputation,
     wallet,
     settings as settings_router,
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background tasks."""
+    claim_pipeline.start()
+    event_hub.start()
+    tasks = [
+        asyncio.create_task(expire_policies_periodically()),
+        asyncio.create_task(purge_sessions_periodically()),
+        asyncio.create_task(snapshot_periodically()),
+        asyncio.create_task(sync_revocations_periodically()),
+        asyncio.create_task(index_chain_periodically()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    await claim_pipeline.stop()
+    event_hub.stop()
+    async_store.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
     version=settings.API_VERSION,
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -36,6 +70,7 @@ app.include_router(onboarding.router, prefix="/onboarding", tags=["Onboarding"])
 app.include_router(policy.router, prefix="/policy", tags=["Policies"])
 app.include_router(claims.router, prefix="/claims", tags=["Claims"])
 app.include_router(history.router, prefix="/history", tags=["Transaction History"])
+app.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
 app.include_router(reputation.router, prefix="/reputation", tags=["Safety Passport"])
 app.include_router(wallet.router, prefix="/wallet", tags=["Wallet"])
 app.include_router(settings_router.router, prefix="/api", tags=["Settings & Health"])
@@ -69,4 +104,11 @@ async def general_exception_handler(request, exc):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    
+    if settings.ENVIRONMENT == "production" or settings.WORKERS > 1:
+        # Every worker has its own heap, so state must live in a shared backend
+        if settings.WORKERS > 1 and settings.STORAGE_BACKEND != "sqlite":
+            raise SystemExit("WORKERS > 1 requires STORAGE_BACKEND=sqlite")
+        uvicorn.run("main:app", host="0.0.0.0", port=settings.PORT, workers=settings.WORKERS)
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=settings.PORT, reload=True)
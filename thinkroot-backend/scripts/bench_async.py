@@ -0,0 +1,139 @@
+"""
+Benchmark sync vs async request paths.
+
+Serves the same read endpoints twice from a uvicorn server in its own
+process: once as blocking `def` handlers calling the store directly (FastAPI
+runs them on its threadpool) and once as `async def` handlers going through
+AsyncStore. Then drives both with concurrent HTTP clients and reports
+requests/sec and latency percentiles.
+
+Usage (from thinkroot-backend/, needs `pip install httpx`):
+    python scripts/bench_async.py [--backend memory|sqlite]
+                                  [--concurrency 64] [--requests 5000]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def build_app():
+    from fastapi import FastAPI
+    from app.core.async_store import async_store
+    from app.core.mock_store import mock_store
+    
+    app = FastAPI()
+    
+    @app.get("/sync/home")
+    def sync_home():
+        user = mock_store.get_user("user_001")
+        policy = mock_store.get_active_policy("user_001")
+        return {"balance": user["balance"], "activePolicy": policy}
+    
+    @app.get("/async/home")
+    async def async_home():
+        user = await async_store.get_user("user_001")
+        policy = await async_store.get_active_policy("user_001")
+        return {"balance": user["balance"], "activePolicy": policy}
+    
+    @app.get("/sync/history")
+    def sync_history():
+        transactions, _ = mock_store.get_user_transactions_page("user_001", limit=20)
+        return {"transactions": transactions}
+    
+    @app.get("/async/history")
+    async def async_history():
+        transactions, _ = await async_store.get_user_transactions_page("user_001", limit=20)
+        return {"transactions": transactions}
+    
+    # Some data so the endpoints do real work
+    mock_store.create_policy("user_001", 8, 160)
+    for _ in range(100):
+        mock_store.post_transaction("user_001", "topup", 10)
+    return app
+
+
+def serve(port: int):
+    import uvicorn
+    
+    uvicorn.run(build_app(), port=port, log_level="warning")
+
+
+def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+async def drive(url: str, total: int, concurrency: int):
+    import httpx
+    
+    latencies = []
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async request paths")
+    parser.add_argument("--backend", default="memory", choices=["memory", "sqlite"])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["STORAGE_BACKEND"] = args.backend
+    os.environ["SQLITE_PATH"] = os.path.join(tmp.name, "bench.db")
+    
+    server = multiprocessing.Process(target=serve, args=(args.port,), daemon=True)
+    server.start()
+    wait_for_port(args.port)
+    
+    print(f"backend={args.backend} concurrency={args.concurrency} requests={args.requests}")
+    print(f"{'endpoint':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for endpoint in ("home", "history"):
+        for path in ("sync", "async"):
+            url = f"http://127.0.0.1:{args.port}/{path}/{endpoint}"
+            # Warm up connections and caches before measuring
+            asyncio.run(drive(url, min(500, args.requests), args.concurrency))
+            result = asyncio.run(drive(url, args.requests, args.concurrency))
+            print(
+                f"{path + '/' + endpoint:<16}{result['rps']:>10,.0f}"
+                f"{result['p50']:>10.2f}{result['p99']:>10.2f}"
+            )
+    
+    server.terminate()
+    server.join()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
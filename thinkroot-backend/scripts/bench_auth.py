@@ -0,0 +1,72 @@
+"""
+Benchmark per-request authentication overhead.
+
+Compares the legacy opaque-token check (a session lookup in the in-memory
+and SQLite stores) with verifying a signed token in app/core/security.py,
+both uncached (HMAC + JSON decode on every call) and through the verifier's
+LRU. Tokens are spread over --users distinct sessions so the store lookups
+do not all hit the same row.
+
+Usage (from thinkroot-backend/):
+    python scripts/bench_auth.py [--count 100000] [--users 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.core.mock_store import MockStore
+from app.core.security import TokenVerifier, issue_token
+from app.core.sqlite_store import SQLiteStore
+
+
+def per_call_us(fn, tokens, count: int) -> float:
+    """Mean microseconds per fn(token) over `count` calls."""
+    picks = [random.choice(tokens) for _ in range(count)]
+    started = time.perf_counter()
+    for token in picks:
+        fn(token)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-request auth overhead")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+    
+    issued = [issue_token(f"user_{i:06d}") for i in range(args.users)]
+    tokens = [token for token, _ in issued]
+    
+    memory = MockStore()
+    sqlite = SQLiteStore(os.path.join(tempfile.mkdtemp(), "bench_auth.db"))
+    for token, claims in issued:
+        memory.create_session(claims["sub"], token)
+        sqlite.create_session(claims["sub"], token)
+    
+    uncached = TokenVerifier(settings.SECRET_KEY, 0)
+    cached = TokenVerifier(settings.SECRET_KEY, max(args.users, 1))
+    # A few revocations so the membership check is not against an empty set
+    for _, claims in issued[: args.users // 100]:
+        uncached.revoked.add(claims["jti"] + "x", claims["exp"])
+        cached.revoked.add(claims["jti"] + "x", claims["exp"])
+    
+    cases = [
+        ("memory session lookup", memory.get_session),
+        ("sqlite session lookup", sqlite.get_session),
+        ("hmac verify (no cache)", uncached.verify),
+        ("hmac verify (lru)", cached.verify),
+    ]
+    print(f"{'check':<26}{'us/request':>12}")
+    for name, fn in cases:
+        print(f"{name:<26}{per_call_us(fn, tokens, args.count):>12.2f}")
+    sqlite.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark claim intake latency during a spike.
+
+Fires --requests claims from --concurrency clients at once, first through
+POST /claims/simulate (claim, approval, payout and notification inside the
+request) and then through POST /claims (the claim is stored and queued; the
+claim pipeline does the rest in the background). Reports intake latency
+percentiles, how many claims were shed with 503, and how long the pipeline
+took to drain. Runs in-process against the app, including its lifespan.
+
+Usage (from thinkroot-backend/, needs `pip install httpx`):
+    python scripts/bench_claims.py [--backend memory|sqlite]
+                                   [--concurrency 64] [--requests 2000]
+                                   [--queue-size 1000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0.0
+
+
+async def spike(client, path: str, total: int, concurrency: int):
+    """POST `total` claims with `concurrency` clients; returns (latencies ms, status counts)."""
+    latencies = []
+    statuses = {}
+    remaining = iter(range(total))
+    
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            r = await client.post(path, json={"description": "Spike claim"})
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+    
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses
+
+
+def report(name: str, latencies, statuses, seconds: float):
+    print(
+        f"{name:<16}{len(latencies) / seconds:>9.0f}{percentile(latencies, 0.50):>9.1f}"
+        f"{percentile(latencies, 0.99):>9.1f}{max(latencies):>9.1f}   {statuses}"
+    )
+
+
+async def run(args):
+    import httpx
+    from main import app, lifespan
+    from app.core.claim_pipeline import claim_pipeline
+    
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    async with lifespan(app), client:
+        await client.post("/api/settings/reset")
+        await client.post("/policy/purchase", json={"durationHours": 12})
+        
+        print(f"{args.requests} claims, {args.concurrency} concurrent clients, {args.backend} backend")
+        print(f"{'path':<16}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}   statuses")
+        
+        started = time.perf_counter()
+        latencies, statuses = await spike(client, "/claims/simulate", args.requests, args.concurrency)
+        report("sync simulate", latencies, statuses, time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        latencies, statuses = await spike(client, "/claims", args.requests, args.concurrency)
+        report("async pipeline", latencies, statuses, time.perf_counter() - started)
+        
+        while claim_pipeline.active:
+            await asyncio.sleep(0.01)
+        drained = time.perf_counter() - started
+        stats = claim_pipeline.stats()
+        print(
+            f"pipeline drained in {drained * 1000:.0f} ms: {stats['completed']} paid, "
+            f"{stats['stopped']} rejected, {stats['failed']} failed, {stats['shed']} shed"
+        )
+        for name, metrics in stats["stages"].items():
+            print(f"  {name:<9} p50 {metrics['p50Ms']:>8.3f} ms   p95 {metrics['p95Ms']:>8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark claim intake during a spike")
+    parser.add_argument("--backend", default="memory", choices=["memory", "sqlite"])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    args = parser.parse_args()
+    
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["STORAGE_BACKEND"] = args.backend
+    os.environ["SQLITE_PATH"] = os.path.join(tmp.name, "bench.db")
+    os.environ["CLAIM_QUEUE_SIZE"] = str(args.queue_size)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark ID generation.
+
+Measures IDs generated per second for the legacy generators (truncated
+uuid4, random.choices hashes) and the current ones in app/utils/ids.py,
+from one thread and from several threads sharing the generator. Also checks
+that the ULIDs produced by one process are unique and strictly increasing.
+
+Usage (from thinkroot-backend/):
+    python scripts/bench_ids.py [--count 200000] [--threads 8]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.utils.ids import generate_transaction_id, generate_tx_hash, new_ulid
+
+
+def legacy_transaction_id() -> str:
+    return f"tx_{uuid.uuid4().hex[:8]}"
+
+
+def legacy_tx_hash() -> str:
+    return "0x" + "".join(random.choices(string.hexdigits[:-6], k=64))
+
+
+def rate(fn, count: int, threads: int) -> float:
+    """IDs per second with `threads` threads splitting `count` calls."""
+    per_thread = count // threads
+    
+    def work():
+        for _ in range(per_thread):
+            fn()
+    
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def check_ulids(count: int, threads: int):
+    """Generate from several threads at once and verify uniqueness and order."""
+    results = [[] for _ in range(threads)]
+    
+    def work(out):
+        for _ in range(count // threads):
+            out.append(new_ulid())
+    
+    workers = [threading.Thread(target=work, args=(out,)) for out in results]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    ids = [i for out in results for i in out]
+    if len(set(ids)) != len(ids):
+        raise SystemExit("duplicate ULIDs generated")
+    for out in results:
+        # Each thread sees its own IDs in increasing order
+        if out != sorted(out):
+            raise SystemExit("ULIDs not monotonic")
+    print(f"checked {len(ids):,} ULIDs from {threads} threads: unique and monotonic")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ID generation")
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    
+    cases = [
+        ("legacy tx id", legacy_transaction_id),
+        ("ulid tx id", generate_transaction_id),
+        ("legacy tx hash", legacy_tx_hash),
+        ("urandom tx hash", generate_tx_hash),
+    ]
+    print(f"{'generator':<18}{'1 thread/s':>14}{f'{args.threads} threads/s':>16}")
+    for name, fn in cases:
+        single = rate(fn, args.count, 1)
+        multi = rate(fn, args.count, args.threads)
+        print(f"{name:<18}{single:>14,.0f}{multi:>16,.0f}")
+    check_ulids(args.count, args.threads)
+
+
+if __name__ == "__main__":
+    main()
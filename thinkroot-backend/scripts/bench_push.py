@@ -0,0 +1,234 @@
+"""
+Load test: polling vs the push stream.
+
+Runs the app under uvicorn in its own process. A writer funds the wallet
+every --write-interval seconds (each top-up is a wallet, policy-free and
+notification change) while --clients clients watch the balance:
+
+  polling   every client requests GET /api/home and GET /notifications
+            every --poll-interval seconds, the way the app polls today
+  push      every client holds one GET /notifications/stream open and
+            only reads the events it is sent
+
+Reports the HTTP requests the clients made (stream opens included), how
+long it took each client to see each new balance, and the server's memory
+with all clients connected.
+Clients use raw asyncio connections so thousands fit in one process.
+
+Usage (from thinkroot-backend/):
+    python scripts/bench_push.py [--clients 1000] [--duration 10]
+                                 [--poll-interval 2] [--write-interval 0.5]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def serve(port: int):
+    import uvicorn
+    
+    uvicorn.run("main:app", port=port, log_level="warning", backlog=4096)
+
+
+def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            return status, headers
+        name, _, value = line.partition(":")
+        headers[name.lower()] = value.strip()
+
+
+async def request(reader, writer, method: str, path: str) -> Tuple[int, bytes]:
+    """One request on a keep-alive connection (responses with Content-Length only)."""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: 0\r\n\r\n".encode())
+    status, headers = await read_head(reader)
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, body
+
+
+class Run:
+    """Shared counters for one mode."""
+    
+    def __init__(self):
+        self.requests = 0
+        self.events = 0
+        # balance -> time the top-up was sent
+        self.written: Dict[int, float] = {}
+        self.lags: List[float] = []
+        self.stop = False
+    
+    def saw_balance(self, balance: int, last: int) -> int:
+        """Record the delay for every top-up between `last` and `balance`."""
+        now = time.perf_counter()
+        for seen in range(last + 1, balance + 1):
+            if seen in self.written:
+                self.lags.append(now - self.written[seen])
+        return max(balance, last)
+
+
+async def writer_task(port: int, run: Run, interval: float):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    while not run.stop:
+        sent = time.perf_counter()
+        _, body = await request(reader, writer, "POST", "/wallet/fund?amount=1")
+        run.written[json.loads(body)["newBalance"]] = sent
+        await asyncio.sleep(interval)
+    writer.close()
+
+
+async def poll_client(port: int, run: Run, interval: float, start_balance: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    last = start_balance
+    await asyncio.sleep(random.random() * interval)
+    while not run.stop:
+        _, body = await request(reader, writer, "GET", "/api/home")
+        await request(reader, writer, "GET", "/notifications?limit=20")
+        run.requests += 2
+        last = run.saw_balance(json.loads(body)["balance"], last)
+        await asyncio.sleep(interval)
+    writer.close()
+
+
+async def push_client(port: int, run: Run, connected: asyncio.Event, start_balance: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /notifications/stream HTTP/1.1\r\nHost: bench\r\n\r\n")
+    run.requests += 1
+    status, headers = await read_head(reader)
+    assert status == 200 and headers.get("transfer-encoding") == "chunked", (status, headers)
+    last = start_balance
+    buffer = b""
+    connected.set()
+    try:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                break
+            buffer += await reader.readexactly(size + 2)
+            buffer = buffer[:-2] if buffer.endswith(b"\r\n") else buffer
+            *events, buffer = buffer.split(b"\n\n")
+            for event in events:
+                fields = dict(
+                    line.split(b": ", 1) for line in event.split(b"\n") if b": " in line
+                )
+                if fields.get(b"event") == b"wallet":
+                    run.events += 1
+                    last = run.saw_balance(json.loads(fields[b"data"])["balance"], last)
+    except (asyncio.CancelledError, ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_mode(mode: str, args, server_pid: int) -> Dict[str, float]:
+    run = Run()
+    reader, writer = await asyncio.open_connection("127.0.0.1", args.port)
+    await request(reader, writer, "POST", "/api/settings/reset")
+    _, body = await request(reader, writer, "GET", "/wallet/balance")
+    start_balance = json.loads(body)["balance"]
+    writer.close()
+    
+    if mode == "polling":
+        clients = [
+            asyncio.create_task(poll_client(args.port, run, args.poll_interval, start_balance))
+            for _ in range(args.clients)
+        ]
+    else:
+        clients = []
+        for _ in range(args.clients):
+            connected = asyncio.Event()
+            clients.append(asyncio.create_task(
+                push_client(args.port, run, connected, start_balance)
+            ))
+            await connected.wait()
+    
+    idle_rss = rss_mb(server_pid)
+    write = asyncio.create_task(writer_task(args.port, run, args.write_interval))
+    await asyncio.sleep(args.duration)
+    run.stop = True
+    await write
+    # Let the last top-up reach everyone
+    await asyncio.sleep(max(args.poll_interval if mode == "polling" else 0.5, 0.5))
+    for client in clients:
+        client.cancel()
+    await asyncio.gather(*clients, return_exceptions=True)
+    
+    lags = sorted(run.lags)
+    return {
+        "requests": run.requests,
+        "rps": run.requests / args.duration,
+        "writes": len(run.written),
+        "p50": lags[len(lags) // 2] * 1000 if lags else 0.0,
+        "p95": lags[int(len(lags) * 0.95)] * 1000 if lags else 0.0,
+        "rss": idle_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test polling vs the push stream")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--write-interval", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATA_DIR"] = os.path.join(tmp.name, "data")
+    os.environ["PUSH_KEEPALIVE_INTERVAL"] = "15"
+    
+    server = multiprocessing.Process(target=serve, args=(args.port,), daemon=True)
+    server.start()
+    wait_for_port(args.port)
+    base_rss = rss_mb(server.pid)
+    
+    print(
+        f"{args.clients} clients, {args.duration:g}s, a top-up every {args.write_interval:g}s, "
+        f"polling every {args.poll_interval:g}s; server RSS at start {base_rss:.0f} MB"
+    )
+    print(f"{'mode':<9}{'client requests':>16}{'req/s':>8}{'p50 lag ms':>12}{'p95 lag ms':>12}{'RSS MB':>8}")
+    for mode in ("polling", "push"):
+        result = asyncio.run(run_mode(mode, args, server.pid))
+        print(
+            f"{mode:<9}{result['requests']:>16,}{result['rps']:>8.0f}"
+            f"{result['p50']:>12.1f}{result['p95']:>12.1f}{result['rss']:>8.0f}"
+        )
+    
+    server.terminate()
+    server.join(10)
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark on-chain reads for many workers.
+
+Starts the local stand-in node (scripts/rpc_stand_in.py) with a simulated
+round-trip latency and reads coverage, policy, claim status and reputation
+for --workers wallets in five ways:
+
+  per-call urllib   one HTTP request and new connection per view call
+  per-call pooled   one request per call over keep-alive connections
+  batched (cold)    ChainReader: one JSON-RPC batch for all calls
+  batched (warm)    the same read again, served from the per-block cache
+  concurrent        --threads threads reading the same wallets at once
+                    through a fresh reader; identical calls are deduplicated
+
+Usage (from thinkroot-backend/):
+    python scripts/bench_rpc.py [--workers 50] [--latency 20] [--threads 8]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.chain_reader import WORKER_VIEWS, ChainReader
+from app.core.contracts import VIEWS, encode_view_call
+from app.utils.rpc import JsonRpcClient
+from rpc_stand_in import DEFAULT_FIXTURE, serve
+
+
+def urllib_call(url: str, method: str, params) -> dict:
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params}).encode()
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark on-chain reads")
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=20.0, help="simulated ms per request")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    
+    with open(DEFAULT_FIXTURE) as f:
+        fixture = json.load(f)
+    contracts = fixture["contracts"]
+    known = sorted({"0x" + log["topics"][1][-40:] for log in fixture["logs"]})
+    workers = (known + [f"0x{i:040x}" for i in range(1, args.workers + 1)])[:args.workers]
+    
+    server = serve(DEFAULT_FIXTURE, 0, args.latency)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    block = int(urllib_call(url, "eth_blockNumber", [])["result"], 16)
+    calls = [
+        ("eth_call", [{"to": contracts[VIEWS[fn].contract], "data": encode_view_call(fn, w)}, hex(block)])
+        for w in workers for fn in WORKER_VIEWS
+    ]
+    print(f"{len(workers)} workers x {len(WORKER_VIEWS)} view calls, {args.latency:g} ms simulated latency")
+    print(f"{'strategy':<18}{'ms':>10}{'http requests':>16}")
+    
+    ms, _ = timed(lambda: [urllib_call(url, method, params) for method, params in calls])
+    print(f"{'per-call urllib':<18}{ms:>10.1f}{len(calls):>16}")
+    
+    pooled = JsonRpcClient(url)
+    ms, _ = timed(lambda: [pooled.call(method, params) for method, params in calls])
+    print(f"{'per-call pooled':<18}{ms:>10.1f}{pooled.requests:>16}")
+    
+    rpc = JsonRpcClient(url)
+    reader = ChainReader(rpc, contracts)
+    ms, cold = timed(lambda: reader.worker_views(workers, block))
+    print(f"{'batched (cold)':<18}{ms:>10.1f}{rpc.requests:>16}")
+    before = rpc.requests
+    ms, warm = timed(lambda: reader.worker_views(workers, block))
+    print(f"{'batched (warm)':<18}{ms:>10.1f}{rpc.requests - before:>16}")
+    assert cold == warm
+    
+    rpc = JsonRpcClient(url)
+    reader = ChainReader(rpc, contracts)
+    barrier = threading.Barrier(args.threads)
+    results = []
+    
+    def read():
+        barrier.wait()
+        results.append(reader.worker_views(workers, block))
+    
+    threads = [threading.Thread(target=read) for _ in range(args.threads)]
+    ms, _ = timed(lambda: [t.start() for t in threads] and [t.join() for t in threads])
+    assert all(r == cold for r in results)
+    print(f"{f'concurrent x{args.threads}':<18}{ms:>10.1f}{rpc.requests:>16}")
+    print("reader stats:", reader.stats())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark list-endpoint serialization, per record.
+
+Compares the old path (one Pydantic model per record, then FastAPI's
+jsonable_encoder and JSONResponse) with the fast path (RecordSerializer and
+FastJSONResponse) on realistic store records. Both paths are checked to
+produce the same JSON first.
+
+Usage (from thinkroot-backend/):
+    python scripts/bench_serialization.py [--sizes 10 200 1000] [--seconds 0.5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from app.core.mock_store import MockStore  # noqa: E402
+from app.models.claim import ClaimResponse  # noqa: E402
+from app.models.notification import NotificationResponse  # noqa: E402
+from app.models.policy import PolicyResponse  # noqa: E402
+from app.models.transaction import TransactionResponse  # noqa: E402
+from app.utils.serialization import FastJSONResponse, RecordSerializer  # noqa: E402
+
+
+def build_records(count: int):
+    """Create `count` records of each kind in a fresh in-memory store."""
+    store = MockStore()
+    store.post_transaction("user_001", "topup", 10 ** 9)
+    policy = store.create_policy("user_001", 8, 160)
+    for n in range(count):
+        store.post_transaction("user_001", "premium", 160, reference_id=policy["id"])
+        claim = store.create_claim(policy["id"], f"Incident {n}")
+        if n % 2:
+            store.approve_claim(claim["id"], 5000)
+        store.create_notification("user_001", "Coverage purchased!", f"Policy {n}", "success")
+    policies = [store.create_policy("user_001", 8, 160) for _ in range(count)]
+    return {
+        "transactions": (TransactionResponse, store.get_user_transactions("user_001")[:count]),
+        "policies": (PolicyResponse, policies),
+        "claims": (ClaimResponse, store.get_policy_claims(policy["id"])),
+        "notifications": (NotificationResponse, store.get_user_notifications("user_001")[:count]),
+    }
+
+
+def old_path(key, model, records):
+    return JSONResponse(jsonable_encoder({key: [model(**r) for r in records], "count": len(records)})).body
+
+
+def fast_path(key, serializer, records):
+    return FastJSONResponse({key: serializer(records), "count": len(records)}).body
+
+
+def per_record_us(fn, records, seconds: float) -> float:
+    runs = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        fn()
+        runs += 1
+    return (time.perf_counter() - started) / runs / len(records) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list-endpoint serialization")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 200, 1000])
+    parser.add_argument("--seconds", type=float, default=0.5, help="time per measurement")
+    args = parser.parse_args()
+    
+    print(f"{'records':<16}{'size':>6}{'before us':>11}{'after us':>10}{'speedup':>9}")
+    for size in args.sizes:
+        for key, (model, records) in build_records(size).items():
+            serializer = RecordSerializer(model)
+            if json.loads(old_path(key, model, records)) != json.loads(fast_path(key, serializer, records)):
+                raise SystemExit(f"{key}: fast path output differs")
+            before = per_record_us(lambda: old_path(key, model, records), records, args.seconds)
+            after = per_record_us(lambda: fast_path(key, serializer, records), records, args.seconds)
+            print(f"{key:<16}{size:>6}{before:>11.2f}{after:>10.2f}{before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Throughput-scaling benchmark for multi-worker deployments.
+
+Starts `python main.py` in production mode against a fresh SQLite database
+with 1, 2, 4 and 8 workers, drives a read-heavy mix of endpoints from several
+client processes, and reports requests/sec and latency per worker count.
+
+Usage (from thinkroot-backend/, needs `pip install httpx`):
+    python scripts/bench_workers.py [--workers 1 2 4 8] [--clients 4]
+                                    [--concurrency 32] [--requests 4000]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_async import wait_for_port  # noqa: E402
+
+# Read-heavy mix resembling mobile polling, plus a few writes
+PATHS = ["/api/home", "/wallet/balance", "/history?limit=20", "/policy/active/current"]
+
+
+async def client_load(base_url: str, total: int, concurrency: int, seed: int):
+    import httpx
+    
+    latencies = []
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        async def worker(offset):
+            for i in remaining:
+                started = time.perf_counter()
+                if (i + seed) % 20 == 0:
+                    response = await client.post("/wallet/fund?amount=1")
+                else:
+                    response = await client.get(PATHS[(i + offset) % len(PATHS)])
+                if response.is_error:
+                    # httpx errors do not pickle back to the parent process
+                    raise RuntimeError(f"{response.request.url} -> {response.status_code}")
+                latencies.append(time.perf_counter() - started)
+        
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return latencies
+
+
+def run_client(args):
+    return asyncio.run(client_load(*args))
+
+
+def measure(port: int, clients: int, total: int, concurrency: int):
+    base_url = f"http://127.0.0.1:{port}"
+    per_client = total // clients
+    with multiprocessing.Pool(clients) as pool:
+        # Warm-up round, not measured
+        pool.map(run_client, [(base_url, 200, concurrency, n) for n in range(clients)])
+        started = time.perf_counter()
+        results = pool.map(run_client, [(base_url, per_client, concurrency, n) for n in range(clients)])
+        elapsed = time.perf_counter() - started
+    latencies = sorted(latency for result in results for latency in result)
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-worker throughput-scaling benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--clients", type=int, default=4, help="load-generating processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="connections per client")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    
+    print(f"cpus={os.cpu_count()} clients={args.clients} concurrency={args.concurrency}")
+    print(f"{'workers':>8}{'req/s':>10}{'speedup':>9}{'p50 ms':>10}{'p99 ms':>10}")
+    baseline = None
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                ENVIRONMENT="production",
+                STORAGE_BACKEND="sqlite",
+                SQLITE_PATH=os.path.join(tmp, "bench.db"),
+                WORKERS=str(workers),
+                PORT=str(args.port),
+            )
+            server = subprocess.Popen(
+                [sys.executable, "main.py"], cwd=ROOT, env=env,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_for_port(args.port)
+                time.sleep(1)  # let every worker finish booting
+                result = measure(args.port, args.clients, args.requests, args.concurrency)
+            finally:
+                server.terminate()
+                server.wait()
+        baseline = baseline or result["rps"]
+        print(
+            f"{workers:>8}{result['rps']:>10,.0f}{result['rps'] / baseline:>8.2f}x"
+            f"{result['p50']:>10.2f}{result['p99']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Crash-recovery check for the durable store.
+
+A child process drives the app on the durable backend: policy purchases,
+top-ups and simulated claims, with a snapshot halfway through. It saves the
+state it wrote, makes one last single-record write and is killed with
+SIGKILL, without a clean close, log flush or final snapshot. The check then
+cuts the last log segment off in the middle of that final record (a torn
+write), reloads the store from snapshot plus log and verifies that:
+
+- users (balances), policies, claims and the ledger match what the child
+  saved before the torn write, so every acknowledged write was on disk;
+- the torn record is gone and the segment ends on a whole record;
+- the recovered store keeps logging, and a second restart sees new writes.
+
+Usage (from thinkroot-backend/):
+    python scripts/check_durable.py [--operations 300] [--seed 1]
+"""
+import argparse
+import os
+import pickle
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+EXPECTED_FILE = "expected.pkl"
+TORN_TITLE = "Torn write"
+
+
+def state_of(store):
+    """The parts of the store that recovery must restore exactly."""
+    return {
+        "users": {user_id: dict(user) for user_id, user in store.users.items()},
+        "policies": {policy_id: dict(policy) for policy_id, policy in store.policies.items()},
+        "claims": {claim_id: dict(claim) for claim_id, claim in store.claims.items()},
+        "ledger": [dict(tx) for tx in store.transactions],
+        "accounts": dict(store.account_balances),
+        "nftSerial": store.nft_serial,
+    }
+
+
+def write_and_crash(data_dir: str, operations: int, seed: int):
+    """Child process: write through the app, then die mid-log."""
+    os.environ["STORAGE_BACKEND"] = "durable"
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["WAL_SYNC"] = "commit"
+    
+    from fastapi.testclient import TestClient
+    from main import app
+    from app.core.mock_store import mock_store
+    
+    rng = random.Random(seed)
+    client = TestClient(app)
+    for i in range(operations):
+        if i == operations // 2:
+            # Recovery has to combine the snapshot with the log written after it
+            mock_store.snapshot()
+        roll = rng.random()
+        if roll < 0.4:
+            client.post("/policy/purchase", json={"durationHours": rng.randint(1, 12)})
+        elif roll < 0.9:
+            client.post(f"/wallet/fund?amount={rng.randint(1, 500)}").raise_for_status()
+        else:
+            client.post("/claims/simulate", json={})
+    
+    with open(os.path.join(data_dir, EXPECTED_FILE), "wb") as f:
+        pickle.dump(state_of(mock_store), f)
+    # One more record (a notification is a single frame), which gets torn
+    mock_store.create_notification("user_001", TORN_TITLE, "Never fully written", "info")
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def tear_last_record(data_dir: str):
+    """Cut the newest segment in the middle of its last record. Returns (path, intact size)."""
+    from app.core.durable_store import SEGMENT_PREFIX, SEGMENT_SUFFIX, _read_frames
+    
+    segments = sorted(
+        name for name in os.listdir(data_dir)
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+    )
+    path = os.path.join(data_dir, segments[-1])
+    ends = [0] + [end for _, end in _read_frames(path)]
+    if len(ends) < 2:
+        raise RuntimeError(f"{path} has no records to tear")
+    last_start, last_end = ends[-2], ends[-1]
+    with open(path, "r+b") as f:
+        f.truncate(last_start + (last_end - last_start) // 2)
+    return path, last_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crash-recovery check for the durable store")
+    parser.add_argument("--operations", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--child", metavar="DATA_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        write_and_crash(args.child, args.operations, args.seed)
+        return
+    
+    tmp = tempfile.TemporaryDirectory()
+    data_dir = os.path.join(tmp.name, "data")
+    child = subprocess.run([
+        sys.executable, __file__, "--child", data_dir,
+        "--operations", str(args.operations), "--seed", str(args.seed),
+    ])
+    if child.returncode != -signal.SIGKILL:
+        raise SystemExit(f"writer exited with {child.returncode} instead of being killed")
+    
+    with open(os.path.join(data_dir, EXPECTED_FILE), "rb") as f:
+        expected = pickle.load(f)
+    segment, intact_size = tear_last_record(data_dir)
+    
+    from app.core.durable_store import DurableMockStore
+    
+    failures = []
+    store = DurableMockStore(data_dir)
+    recovered = state_of(store)
+    for name in expected:
+        if recovered[name] != expected[name]:
+            failures.append(f"{name} differ after recovery")
+    if any(n["title"] == TORN_TITLE for n in store.get_user_notifications("user_001")):
+        failures.append("the torn record was replayed")
+    if os.path.getsize(segment) != intact_size:
+        failures.append("the torn tail was not truncated")
+    
+    # The recovered store must keep logging where it left off
+    balance = store.post_transaction("user_001", "topup", 7)["balanceAfter"]
+    store.close()
+    store = DurableMockStore(data_dir)
+    if store.get_user("user_001")["balance"] != balance:
+        failures.append("a write after recovery was lost on the next restart")
+    store.close()
+    
+    print(
+        f"durable: {args.operations} operations, {len(expected['ledger'])} postings, "
+        f"{len(expected['policies'])} policies, balance {expected['users']['user_001']['balance']}"
+    )
+    for failure in failures:
+        print(f"  FAILED: {failure}")
+    if not failures:
+        print("  OK")
+    tmp.cleanup()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Index contract events into the configured store.
+
+Pulls PolicyPurchased, PolicyExpired, ClaimFiled, ClaimApproved,
+ClaimRejected, PayoutSent and ScoreUpdated logs from a JSON-RPC node (or a
+recorded fixture) and writes them to the store, resuming from the stored
+checkpoint. Use STORAGE_BACKEND=sqlite or durable to index into the data the
+server reads; the default in-memory store is only useful with a fixture.
+
+Usage (from thinkroot-backend/):
+    # Against a local Hardhat node after scripts/deploy.js
+    python scripts/index_chain.py --rpc-url http://127.0.0.1:8545 \\
+        --deployment ../deployment-addresses.json
+    
+    # Offline, replaying a recording (--max-range mimics provider limits)
+    python scripts/index_chain.py --fixture scripts/fixtures/chain_logs.json --max-range 8
+    
+    # Record a node's logs as a fixture
+    python scripts/index_chain.py --rpc-url http://127.0.0.1:8545 \\
+        --deployment ../deployment-addresses.json --record my_logs.json
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.core.contracts import EVENT_TOPICS
+from app.core.indexer import ChainIndexer, load_contracts
+from app.core.mock_store import mock_store
+from app.utils.rpc import JsonRpcClient, RecordedRpc
+
+
+def record(rpc: JsonRpcClient, contracts: Dict[str, str], start_block: int, path: str):
+    """Save every matching log up to the head as a RecordedRpc fixture."""
+    head = rpc.block_number()
+    logs = rpc.get_logs(list(contracts.values()), EVENT_TOPICS, start_block, head)
+    with open(path, "w") as f:
+        json.dump({"head": head, "contracts": contracts, "logs": logs}, f, indent=2)
+    print(f"recorded {len(logs)} logs up to block {head} in {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index contract events into the store")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--rpc-url", default=settings.CHAIN_RPC_URL)
+    source.add_argument("--fixture", help="recorded logs to replay instead of a node")
+    parser.add_argument("--deployment", help="deployment-addresses.json from scripts/deploy.js")
+    parser.add_argument("--start-block", type=int, default=settings.CHAIN_START_BLOCK)
+    parser.add_argument("--max-range", type=int, help="fixture only: reject wider eth_getLogs ranges")
+    parser.add_argument("--record", help="write the node's logs to this fixture file and exit")
+    args = parser.parse_args()
+    
+    deployment = None
+    if args.deployment:
+        with open(args.deployment) as f:
+            deployment = json.load(f)
+    
+    if args.fixture:
+        rpc = RecordedRpc.load(args.fixture, args.max_range)
+        if deployment is None:
+            with open(args.fixture) as f:
+                deployment = json.load(f)
+    elif args.rpc_url:
+        rpc = JsonRpcClient(args.rpc_url)
+    else:
+        raise SystemExit("Set --rpc-url (or CHAIN_RPC_URL) or --fixture")
+    
+    contracts = load_contracts(deployment)
+    if args.record:
+        record(rpc, contracts, args.start_block, args.record)
+        return
+    
+    indexer = ChainIndexer(rpc, mock_store, list(contracts.values()), start_block=args.start_block)
+    result = indexer.sync()
+    print(
+        f"indexed {result['events']} new events in {result['batches']} batches "
+        f"({result['retries']} narrowed retries); checkpoint {result['checkpoint']} / head {result['head']}"
+    )
+    workers = {event["worker"] for event in mock_store.get_chain_events(limit=10000)}
+    for worker in sorted(workers):
+        print(worker, mock_store.get_chain_state(worker))
+    mock_store.close()
+
+
+if __name__ == "__main__":
+    main()
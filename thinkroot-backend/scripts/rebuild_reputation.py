@@ -0,0 +1,58 @@
+"""
+Verify (and optionally repair) the incrementally maintained reputation counters.
+
+Recomputes every user's counters from their policies, claims and telemetry
+events and compares them with the stored counters. Run it against the
+configured backend while the server is stopped.
+
+The memory and durable stores rebuild their counters from the raw records on
+startup, so for them this is only a consistency check; with SQLite the
+counters live in their own table and --fix rewrites the rows that drifted.
+
+Usage (from thinkroot-backend/):
+    STORAGE_BACKEND=sqlite python scripts/rebuild_reputation.py [--fix]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.mock_store import mock_store
+from app.core.reputation import compute_counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify reputation counters")
+    parser.add_argument("--fix", action="store_true", help="overwrite counters that drifted")
+    args = parser.parse_args()
+    
+    users = mismatched = 0
+    for user_id in mock_store.get_user_ids():
+        users += 1
+        expected = compute_counters(
+            mock_store.get_user_policies(user_id),
+            mock_store.get_user_claims(user_id),
+            mock_store.get_user_telemetry_events(user_id),
+        )
+        stored = mock_store.get_reputation_counters(user_id)
+        if stored == expected:
+            continue
+        mismatched += 1
+        diff = ", ".join(
+            f"{name} {stored.get(name)} -> {value}"
+            for name, value in expected.items() if stored.get(name) != value
+        )
+        print(f"{user_id}: {diff}")
+        if args.fix:
+            mock_store.set_reputation_counters(user_id, expected)
+    
+    action = "fixed" if args.fix else "mismatched"
+    print(f"checked {users} users, {mismatched} {action}")
+    mock_store.close()
+    if mismatched and not args.fix:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Local stand-in for an Ethereum JSON-RPC node, serving a recorded fixture.
+
+Answers eth_blockNumber, eth_getLogs and eth_call for the contract view
+functions in app/core/contracts.py VIEWS, with single and batch requests
+over keep-alive HTTP/1.1. View results are derived from the fixture's events
+up to the requested block, so they are consistent with what the indexer
+sees (coverage ignores wall-clock expiry). --latency adds a delay to every
+HTTP request to model the round trip to a remote node.
+
+Usage (from thinkroot-backend/):
+    python scripts/rpc_stand_in.py [--fixture scripts/fixtures/chain_logs.json]
+                                   [--port 8545] [--latency 20]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.contracts import VIEWS, decode_log
+from app.utils.rpc import RecordedRpc, RpcError
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "chain_logs.json")
+# ReputationScore.DEFAULT_SCORE
+DEFAULT_SCORE = 100
+CLAIM_STATUS_VALUES = {"ClaimFiled": 1, "ClaimApproved": 2, "ClaimRejected": 3}
+
+
+def _discount(score: int, active: bool) -> int:
+    """ReputationScore.calculateDiscount."""
+    if not active:
+        return 0
+    if score >= 150:
+        return 20
+    if score >= 120:
+        return 10
+    return 0 if score >= 100 else -10
+
+
+def encode_values(outputs, values: Dict[str, Any]) -> str:
+    """ABI-encode static outputs (uintN, int256, bool, address)."""
+    words = []
+    for name, kind in outputs:
+        value = values[name]
+        if kind == "address":
+            value = int(value, 16)
+        words.append((int(value) % (1 << 256)).to_bytes(32, "big"))
+    return "0x" + b"".join(words).hex()
+
+
+class ChainModel:
+    """Contract state at any block, folded from a fixture's events."""
+    
+    def __init__(self, recording: Dict[str, Any]):
+        self.rpc = RecordedRpc(recording)
+        self.contracts = {address.lower(): name for name, address in recording["contracts"].items()}
+        events = [event for event in map(decode_log, recording["logs"]) if event is not None]
+        self.events = sorted(events, key=lambda e: (e["blockNumber"], e["logIndex"]))
+    
+    def view(self, function: str, worker: str, block: int) -> str:
+        policy = {
+            "workerAddress": "0x" + "0" * 40, "coverageAmount": 0, "startTime": 0, "endTime": 0,
+            "isActive": False, "hasClaimed": False,
+        }
+        claim_status = 0
+        reputation = {
+            "score": DEFAULT_SCORE, "safeDays": 0, "claims": 0, "lastUpdated": 0,
+            "isActive": False, "discountPercentage": 0,
+        }
+        for event in self.events:
+            if event["blockNumber"] > block:
+                break
+            if event["worker"] != worker:
+                continue
+            args = event["args"]
+            if event["name"] == "PolicyPurchased":
+                policy.update({
+                    "workerAddress": worker, "coverageAmount": args["coverageAmount"],
+                    "startTime": args["startTime"], "endTime": args["endTime"],
+                    "isActive": True, "hasClaimed": False,
+                })
+            elif event["name"] == "PolicyExpired":
+                policy["isActive"] = False
+            elif event["name"] in CLAIM_STATUS_VALUES:
+                claim_status = CLAIM_STATUS_VALUES[event["name"]]
+                if event["name"] == "ClaimFiled":
+                    policy["hasClaimed"] = True
+            elif event["name"] == "ScoreUpdated":
+                reputation["score"] = args["newScore"]
+                reputation["isActive"] = True
+                if args["change"] > 0:
+                    reputation["safeDays"] += 1
+                elif args["change"] < 0:
+                    reputation["claims"] += 1
+        reputation["discountPercentage"] = _discount(reputation["score"], reputation["isActive"])
+        values = {
+            "hasValidCoverage": {"hasValidCoverage": policy["isActive"] and not policy["hasClaimed"]},
+            "getPolicyDetails": policy,
+            "getClaimStatus": {"claimStatus": claim_status},
+            "getReputationDetails": reputation,
+            "getScore": {"score": reputation["score"]},
+        }[function]
+        return encode_values(VIEWS[function].outputs, values)
+    
+    def eth_call(self, call: Dict[str, Any], block_tag: str = "latest") -> str:
+        contract = self.contracts.get(call["to"].lower())
+        selector, argument = call["data"][:10], call["data"][10:]
+        for function, spec in VIEWS.items():
+            if spec.selector == selector and spec.contract == contract:
+                block = self.rpc.head if block_tag == "latest" else int(block_tag, 16)
+                return self.view(function, "0x" + argument[-40:].lower(), block)
+        raise RpcError("execution reverted", 3)
+    
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method, params = request.get("method"), request.get("params") or []
+        try:
+            if method == "eth_blockNumber":
+                result: Any = hex(self.rpc.head)
+            elif method == "eth_getLogs":
+                query = params[0]
+                result = self.rpc.get_logs(
+                    query["address"], query["topics"][0],
+                    int(query["fromBlock"], 16), int(query["toBlock"], 16),
+                )
+            elif method == "eth_call":
+                result = self.eth_call(*params)
+            else:
+                raise RpcError(f"method {method} not supported", -32601)
+        except RpcError as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": e.code, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+
+def serve(
+    fixture: str = DEFAULT_FIXTURE, port: int = 8545, latency: float = 0.0
+) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread; returns the server."""
+    with open(fixture) as f:
+        model = ChainModel(json.load(f))
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        # Headers and body are written separately; without this, Nagle plus
+        # delayed ACKs stall every keep-alive response by ~40 ms
+        disable_nagle_algorithm = True
+        
+        def log_message(self, *args):
+            pass
+        
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if latency:
+                time.sleep(latency / 1000)
+            if isinstance(request, list):
+                reply: Any = [model.handle(r) for r in request]
+            else:
+                reply = model.handle(request)
+            body = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Local stand-in JSON-RPC node")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--latency", type=float, default=0.0, help="ms added to every request")
+    args = parser.parse_args(argv)
+    server = serve(args.fixture, args.port, args.latency)
+    print(f"serving {args.fixture} on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
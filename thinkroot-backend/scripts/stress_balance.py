@@ -0,0 +1,192 @@
+"""
+Concurrency stress test for the balance-mutating flows.
+
+First calls the store's post_transaction directly from Barrier-synced
+threads and checks that no posting was lost: the final balance must equal
+the start plus every successful credit and debit, and the ledger must hold
+exactly those postings with chained running balances. The app's async
+routes run in-memory store calls inline on the event loop, so only direct
+calls put several threads inside post_transaction at once.
+
+Then fires concurrent POST /policy/purchase, POST /wallet/fund and
+POST /claims/simulate requests at the app and reconciles the final
+balance against the successful responses, the transaction history and the
+ledger's running balances.
+A double-spend shows up as a negative balance or a mismatch.
+
+Usage (from thinkroot-backend/):
+    python scripts/stress_balance.py [--backend memory|durable|sqlite]
+                                     [--threads 32] [--requests 50]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+USER_ID = "user_001"
+
+
+def stress_store(store, threads: int, operations: int):
+    """Race post_transaction calls on one wallet. Returns a list of failures."""
+    from app.core.ledger import wallet_delta
+    from app.core.storage import InsufficientBalanceError
+    
+    start_balance = store.get_user(USER_ID)["balance"]
+    start_postings = len(store.get_user_transactions(USER_ID))
+    net = []
+    results_lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+    
+    def worker(seed):
+        rng = random.Random(seed)
+        deltas = []
+        barrier.wait()
+        for _ in range(operations):
+            amount = rng.randint(1, 40)
+            if rng.random() < 0.6:
+                try:
+                    store.post_transaction(USER_ID, "premium", amount)
+                except InsufficientBalanceError:
+                    continue
+                deltas.append(-amount)
+            else:
+                store.post_transaction(USER_ID, "topup", amount)
+                deltas.append(amount)
+        with results_lock:
+            net.extend(deltas)
+    
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    
+    balance = store.get_user(USER_ID)["balance"]
+    expected = start_balance + sum(net)
+    # Newest first; keep the postings made here, oldest first
+    postings = store.get_user_transactions(USER_ID)[::-1][start_postings:]
+    chained = all(
+        older["balanceAfter"] + wallet_delta(newer) == newer["balanceAfter"]
+        for older, newer in zip(postings, postings[1:])
+    )
+    
+    total = threads * operations
+    print(f"store: {total} post_transaction calls in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+    print(f"  postings={len(net)} balance={balance} expected={expected}")
+    failures = []
+    if balance < 0:
+        failures.append("store: balance went negative")
+    if balance != expected:
+        failures.append(f"store: lost updates ({expected - balance:+} missing from the balance)")
+    if len(postings) != len(net):
+        failures.append(f"store: {len(postings)} postings recorded for {len(net)} successful calls")
+    if not chained or (postings and postings[-1]["balanceAfter"] != balance):
+        failures.append("store: ledger running balances do not chain")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency stress test for balance flows")
+    parser.add_argument("--backend", default="memory", choices=["memory", "durable", "sqlite"])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50, help="requests per thread")
+    args = parser.parse_args()
+    
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["STORAGE_BACKEND"] = args.backend
+    os.environ["SQLITE_PATH"] = os.path.join(tmp.name, "stress.db")
+    os.environ["DATA_DIR"] = os.path.join(tmp.name, "data")
+    
+    from fastapi.testclient import TestClient
+    from main import app
+    
+    from app.core.mock_store import mock_store
+    
+    # Switch threads as often as possible to widen race windows
+    sys.setswitchinterval(1e-6)
+    mock_store.reset()
+    failures = stress_store(mock_store, args.threads, args.requests)
+    
+    client = TestClient(app)
+    client.post("/api/settings/reset")
+    start_balance = client.get("/wallet/balance").json()["balance"]
+    
+    spent = []
+    received = []
+    results_lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+    
+    def worker(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(args.requests):
+            roll = rng.random()
+            if roll < 0.7:
+                r = client.post("/policy/purchase", json={"durationHours": rng.randint(1, 12)})
+                if r.status_code == 200:
+                    with results_lock:
+                        spent.append(r.json()["premiumBreakdown"]["premiumPaid"])
+                elif r.status_code != 400:
+                    raise RuntimeError(f"purchase failed: {r.status_code} {r.text}")
+            elif roll < 0.99:
+                amount = rng.randint(1, 40)
+                r = client.post(f"/wallet/fund?amount={amount}")
+                r.raise_for_status()
+                with results_lock:
+                    received.append(amount)
+            else:
+                r = client.post("/claims/simulate", json={})
+                if r.status_code == 200:
+                    with results_lock:
+                        received.append(r.json()["payoutAmount"])
+    
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    
+    balance = client.get("/wallet/balance").json()["balance"]
+    expected = start_balance + sum(received) - sum(spent)
+    premiums = sum(
+        t["amount"] for t in client.get("/history?filter=premium&limit=200").json()["transactions"]
+    )
+    # The first history page only covers 200 premiums, so only check it when complete
+    history_ok = len(spent) > 200 or premiums == sum(spent)
+    # Running balances must chain: each posting starts where the previous one ended
+    recent = client.get("/history?limit=200").json()["transactions"]
+    ledger_ok = not recent or recent[0]["balanceAfter"] == balance
+    for newer, older in zip(recent, recent[1:]):
+        delta = -newer["amount"] if newer["type"] == "premium" else newer["amount"]
+        ledger_ok = ledger_ok and newer["balanceAfter"] - delta == older["balanceAfter"]
+    
+    total = args.threads * args.requests
+    print(f"{args.backend}: {total} requests in {elapsed:.2f}s ({total / elapsed:,.0f} req/s)")
+    print(f"  purchases={len(spent)} credits={len(received)} balance={balance} expected={expected}")
+    if balance < 0:
+        failures.append("balance went negative")
+    if balance != expected:
+        failures.append("balance does not match successful operations")
+    if not history_ok:
+        failures.append("premium history does not match successful purchases")
+    if not ledger_ok:
+        failures.append("ledger running balances do not chain")
+    for failure in failures:
+        print(f"  FAILED: {failure}")
+    if not failures:
+        print("  OK")
+    tmp.cleanup()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()